@@ -1,9 +1,8 @@
 from nba_api.stats.endpoints import leaguedashplayerstats
 import pandas as pd
 import os
+import sys
 from typing import List, Dict
-import time
-import random
 import logging
 from dotenv import load_dotenv
 from src._python_scripts.utils import (
@@ -103,12 +102,7 @@ def get_player_stats() -> pd.DataFrame:
         logger.info(f"Top 3 players for {new_name}:")
         for _, player in sample_players.iterrows():
             logger.info(f"  {player['PLAYER_NAME']}: {player[original_col]:.3f} (Total MIN: {player['MIN']})")
-        
-        # Add small delay between processing different stats
-        if idx < total_stats:
-            delay = random.uniform(0.5, 1)
-            logger.info(f"Waiting {delay:.1f} seconds before processing next stat...")
-            time.sleep(delay)
+
 
     # Add EFG% from advanced stats
     logger.info(f"Processing stat {total_stats}/{total_stats}: EFG %")
@@ -139,10 +133,10 @@ def get_player_stats() -> pd.DataFrame:
     logger.info("Data transformation completed")
     return pd.DataFrame(transformed_data)
 
-def load_to_supabase(df: pd.DataFrame) -> None:
-    """Load data to Supabase"""
+def load_to_supabase(df: pd.DataFrame) -> bool:
+    """Load data to Supabase; returns False if the upsert failed"""
     logger.info("Loading data to Supabase...")
-    utils_load_to_supabase(df, 'distribution_stats', on_conflict='player_id,stat')
+    return utils_load_to_supabase(df, 'distribution_stats', on_conflict='player_id,stat')
 
 def main():
     logger.info("Starting stat distribution data collection")
@@ -151,7 +145,8 @@ def main():
         df = get_player_stats()
         
         # Load to Supabase
-        load_to_supabase(df)
+        if not load_to_supabase(df):
+            sys.exit(1)
         
         # Print summary
         logger.info("\nData collection summary:")
@@ -5,33 +5,42 @@ and load it into Supabase for the AgeTracker component.
 """
 
 import json
+import sys
 from datetime import datetime, date
-from supabase import create_client, Client
-import os
 from dotenv import load_dotenv
 from nba_api.stats.endpoints import commonplayerinfo, playercareerstats
-import time
-import random
+import pandas as pd
+from supabase import Client
+from utils import (get_supabase_client, api_call_with_retry, fetch_table_rows, replace_partition,
+                   get_team_schedule, games_until_age, remaining_game_dates, team_games_played, recent_form_rates,
+                   availability_rates, record_crossings_frame, RECORD_CROSSINGS_TABLE, RECORD_CROSSINGS_KEY)
 
 # Load environment variables
 load_dotenv()
 
-# Supabase configuration
-SUPABASE_URL = os.getenv('VITE_SUPABASE_URL')
-SUPABASE_KEY = os.getenv('VITE_SUPABASE_ANON_KEY')
+AGE_TRACKER_AGE = 25
+
+# age_based_achievements categories -> (player_career_data column, game log stat)
+AGE_TRACKER_STATS = {
+    'Career Points': ('career_points', 'PTS'),
+    'Career Assists': ('career_assists', 'AST'),
+    'Career Rebounds': ('career_rebounds', 'REB'),
+    'Career Steals': ('career_steals', 'STL'),
+    'Career Blocks': ('career_blocks', 'BLK'),
+    'Career 3-Pointers Made': ('career_3pt_made', 'FG3M'),
+    'Career Field Goals Made': ('career_fg_made', 'FGM'),
+    'Career Free Throws Made': ('career_ft_made', 'FTM'),
+    'Career Minutes': ('career_minutes', 'MIN'),
+    'Career Games Played': ('career_games_played', None)
+}
 
-def get_supabase_client() -> Client:
-    """Initialize Supabase client"""
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
 
 def fetch_player_info(player_id: int):
     """Fetch player bio information using nba_api package"""
     try:
-        # Add a small delay to avoid rate limiting
-        time.sleep(random.uniform(1, 2))
-        
-        player_info = commonplayerinfo.CommonPlayerInfo(player_id=player_id)
-        return player_info.get_data_frames()
+        return api_call_with_retry(
+            lambda: commonplayerinfo.CommonPlayerInfo(player_id=player_id).get_data_frames()
+        )
     except Exception as e:
         print(f"Error fetching player info: {e}")
         return None
@@ -39,22 +48,22 @@ def fetch_player_info(player_id: int):
 def fetch_player_career_stats(player_id: int):
     """Fetch player career stats using nba_api package"""
     try:
-        # Add a small delay to avoid rate limiting
-        time.sleep(random.uniform(1, 2))
-        
-        career_stats = playercareerstats.PlayerCareerStats(player_id=player_id)
-        return career_stats.get_data_frames()
+        return api_call_with_retry(
+            lambda: playercareerstats.PlayerCareerStats(player_id=player_id).get_data_frames()
+        )
     except Exception as e:
         print(f"Error fetching career stats: {e}")
         return None
 
-def calculate_age_and_games_remaining(birthdate_str: str):
-    """Calculate current age and games remaining until 25th birthday"""
+def calculate_age_and_games_remaining(birthdate_str: str, schedule=None, games_played=0):
+    """Calculate current age and games remaining until 25th birthday
+
+    games_played (team games so far this season) only matters without a
+    schedule, where this season's remaining games are estimated from it.
+    """
     # Parse birthdate - handle both date and datetime formats
-    if 'T' in birthdate_str:
-        birthdate = datetime.strptime(birthdate_str.split('T')[0], '%Y-%m-%d').date()
-    else:
-        birthdate = datetime.strptime(birthdate_str, '%Y-%m-%d').date()
+    birthdate_str = birthdate_str.split('T')[0]
+    birthdate = datetime.strptime(birthdate_str, '%Y-%m-%d').date()
     
     today = date.today()
     
@@ -63,30 +72,71 @@ def calculate_age_and_games_remaining(birthdate_str: str):
     if (today.month, today.day) < (birthdate.month, birthdate.day):
         age -= 1
     
-    # Calculate days until 25th birthday
-    next_birthday = date(birthdate.year + 25, birthdate.month, birthdate.day)
-    if today > next_birthday:
-        # Already past 25th birthday
-        days_until_25 = 0
-    else:
-        days_until_25 = (next_birthday - today).days
+    # Wolves games left before the birthday: the real schedule for this
+    # season, a typical 82-game calendar for seasons not yet scheduled
+    games_remaining = games_until_age(birthdate, AGE_TRACKER_AGE, schedule, games_played=games_played)
     
-    # Calculate games remaining more accurately
-    # Anthony Edwards turns 25 on August 5, 2026
-    # He has the rest of 2024-25 season + full 2025-26 season
-    # Assuming roughly 82 games per season and we're about 1/4 through 2024-25
-    if days_until_25 > 365:  # More than a year left
-        games_remaining = 82 + 62  # Full next season + remaining current season (144 total)
-    else:
-        # For less than a year, calculate more precisely
-        # If he has more than 6 months left, give him most of a season
-        if days_until_25 > 180:
-            games_remaining = 82  # Full season
-        else:
-            games_remaining = max(0, int(days_until_25 / 365 * 82))
-    
-    
-    return age, games_remaining, birthdate_str.split('T')[0] if 'T' in birthdate_str else birthdate_str
+    return age, games_remaining, birthdate_str
+
+def fetch_age_record_targets(supabase: Client):
+    """Fetch the age-based achievement records to project against (None if they cannot be read)"""
+    try:
+        return fetch_table_rows('age_based_achievements', 'player_name,stat_category,stat_value,rank_position',
+                                client=supabase, order_by=['id'])
+    except Exception as e:
+        print(f"Error fetching age-based achievements: {e}")
+        return None
+
+def fetch_wolves_game_logs(supabase: Client):
+    """Fetch the stored Wolves game logs (every player, for team game counts)"""
+    columns = ['Player_ID', 'GAME_DATE'] + [stat for _, stat in AGE_TRACKER_STATS.values() if stat]
+    try:
+        # Stable key order so no page is skipped or repeated; a short read raises
+        rows = fetch_table_rows('twolves_player_game_logs', ','.join(columns), client=supabase,
+                                order_by=['Player_ID', 'Game_ID'], verify_count=True)
+        logs = pd.DataFrame(rows, columns=columns)
+    except Exception as e:
+        print(f"Error fetching game logs: {e}")
+        return None
+    stats = columns[2:]
+    logs[stats] = logs[stats].apply(pd.to_numeric, errors='coerce')
+    logs['GAME_DATE'] = pd.to_datetime(logs['GAME_DATE'])
+    return logs
+
+def compute_age_record_crossings(player_id: int, player_name: str, player_data: dict, game_logs, targets,
+                                 birthdate: str, schedule=None, games_played=0):
+    """Project when the player passes each age-based record before turning 25.
+
+    Expected output per Wolves game is the recent-form per-game rate times the
+    share of team games the player plays; crossings after the 25th birthday
+    get no date.
+    """
+    rates = recent_form_rates(game_logs, [stat for _, stat in AGE_TRACKER_STATS.values() if stat],
+                              player_column='Player_ID')
+    availability = availability_rates(game_logs, player_column='Player_ID').get(player_id, 1.0)
+    rates = rates.loc[player_id] if player_id in rates.index else pd.Series(dtype=float)
+
+    targets = [t for t in targets if t['stat_category'] in AGE_TRACKER_STATS and t['player_name'] != player_name]
+    if not targets:
+        return pd.DataFrame()
+
+    birthday = datetime.strptime(birthdate, '%Y-%m-%d').date()
+    birthday = birthday.replace(year=birthday.year + AGE_TRACKER_AGE)
+    game_dates = remaining_game_dates(schedule, until=pd.Timestamp(birthday) - pd.Timedelta(days=1),
+                                      games_played=games_played)
+
+    current, expected = [], []
+    for target in targets:
+        column, stat = AGE_TRACKER_STATS[target['stat_category']]
+        current.append(player_data[column])
+        # One game played per game available
+        expected.append(availability * (rates.get(stat, 0.0) if stat else 1.0))
+
+    return record_crossings_frame(
+        f"age_{AGE_TRACKER_AGE}", player_name, [t['stat_category'] for t in targets],
+        [f"#{t['rank_position']} {t['player_name']}" for t in targets],
+        [float(t['stat_value']) for t in targets], current, expected, len(game_dates), game_dates
+    )
 
 def create_player_career_data_table(supabase: Client):
     """Create the player_career_data table if it doesn't exist"""
@@ -121,7 +171,11 @@ def create_player_career_data_table(supabase: Client):
         print(f"❌ Error creating table: {e}")
 
 def main():
-    """Main function to fetch and load Anthony Edwards data"""
+    """Main function to fetch and load Anthony Edwards data
+
+    Returns:
+        bool: True if the career data and the age-based crossings were written
+    """
     # Anthony Edwards' player ID
     anthony_edwards_id = 1630162
     
@@ -139,20 +193,27 @@ def main():
     
     if not player_info_dfs or len(player_info_dfs) == 0:
         print("❌ Failed to fetch player info")
-        return
+        return False
     
     # Extract bio data from the first dataframe (CommonPlayerInfo)
     common_player_info_df = player_info_dfs[0]
     if common_player_info_df.empty:
         print("❌ No player info data found")
-        return
+        return False
     
     # Get the first row of data
     player_info_row = common_player_info_df.iloc[0]
     birthdate_str = player_info_row['BIRTHDATE']
     
-    # Calculate age and games remaining
-    current_age, games_remaining, birthdate = calculate_age_and_games_remaining(birthdate_str)
+    # Calculate age and games remaining from the Wolves schedule; without
+    # one, this season's games so far come from the stored game logs
+    schedule = get_team_schedule()
+    game_logs = fetch_wolves_game_logs(supabase)
+    if game_logs is None:
+        return False
+    games_played = team_games_played(schedule, game_logs)
+    current_age, games_remaining, birthdate = calculate_age_and_games_remaining(birthdate_str, schedule,
+                                                                                games_played)
     
     print(f"📅 Birthdate: {birthdate}")
     print(f"🎂 Current Age: {current_age}")
@@ -164,13 +225,13 @@ def main():
     
     if not career_stats_dfs or len(career_stats_dfs) == 0:
         print("❌ Failed to fetch career stats")
-        return
+        return False
     
     # Extract regular season career totals (index 1 is CareerTotalsRegularSeason)
     career_totals_df = career_stats_dfs[1]
     if career_totals_df.empty:
         print("❌ No career stats data found")
-        return
+        return False
     
     # Get the first row of career totals
     career_row = career_totals_df.iloc[0]
@@ -284,6 +345,21 @@ def main():
         
     except Exception as e:
         print(f"❌ Error inserting data: {e}")
+        return False
+    
+    # Precompute when each age-based record would fall; without the targets
+    # the age partition is left as it is rather than emptied
+    targets = fetch_age_record_targets(supabase)
+    if targets is None:
+        return False
+    crossings = compute_age_record_crossings(anthony_edwards_id, 'Anthony Edwards', player_data, game_logs,
+                                             targets, birthdate, schedule, games_played)
+    if not replace_partition(crossings, RECORD_CROSSINGS_TABLE, RECORD_CROSSINGS_KEY,
+                             {'tracker': f"age_{AGE_TRACKER_AGE}"}, client=supabase):
+        return False
+    print(f"✅ Projected {len(crossings)} age-based record crossings")
+    return True
 
 if __name__ == "__main__":
-    main()
+    if not main():
+        sys.exit(1)
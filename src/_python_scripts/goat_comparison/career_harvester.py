@@ -0,0 +1,256 @@
+"""Concurrent, restartable career-stats harvesting.
+
+Fetches career stats for many players on a bounded thread pool. Request
+pacing comes from the shared NBA API rate limiter in utils, so adding
+workers never outruns what stats.nba.com tolerates. Every finished player is
+appended to a partial CSV and its id to a checkpoint file as soon as it
+completes; if the run dies, the next run skips the checkpointed players and
+keeps their rows. The final CSV only replaces the previous one once every
+player has been attempted; players that returned no stats are reported
+back so the caller can list them.
+
+refresh_career_stats builds on this for nightly runs and keeps the result in
+the career store (career_store.py): a per-player manifest
+records when each career was fetched and its last season, only players who
+appeared in a game since the previous refresh (or are new) are re-fetched,
+and finished careers are frozen until the player shows up on the active
+player list again. The comparison trajectory index
+(trajectory_index.py) is updated for the re-fetched players.
+"""
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime
+import pandas as pd
+from nba_api.stats.endpoints import leaguegamelog
+from nba_api.stats.static import players as static_players
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+from career_store import CAREER_STATS_COLUMNS, load_career_stats, write_career_stats
+from trajectory_index import load_trajectory_index
+
+# Concurrent player fetches (the rate limiter still bounds requests/second)
+HARVEST_MAX_WORKERS = int(os.environ.get('HARVEST_MAX_WORKERS', 4))
+
+def _checkpoint_paths(output_file):
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.checkpoint", f"{root}.partial.csv"
+
+def _read_checkpoint(checkpoint_file):
+    if not os.path.exists(checkpoint_file):
+        return set()
+    with open(checkpoint_file) as f:
+        return {line.strip() for line in f if line.strip()}
+
+def harvest_career_stats(players, fetch_func, output_file, extra_columns=None, max_workers=HARVEST_MAX_WORKERS):
+    """Fetch career stats for every player concurrently and write one CSV.
+
+    Args:
+        players (pd.DataFrame): PLAYER_ID and PLAYER columns, plus any
+            columns fetch_func needs via the row
+        fetch_func (callable): fetch_func(player_row) -> DataFrame or None
+        output_file (str): Final CSV path; checkpoint and partial files are
+            kept next to it while the harvest is incomplete
+        extra_columns (list, optional): Columns appended after the standard
+            career-stats columns (e.g. HOF_INDUCTION_YEAR)
+        max_workers (int): Players fetched at once
+
+    Returns:
+        tuple: (number of players with stats, list of failed player names)
+    """
+    checkpoint_file, partial_file = _checkpoint_paths(output_file)
+    columns = CAREER_STATS_COLUMNS + list(extra_columns or [])
+
+    done = _read_checkpoint(checkpoint_file)
+    pending = players[~players['PLAYER_ID'].astype(str).isin(done)]
+    if done:
+        print(f"Resuming harvest: {len(done)} players already done, {len(pending)} to go")
+
+    failed_players = []
+    total = len(pending)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool, open(checkpoint_file, 'a') as checkpoint:
+        futures = {pool.submit(fetch_func, player): player for _, player in pending.iterrows()}
+
+        # Results are written from this thread only, as they complete
+        for idx, future in enumerate(as_completed(futures), 1):
+            player = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f"Error getting stats for {player['PLAYER']}: {e}")
+                stats = None
+
+            if stats is None:
+                failed_players.append(player['PLAYER'])
+                print(f"Processed {idx}/{total}: {player['PLAYER']} (no stats)")
+                continue
+
+            stats = stats.reindex(columns=columns)
+            stats.to_csv(partial_file, mode='a', index=False, header=not os.path.exists(partial_file))
+            checkpoint.write(f"{player['PLAYER_ID']}\n")
+            checkpoint.flush()
+            print(f"Processed {idx}/{total}: {player['PLAYER']}")
+
+    # Every player was attempted: publish the harvest and start fresh next run
+    harvested = len(_read_checkpoint(checkpoint_file))
+    if os.path.exists(partial_file):
+        os.replace(partial_file, output_file)
+        print(f"\nSaved stats for {harvested} players to {output_file}")
+    os.remove(checkpoint_file)
+    return harvested, failed_players
+
+def _manifest_path(output_file):
+    root, _ = os.path.splitext(output_file)
+    return f"{root}.manifest.json"
+
+def load_manifest(output_file):
+    """Load the refresh manifest kept next to a career-stats CSV."""
+    try:
+        with open(_manifest_path(output_file)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'last_refresh': None, 'players': {}}
+
+def save_manifest(output_file, manifest):
+    path = _manifest_path(output_file)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def _season_start_year(season_id):
+    try:
+        return int(str(season_id)[:4])
+    except (TypeError, ValueError):
+        return None
+
+def get_players_played_since(since, season=None):
+    """Return the ids of players with a regular-season game on or after a date.
+
+    One league-wide game log call covers every player, so the refresh cost
+    follows the number of games played rather than the size of the league.
+
+    Returns:
+        set or None: Player ids as strings, or None if the lookup failed
+    """
+    season = season or utils.get_current_season()
+    try:
+        log = utils.api_call_with_retry(lambda: leaguegamelog.LeagueGameLog(
+            player_or_team_abbreviation='P',
+            season=season,
+            season_type_all_star='Regular Season',
+            date_from_nullable=datetime.fromisoformat(since).strftime('%m/%d/%Y')
+        ).get_data_frames()[0])
+    except Exception as e:
+        print(f"Could not load game log since {since}: {e}")
+        return None
+    return set(log['PLAYER_ID'].astype(str))
+
+def get_active_player_ids():
+    """Return the ids of the players nba_api lists as active, as strings."""
+    return {str(player['id']) for player in static_players.get_active_players()}
+
+def _is_career_over(last_season):
+    # Same rule as the nba_api cache: no games in the last two seasons
+    last_year = _season_start_year(last_season)
+    current_year = _season_start_year(utils.get_current_season())
+    return last_year is not None and last_year <= current_year - 2
+
+def refresh_career_stats(players, fetch_func, output_file, extra_columns=None, freeze_all=False,
+                         full=False, max_workers=HARVEST_MAX_WORKERS):
+    """Incrementally refresh a career-stats table in the career store.
+
+    Players are re-fetched only if they are new to the file, played since
+    the last refresh, or failed to refresh last time. Careers that are over
+    (or every career, for freeze_all) are frozen in the manifest and skipped;
+    without freeze_all, a frozen player who is on the active list again (back
+    from a missed season) is re-fetched. Players no longer in `players` are dropped from the file.
+    Without an existing table (or with full=True) this is a full harvest.
+
+    Args:
+        players (pd.DataFrame): PLAYER_ID and PLAYER columns
+        fetch_func (callable): fetch_func(player_row) -> DataFrame or None
+        output_file (str): Career-stats table path (see career_store)
+        extra_columns (list, optional): Extra columns kept after the standard ones
+        freeze_all (bool): Freeze every fetched career (e.g. Hall of Famers)
+        full (bool): Ignore the manifest and re-fetch every player
+        max_workers (int): Players fetched at once
+
+    Returns:
+        tuple: (number of players re-fetched, list of failed player names)
+    """
+    manifest = {'last_refresh': None, 'players': {}} if full else load_manifest(output_file)
+    existing = None if full else load_career_stats(output_file)
+    player_ids = players['PLAYER_ID'].astype(str)
+    entries = {pid: entry for pid, entry in manifest['players'].items()
+               if existing is not None and pid in set(player_ids)}
+
+    known = player_ids.isin(entries.keys())
+    frozen = player_ids.map(lambda pid: entries.get(pid, {}).get('frozen', False)).astype(bool)
+    retry = player_ids.map(lambda pid: entries.get(pid, {}).get('stale', False)).astype(bool)
+
+    if not freeze_all and frozen.any():
+        # Two seasons without a game is not always retirement (injury,
+        # playing overseas): re-check frozen players who are active again
+        returning = frozen & player_ids.isin(get_active_player_ids())
+        if returning.any():
+            print(f"Re-checking {int(returning.sum())} frozen careers of active players")
+            frozen &= ~returning
+            retry |= returning
+
+    played = None
+    if manifest['last_refresh'] and (known & ~frozen).any():
+        played = get_players_played_since(manifest['last_refresh'])
+    if played is None:
+        # No reference point (or the game log failed): refresh every unfrozen player
+        stale = ~frozen
+    else:
+        stale = ~known | retry | (~frozen & player_ids.isin(played))
+    to_fetch = players[stale.values]
+    print(f"Refreshing {len(to_fetch)} of {len(players)} players "
+          f"({int(frozen.sum())} frozen, {int((~stale).sum()) - int(frozen.sum())} unchanged)")
+
+    failed_players = []
+    fetched = None
+    if not to_fetch.empty:
+        root, _ = os.path.splitext(output_file)
+        refresh_file = f"{root}.refresh.csv"
+        _, failed_players = harvest_career_stats(to_fetch, fetch_func, refresh_file, extra_columns, max_workers)
+        if os.path.exists(refresh_file):
+            fetched = pd.read_csv(refresh_file)
+            os.remove(refresh_file)
+
+    # A re-fetched career replaces all of that player's rows
+    fetched_ids = set(fetched['PLAYER_ID'].astype(str)) if fetched is not None else set()
+    frames = []
+    if existing is not None:
+        existing_ids = existing['PLAYER_ID'].astype(str)
+        frames.append(existing[existing_ids.isin(set(player_ids)) & ~existing_ids.isin(fetched_ids)])
+    if fetched is not None:
+        frames.append(fetched)
+    if frames:
+        combined = pd.concat(frames, ignore_index=True).sort_values(['PLAYER_ID', 'SEASON_NUMBER'], kind='stable')
+        write_career_stats(combined, output_file)
+        # Recompute comparison trajectories for the players that changed
+        load_trajectory_index(output_file)
+
+    fetched_at = datetime.now().isoformat(timespec='seconds')
+    if fetched is not None:
+        last_seasons = fetched.groupby(fetched['PLAYER_ID'].astype(str))['SEASON_ID'].max()
+        for pid, last_season in last_seasons.items():
+            entries[pid] = {
+                'last_fetched': fetched_at,
+                'last_season': last_season,
+                'frozen': bool(freeze_all or _is_career_over(last_season))
+            }
+    for pid in set(to_fetch['PLAYER_ID'].astype(str)) - fetched_ids:
+        if pid in entries:
+            # Keep the old rows but retry this player next run
+            entries[pid]['stale'] = True
+
+    manifest['players'] = entries
+    manifest['last_refresh'] = date.today().isoformat()
+    save_manifest(output_file, manifest)
+    return len(to_fetch), failed_players
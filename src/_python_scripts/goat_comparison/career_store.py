@@ -0,0 +1,151 @@
+"""Columnar career-stats store.
+
+Career stats are kept as a Parquet dataset per source (Wolves roster, active
+NBA players, Hall of Famers) with a fixed schema and one file per season, so
+a refresh only rewrites the seasons whose rows changed and readers can load
+just the columns they need, memory-mapped, without CSV type inference.
+
+pyarrow is optional: without it the store falls back to the CSV files the
+harvesters used to write, and an existing CSV is still read when a source
+has not been written as Parquet yet.
+"""
+import logging
+import os
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+# Column order of the career-stats tables
+BASE_COLUMNS = [
+    'PLAYER_ID', 'PLAYER_NAME', 'SEASON_NUMBER', 'SEASON_ID',
+    'TEAM_ABBREVIATION', 'PLAYER_AGE', 'GP', 'GS', 'MIN', 'FGM',
+    'FGA', 'FG_PCT', 'FG3M', 'FG3A', 'FG3_PCT', 'FTM', 'FTA',
+    'FT_PCT', 'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV',
+    'PF', 'PTS'
+]
+PER_GAME_COLUMNS = [
+    f'{col}_PER_GAME' for col in ['MIN', 'FGM', 'FGA', 'FG3M', 'FG3A', 'FTM', 'FTA',
+                                  'OREB', 'DREB', 'REB', 'AST', 'STL', 'BLK', 'TOV',
+                                  'PF', 'PTS']
+]
+ADVANCED_COLUMNS = [
+    'PER', 'TS_PCT', 'THREE_PAR', 'FTR', 'OREB_PCT', 'DREB_PCT', 'REB_PCT',
+    'AST_PCT', 'STL_PCT', 'BLK_PCT', 'TOV_PCT', 'USG_PCT', 'OWS', 'DWS', 'WS',
+    'WS_PER_48', 'OBPM', 'DBPM', 'BPM', 'VORP'
+]
+CAREER_STATS_COLUMNS = BASE_COLUMNS + PER_GAME_COLUMNS + ADVANCED_COLUMNS
+OPTIONAL_COLUMNS = ['HOF_INDUCTION_YEAR']
+
+_STRING_COLUMNS = {'PLAYER_NAME', 'SEASON_ID', 'TEAM_ABBREVIATION'}
+_INTEGER_COLUMNS = {'PLAYER_ID': 'int64', 'SEASON_NUMBER': 'int32'}
+
+def _column_dtype(column):
+    if column in _STRING_COLUMNS:
+        return 'string'
+    return _INTEGER_COLUMNS.get(column, 'float64')
+
+if pa is not None:
+    CAREER_STATS_SCHEMA = pa.schema([
+        pa.field(column, pa.string() if column in _STRING_COLUMNS
+                 else pa.int64() if column == 'PLAYER_ID'
+                 else pa.int32() if column == 'SEASON_NUMBER'
+                 else pa.float64())
+        for column in CAREER_STATS_COLUMNS + OPTIONAL_COLUMNS
+    ])
+else:
+    CAREER_STATS_SCHEMA = None
+
+def store_paths(path):
+    """Return (parquet_dir, csv_file) for a career-stats table path with or without .csv."""
+    root = path[:-4] if path.endswith('.csv') else path
+    return f"{root}.parquet", f"{root}.csv"
+
+def conform(df):
+    """Return df with exactly the store's columns, in order and with fixed dtypes."""
+    columns = CAREER_STATS_COLUMNS + OPTIONAL_COLUMNS
+    df = df.reindex(columns=columns)
+    for column in columns:
+        dtype = _column_dtype(column)
+        if dtype == 'string':
+            df[column] = df[column].astype('string')
+        else:
+            df[column] = pd.to_numeric(df[column], errors='coerce').astype(dtype)
+    return df
+
+def _season_file(parquet_dir, season_id):
+    return os.path.join(parquet_dir, f"season={season_id}.parquet")
+
+def write_career_stats(df, path):
+    """Write a full career-stats table, rewriting only seasons that changed.
+
+    Args:
+        df (pd.DataFrame): Career-stats rows for one source
+        path (str): Table path, e.g. 'career_stats/nba_all_players_career_stats.csv'
+
+    Returns:
+        int: Number of season files written (or 1 for the CSV fallback)
+    """
+    parquet_dir, csv_file = store_paths(path)
+    df = conform(df)
+
+    if pq is None:
+        df.to_csv(csv_file + '.tmp', index=False)
+        os.replace(csv_file + '.tmp', csv_file)
+        return 1
+
+    os.makedirs(parquet_dir, exist_ok=True)
+    written = 0
+    seasons = set()
+    for season_id, season_df in df.groupby('SEASON_ID', sort=True):
+        seasons.add(season_id)
+        season_df = season_df.sort_values(['PLAYER_ID', 'SEASON_NUMBER'], kind='stable')
+        table = pa.Table.from_pandas(season_df, schema=CAREER_STATS_SCHEMA, preserve_index=False)
+        season_path = _season_file(parquet_dir, season_id)
+        if os.path.exists(season_path) and pq.read_table(season_path, schema=CAREER_STATS_SCHEMA).equals(table):
+            continue
+        pq.write_table(table, season_path + '.tmp')
+        os.replace(season_path + '.tmp', season_path)
+        written += 1
+
+    # Seasons no longer present (players dropped from the source)
+    for name in os.listdir(parquet_dir):
+        if name.endswith('.parquet') and name[len('season='):-len('.parquet')] not in seasons:
+            os.remove(os.path.join(parquet_dir, name))
+            written += 1
+
+    logger.info(f"Career store {parquet_dir}: {written} of {len(seasons)} season files rewritten")
+    return written
+
+def load_career_stats(path, columns=None):
+    """Load a career-stats table, reading only the requested columns.
+
+    Args:
+        path (str): Table path, e.g. 'career_stats/nba_all_players_career_stats.csv'
+        columns (list, optional): Columns to load; all when not given
+
+    Returns:
+        pd.DataFrame or None: The table, or None if it has never been written
+    """
+    parquet_dir, csv_file = store_paths(path)
+
+    if pq is not None and os.path.isdir(parquet_dir):
+        files = sorted(os.path.join(parquet_dir, name) for name in os.listdir(parquet_dir)
+                       if name.endswith('.parquet'))
+        if files:
+            tables = [pq.read_table(f, columns=columns, schema=CAREER_STATS_SCHEMA, memory_map=True) for f in files]
+            return pa.concat_tables(tables).to_pandas()
+
+    if os.path.exists(csv_file):
+        available = pd.read_csv(csv_file, nrows=0).columns
+        usecols = [c for c in columns if c in available] if columns else None
+        dtypes = {c: _column_dtype(c) for c in (usecols or available) if c in _STRING_COLUMNS}
+        return pd.read_csv(csv_file, usecols=usecols, dtype=dtypes)
+
+    return None
@@ -0,0 +1,240 @@
+"""On-demand GOAT comparison queries.
+
+ComparisonService answers "who had the most similar first N seasons" for any
+player in the career store against any candidate pool, with caller-chosen
+group weights. It keeps the pools' trajectory indexes in memory, so a query
+is one vectorized scoring pass (a few milliseconds) and weights can be tweaked
+live. The indexes are reloaded when a refresh rewrites a career table.
+
+Run as a script to serve it locally over HTTP:
+
+    python comparison_api.py --port 8765
+    GET /compare?player_id=1630162&seasons=4&pool=nba,hof&k=10
+                &weights=basic:0.25,shooting:0.25,advanced:0.5&weight=0.8
+    GET /health
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from similarity_engine import GROUP_WEIGHTS, PERFORMANCE_WEIGHT, STATS_GROUPS
+from trajectory_index import load_trajectory_index, table_signature
+
+logger = logging.getLogger(__name__)
+
+CAREER_STATS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'career_stats')
+
+# Candidate pools by name
+POOLS = {
+    'nba': 'nba_all_players_career_stats.csv',
+    'hof': 'hof_players_career_stats.csv',
+    'wolves': 'wolves_all_players_career_stats.csv'
+}
+DEFAULT_POOLS = ['nba', 'hof']
+
+DEFAULT_K = 10
+MAX_K = 100
+
+# Seconds between checks for a refreshed career table
+RELOAD_INTERVAL = 60
+
+class ComparisonError(ValueError):
+    """Invalid comparison query (unknown player, pool, weights...)."""
+
+class ComparisonService:
+    """In-memory comparison queries over the career-store trajectory indexes."""
+
+    def __init__(self, stats_dir=CAREER_STATS_DIR, pools=POOLS, stats_groups=STATS_GROUPS):
+        self.stats_dir = stats_dir
+        self.pools = pools
+        self.stats_groups = stats_groups
+        self._indexes = {}
+        self._checked_at = {}
+        self._lock = threading.Lock()
+
+    def _path(self, pool):
+        return os.path.join(self.stats_dir, self.pools[pool])
+
+    def index(self, pool):
+        """Return a pool's trajectory index, reloading it if its table changed."""
+        if pool not in self.pools:
+            raise ComparisonError(f"Unknown pool '{pool}' (expected one of {', '.join(self.pools)})")
+        now = time.monotonic()
+        with self._lock:
+            index = self._indexes.get(pool)
+            if index is None or now - self._checked_at.get(pool, 0) > RELOAD_INTERVAL:
+                if index is None or index.signature != table_signature(self._path(pool)):
+                    index = load_trajectory_index(self._path(pool), self.stats_groups)
+                    self._indexes[pool] = index
+                self._checked_at[pool] = now
+        return index
+
+    def find_player(self, player_id=None, player_name=None):
+        """Locate a player in any pool: (pool, index, position), or raise ComparisonError."""
+        for pool in self.pools:
+            index = self.index(pool)
+            if index is None:
+                continue
+            position = index.position(name=player_name, player_id=player_id)
+            if position is not None:
+                return pool, index, position
+        raise ComparisonError(f"Player {player_id if player_id is not None else player_name} not found")
+
+    def _group_weights(self, group_weights):
+        weights = dict(GROUP_WEIGHTS)
+        for group, value in (group_weights or {}).items():
+            if group not in self.stats_groups:
+                raise ComparisonError(f"Unknown stat group '{group}'")
+            if value < 0:
+                raise ComparisonError(f"Weight for '{group}' must not be negative")
+            weights[group] = float(value)
+        return weights
+
+    def query(self, player_id=None, player_name=None, num_seasons=None, pools=None, k=DEFAULT_K,
+              group_weights=None, weight=PERFORMANCE_WEIGHT):
+        """Return the k careers most similar to a player's first seasons.
+
+        Args:
+            player_id (int, optional): NBA person id of the selected player
+            player_name (str, optional): Name, if no id is given
+            num_seasons (int, optional): Seasons to compare; defaults to all of
+                the player's usable seasons
+            pools (list, optional): Candidate pools (keys of POOLS)
+            k (int): Matches to return across all pools
+            group_weights (dict, optional): Group name -> weight in the overall
+                score; missing groups keep their default weight
+            weight (float): Weight of performance vs. growth within a group
+
+        Returns:
+            dict: The resolved query and its matches, best first
+        """
+        started = time.perf_counter()
+        if player_id is None and player_name is None:
+            raise ComparisonError("player_id or player_name is required")
+        if not 1 <= k <= MAX_K:
+            raise ComparisonError(f"k must be between 1 and {MAX_K}")
+        if not 0 <= weight <= 1:
+            raise ComparisonError("weight must be between 0 and 1")
+        pools = list(pools or DEFAULT_POOLS)
+        weights = self._group_weights(group_weights)
+
+        _, source, position = self.find_player(player_id, player_name)
+        name = str(source.names[position])
+        usable = int(source.valid_seasons[position])
+        num_seasons = usable if num_seasons is None else int(num_seasons)
+        if not 1 <= num_seasons <= usable:
+            raise ComparisonError(f"{name} has {usable} comparable seasons, not {num_seasons}")
+        selected = source.trajectory(position, num_seasons)
+
+        matches = []
+        for pool in pools:
+            index = self.index(pool)
+            if index is None:
+                continue
+            for match_name, scores in index.top_k(selected, self.stats_groups, k=k, weight=weight,
+                                                  group_weights=weights, exclude=name):
+                player_id_match = index.player_ids[index.position(name=match_name)]
+                matches.append({
+                    'player_name': str(match_name),
+                    'player_id': int(player_id_match) if player_id_match >= 0 else None,
+                    'pool': pool,
+                    **scores
+                })
+        matches.sort(key=lambda match: match['overall'])
+
+        return {
+            'player_id': int(source.player_ids[position]),
+            'player_name': name,
+            'seasons_compared': num_seasons,
+            'pools': pools,
+            'group_weights': weights,
+            'weight': weight,
+            'matches': matches[:k],
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+def parse_query(params):
+    """Turn /compare query-string parameters into ComparisonService.query arguments."""
+    def single(key):
+        values = params.get(key)
+        return values[0] if values else None
+
+    try:
+        arguments = {
+            'player_id': int(single('player_id')) if single('player_id') else None,
+            'player_name': single('player_name'),
+            'num_seasons': int(single('seasons')) if single('seasons') else None,
+            'pools': single('pool').split(',') if single('pool') else None,
+            'k': int(single('k')) if single('k') else DEFAULT_K,
+            'weight': float(single('weight')) if single('weight') else PERFORMANCE_WEIGHT
+        }
+        if single('weights'):
+            # weights=basic:0.25,shooting:0.25,advanced:0.5
+            arguments['group_weights'] = {
+                group: float(value)
+                for group, value in (item.split(':', 1) for item in single('weights').split(','))
+            }
+    except ValueError as e:
+        raise ComparisonError(f"Invalid query parameter: {e}")
+    return arguments
+
+def make_handler(service):
+    class ComparisonHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/health':
+                self._send_json(200, {'status': 'ok'})
+                return
+            if url.path != '/compare':
+                self._send_json(404, {'error': f"Unknown path {url.path}"})
+                return
+            try:
+                self._send_json(200, service.query(**parse_query(parse_qs(url.query))))
+            except ComparisonError as e:
+                self._send_json(400, {'error': str(e)})
+            except Exception as e:
+                logger.exception("Comparison query failed")
+                self._send_json(500, {'error': str(e)})
+
+        def log_message(self, format, *args):
+            logger.info(format % args)
+
+    return ComparisonHandler
+
+def serve(host='127.0.0.1', port=8765, service=None):
+    service = service or ComparisonService()
+    # Load every index up front so the first request is as fast as the rest
+    for pool in service.pools:
+        service.index(pool)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    logger.info(f"Serving GOAT comparisons on http://{host}:{port}/compare")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve on-demand GOAT comparison queries')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    serve(args.host, args.port)
+
+if __name__ == "__main__":
+    main()
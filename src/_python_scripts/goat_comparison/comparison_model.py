@@ -1,7 +1,11 @@
+import argparse
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
 import os
+from career_store import load_career_stats
+from similarity_engine import STATS_GROUPS, group_stats, score_candidates, stack_first_seasons
+from trajectory_index import load_trajectory_index
+from parallel_comparisons import COMPARISON_WORKERS, run_comparisons
 
 # ----------------------------
 # 1. Create Sample Data
@@ -44,57 +48,13 @@ def compute_similarity(selected_player_data, candidate_player_data, stats_groups
     if len(candidate_player_data) < N:
         return None
         
-    candidate_data = candidate_player_data.head(N)
+    stats = group_stats(stats_groups)
+    selected = selected_player_data[stats].to_numpy(dtype=np.float64)
+    candidate = candidate_player_data.head(N)[stats].to_numpy(dtype=np.float64)
     
-    # Calculate similarity for each stat group
-    similarity_components = {}
-    
-    for group_name, stats in stats_groups.items():
-        # Combine and normalize data for this group
-        combined = pd.concat([selected_player_data, candidate_data])
-        scaler = StandardScaler()
-        combined_scaled = combined.copy()
-        combined_scaled[stats] = scaler.fit_transform(combined[stats])
-        
-        # Split back into selected and candidate data
-        selected_scaled = combined_scaled.iloc[:N]
-        candidate_scaled = combined_scaled.iloc[N:]
-        
-        # Performance similarity (season by season)
-        performance_diffs = []
-        for i in range(N):
-            sel_vector = selected_scaled.iloc[i][stats].values.astype(float)
-            cand_vector = candidate_scaled.iloc[i][stats].values.astype(float)
-            dist = np.linalg.norm(sel_vector - cand_vector)
-            performance_diffs.append(dist)
-        performance_distance = np.mean(performance_diffs)
-        
-        # Growth similarity
-        growth_diffs = []
-        for stat in stats:
-            growth_sel = selected_scaled.iloc[-1][stat] - selected_scaled.iloc[0][stat]
-            growth_cand = candidate_scaled.iloc[-1][stat] - candidate_scaled.iloc[0][stat]
-            growth_diff = abs(growth_sel - growth_cand)
-            growth_diffs.append(growth_diff)
-        growth_distance = np.mean(growth_diffs)
-        
-        # Combined score for this group
-        group_score = weight * performance_distance + (1 - weight) * growth_distance
-        
-        similarity_components[f"{group_name}_perf"] = performance_distance
-        similarity_components[f"{group_name}_growth"] = growth_distance
-        similarity_components[f"{group_name}_combined"] = group_score
-    
-    # Calculate weighted overall similarity score
-    # Advanced stats get 50% weight, basic and shooting each get 25%
-    overall_score = (
-        0.25 * similarity_components['basic_combined'] +
-        0.25 * similarity_components['shooting_combined'] +
-        0.50 * similarity_components['advanced_combined']
-    )
-    similarity_components['overall'] = overall_score
-    
-    return similarity_components
+    # Single-candidate batch through the vectorized engine
+    components = score_candidates(selected, candidate[np.newaxis], stats_groups, weight)
+    return {key: float(values[0]) for key, values in components.items()}
 
 def print_similarity_results(sorted_results, comparison_type, num_seasons):
     """Helper function to print similarity results in a formatted way"""
@@ -116,42 +76,11 @@ def print_similarity_results(sorted_results, comparison_type, num_seasons):
 
 def get_valid_players(df, player_data, stats_groups):
     """Helper function to get valid players for comparison"""
-    valid_players = []
-    # Get all required stats
-    all_stats = [stat for group in stats_groups.values() for stat in group]
-    num_seasons = len(player_data)
-    
-    for player in df['PLAYER_NAME'].unique():
-        # Get first N seasons for this player
-        player_stats = df[df['PLAYER_NAME'] == player].sort_values('SEASON_NUMBER')
-        
-        # Check if player has enough consecutive seasons
-        if len(player_stats) < num_seasons:
-            continue
-            
-        # Get exactly the first N seasons
-        first_n_seasons = player_stats.head(num_seasons)
-        
-        # Check if seasons are consecutive (no gaps)
-        expected_seasons = list(range(1, num_seasons + 1))
-        actual_seasons = first_n_seasons['SEASON_NUMBER'].tolist()
-        if actual_seasons != expected_seasons:
-            continue
-            
-        # Check if all required stats are present and non-null
-        if first_n_seasons[all_stats].isnull().any().any():
-            continue
-            
-        # Check if all stats have valid numeric values (not inf or -inf)
-        if (first_n_seasons[all_stats].isin([float('inf'), float('-inf')])).any().any():
-            continue
-            
-        # If all checks pass, add player to valid list
-        valid_players.append(player)
-    
-    return valid_players
+    # Players whose first N seasons are consecutive with complete, finite stats
+    valid_players, _ = stack_first_seasons(df, group_stats(stats_groups), len(player_data))
+    return list(valid_players)
 
-def save_all_comparisons(all_comparisons, output_dir='career_stats'):
+def save_all_comparisons(all_comparisons, output_dir='career_stats', filename='all_player_comparisons.csv'):
     """Save all player comparisons to a single CSV file"""
     # Create output directory if it doesn't exist
     if not os.path.exists(output_dir):
@@ -202,81 +131,76 @@ def save_all_comparisons(all_comparisons, output_dir='career_stats'):
     
     # Create DataFrame and save to CSV
     df = pd.DataFrame(all_rows)
-    filename = os.path.join(output_dir, 'all_player_comparisons.csv')
+    filename = os.path.join(output_dir, filename)
     df.to_csv(filename, index=False)
     
     return filename
 
-def main():
-    # Read the CSV files
-    wolves_df = pd.read_csv('career_stats/wolves_all_players_career_stats.csv')
-    nba_df = pd.read_csv('career_stats/nba_all_players_career_stats.csv')
-    hof_df = pd.read_csv('career_stats/hof_players_career_stats.csv')
-    
+def main(workers=COMPARISON_WORKERS, league=False):
     # Group stats by category
-    stats_groups = {
-        'basic': ['MIN_PER_GAME', 'PTS_PER_GAME', 'AST_PER_GAME', 'REB_PER_GAME',
-                 'STL_PER_GAME', 'BLK_PER_GAME', 'TOV_PER_GAME'],
-        'shooting': ['FG_PCT', 'FG3_PCT', 'FT_PCT', 'TS_PCT'],
-        'advanced': ['USG_PCT', 'AST_PCT', 'BPM', 'WS_PER_48', 'VORP']
-    }
+    stats_groups = STATS_GROUPS
+    stats = group_stats(stats_groups)
+
+    # Candidate pools come from their precomputed trajectory indexes
+    nba_index = load_trajectory_index('career_stats/nba_all_players_career_stats.csv', stats_groups)
+    hof_index = load_trajectory_index('career_stats/hof_players_career_stats.csv', stats_groups)
+
+    # One (name, first seasons) task per player to analyze
+    tasks = []
+    if league:
+        # Every current NBA player, over all of their comparable seasons
+        for position, player_name in enumerate(nba_index.names):
+            if nba_index.valid_seasons[position] > 0:
+                tasks.append((str(player_name), nba_index.trajectory(position)))
+        print(f"\nAnalyzing {len(tasks)} NBA players on {workers} workers...")
+    else:
+        # Load only the columns the comparison uses from the career store
+        wolves_df = load_career_stats('career_stats/wolves_all_players_career_stats.csv',
+                                      ['PLAYER_NAME', 'SEASON_NUMBER'] + stats)
+        wolves_players = wolves_df['PLAYER_NAME'].unique()
+        print(f"\nAnalyzing {len(wolves_players)} Wolves players...")
+
+        for player_name in wolves_players:
+            # Get player's data
+            player_data = wolves_df[wolves_df['PLAYER_NAME'] == player_name].sort_values('SEASON_NUMBER')
+
+            # Skip if player doesn't have enough stats
+            if not all(stat in player_data.columns for group in stats_groups.values() for stat in group):
+                print(f"Skipping {player_name} - missing required stats")
+                continue
+            tasks.append((player_name, player_data[stats].to_numpy(dtype=np.float64)))
+
+    # Top 10 matches per pool; a player is only left out of their own pool
+    results = run_comparisons(tasks, {'nba': nba_index, 'hof': hof_index}, stats_groups,
+                              workers=workers, k=10, weight=0.8, exclude_self=['nba'])
 
-    # Process each Wolves player
-    wolves_players = wolves_df['PLAYER_NAME'].unique()
-    print(f"\nAnalyzing {len(wolves_players)} Wolves players...")
-    
     # Dictionary to store all comparisons
     all_comparisons = {}
-    
-    for player_name in wolves_players:
-        # Get player's data
-        player_data = wolves_df[wolves_df['PLAYER_NAME'] == player_name].sort_values('SEASON_NUMBER')
-        num_seasons = len(player_data)
-        
-        print(f"\nAnalyzing {player_name}'s first {num_seasons} seasons...")
-        
-        # Skip if player doesn't have enough stats
-        if not all(stat in player_data.columns for group in stats_groups.values() for stat in group):
-            print(f"Skipping {player_name} - missing required stats")
-            continue
-            
-        # Process current NBA players
-        nba_similarity_results = {}
-        valid_nba_players = get_valid_players(nba_df, player_data, stats_groups)
-        print(f"Found {len(valid_nba_players)} current NBA players with complete stats")
-        
-        for comp_player in valid_nba_players:
-            if comp_player != player_name:  # Skip comparing with self
-                comp_data = nba_df[nba_df['PLAYER_NAME'] == comp_player].sort_values('SEASON_NUMBER')
-                components = compute_similarity(player_data, comp_data, stats_groups, weight=0.8)
-                if components is not None:
-                    nba_similarity_results[comp_player] = components
-        
-        # Process HOF players
-        hof_similarity_results = {}
-        valid_hof_players = get_valid_players(hof_df, player_data, stats_groups)
-        print(f"Found {len(valid_hof_players)} HOF players with complete stats")
-        
-        for comp_player in valid_hof_players:
-            comp_data = hof_df[hof_df['PLAYER_NAME'] == comp_player].sort_values('SEASON_NUMBER')
-            components = compute_similarity(player_data, comp_data, stats_groups, weight=0.8)
-            if components is not None:
-                hof_similarity_results[comp_player] = components
+    for player_name, matches, num_seasons in results:
+        sorted_nba_results, sorted_hof_results = matches['nba'], matches['hof']
+
+        if not league:
+            print(f"\nAnalyzing {player_name}'s first {num_seasons} seasons...")
+            print(f"Found {nba_index.count(num_seasons, exclude=player_name)} current NBA players with complete stats")
+            print(f"Found {hof_index.count(num_seasons)} HOF players with complete stats")
+
+            # Print results
+            print_similarity_results(sorted_nba_results, "current NBA players", num_seasons)
+            print_similarity_results(sorted_hof_results, "Hall of Fame players", num_seasons)
 
-        # Sort results
-        sorted_nba_results = sorted(nba_similarity_results.items(), key=lambda x: x[1]['overall'])
-        sorted_hof_results = sorted(hof_similarity_results.items(), key=lambda x: x[1]['overall'])
-        
-        # Print results
-        print_similarity_results(sorted_nba_results, "current NBA players", num_seasons)
-        print_similarity_results(sorted_hof_results, "Hall of Fame players", num_seasons)
-        
         # Store results
         all_comparisons[player_name] = (sorted_nba_results, sorted_hof_results, num_seasons)
-    
+
     # Save all results to a single CSV
-    output_file = save_all_comparisons(all_comparisons)
+    filename = 'league_player_comparisons.csv' if league else 'all_player_comparisons.csv'
+    output_file = save_all_comparisons(all_comparisons, filename=filename)
     print(f"\nAnalysis complete! All results saved to: {output_file}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Find the most similar NBA and Hall of Fame careers')
+    parser.add_argument('--workers', type=int, default=COMPARISON_WORKERS,
+                        help='Worker processes for the comparisons (1 = no process pool)')
+    parser.add_argument('--league', action='store_true',
+                        help='Compare every current NBA player instead of only the Wolves roster')
+    args = parser.parse_args()
+    main(workers=args.workers, league=args.league)
@@ -1,9 +1,17 @@
 from nba_api.stats.endpoints import playercareerstats
 from nba_api.stats.static import players
+import argparse
 import pandas as pd
-import time
 import os
 import requests
+import sys
+import time
+
+# Add the parent directory to the path so we can import from utils; importing
+# it routes nba_api calls through the shared on-disk response cache
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+from career_harvester import refresh_career_stats
 from hall_of_fame_list import fetch_nba_hall_of_fame_players
 import signal
 from contextlib import contextmanager
@@ -93,12 +101,25 @@ def get_advanced_stats(player_name):
     }
     """ % player_name
 
+    limiter = utils.get_rate_limiter()
     try:
-        response = requests.post(
-            url,
-            json={'query': query, 'variables': {}},
-            headers={'Content-Type': 'application/json'}
-        )
+        limiter.acquire(url)
+        started = time.monotonic()
+        try:
+            response = requests.post(
+                url,
+                json={'query': query, 'variables': {}},
+                headers={'Content-Type': 'application/json'},
+                timeout=30
+            )
+        except requests.RequestException:
+            # Timeouts and dropped connections back the host off too
+            limiter.record_failure(url)
+            raise
+        if response.ok:
+            limiter.record_success(url, time.monotonic() - started)
+        else:
+            limiter.record_failure(url)
         response.raise_for_status()
         data = response.json()
         return data.get('data', {}).get('playerAdvanced', [])
@@ -202,7 +223,7 @@ def clean_player_name(name):
     
     return name
 
-def get_hof_year_by_year_stats():
+def get_hof_year_by_year_stats(full=False):
     # Create output directory if it doesn't exist
     output_dir = 'career_stats'
     if not os.path.exists(output_dir):
@@ -220,74 +241,58 @@ def get_hof_year_by_year_stats():
         print(f"Error fetching HOF players: {e}")
         return
     
-    # List to store all player stats
-    all_player_stats = []
+    # Resolve player IDs up front (local lookup, no API calls)
     failed_players = []
+    hof_rows = []
+    for player in hof_players:
+        player_name = player['Name']
+        player_id = find_player_id(player_name)
+        if player_id:
+            hof_rows.append({'PLAYER_ID': player_id, 'PLAYER': player_name, 'Year': player['Year']})
+        else:
+            failed_players.append(f"{player_name} - No player ID found")
+            print(f"Could not find player ID for {player_name}")
     
-    # Get career stats for each HOF player
-    total_players = len(hof_players)
-    for i, player in enumerate(hof_players, 1):
+    def fetch_hof_player(player):
         try:
-            player_name = player['Name']
-            print(f"\nStarting to process {i}/{total_players}: {player_name}")
-            
-            print(f"Looking up player ID for {player_name}")
-            player_id = find_player_id(player_name)
-            
-            if player_id:
-                print(f"Found ID {player_id} for {player_name}")
-                
-                try:
-                    with timeout(30):  # Add timeout for the entire stats gathering process
-                        stats = get_player_career_stats(player_id, player_name)
-                except TimeoutError:
-                    print(f"Timeout while getting stats for {player_name}")
-                    failed_players.append(f"{player_name} - Timeout while getting stats")
-                    continue
-                
-                if stats is not None:
-                    stats['HOF_INDUCTION_YEAR'] = player['Year']
-                    all_player_stats.append(stats)
-                    print(f"Successfully processed {player_name}")
-                else:
-                    failed_players.append(f"{player_name} - No stats found")
-            else:
-                failed_players.append(f"{player_name} - No player ID found")
-                print(f"Could not find player ID for {player_name}")
-            
-            print(f"Sleeping for rate limit after {player_name}")
-            time.sleep(1)
-            print(f"Finished processing {player_name}")
-            
-        except Exception as e:
-            print(f"Error processing {player_name}: {e}")
-            failed_players.append(f"{player_name} - Error: {str(e)}")
-            continue
+            with timeout(30):  # Add timeout for the entire stats gathering process
+                stats = get_player_career_stats(player['PLAYER_ID'], player['PLAYER'])
+        except TimeoutError:
+            print(f"Timeout while getting stats for {player['PLAYER']}")
+            return None
+        if stats is not None:
+            stats['HOF_INDUCTION_YEAR'] = player['Year']
+        return stats
     
-    if all_player_stats:
-        try:
-            # Combine all player stats into one DataFrame
-            combined_stats = pd.concat(all_player_stats, ignore_index=True)
-            
-            # Save combined stats to CSV
-            filename = os.path.join(output_dir, 'hof_players_career_stats.csv')
-            combined_stats.to_csv(filename, index=False)
-            print(f"\nSaved combined stats to {filename}")
-            
-            # Save list of failed players
-            if failed_players:
-                failed_filename = os.path.join(output_dir, 'failed_players.txt')
-                with open(failed_filename, 'w') as f:
-                    f.write('\n'.join(failed_players))
-                print(f"Saved list of {len(failed_players)} failed players to {failed_filename}")
-                
-            print(f"\nProcessed {len(all_player_stats)} players successfully")
-            print(f"Failed to process {len(failed_players)} players")
-            
-        except Exception as e:
-            print(f"Error saving results: {e}")
-    else:
-        print("No player stats were collected")
+    # Hall of Fame careers are over: once fetched they are frozen, so later
+    # runs only fetch newly inducted players
+    filename = os.path.join(output_dir, 'hof_players_career_stats.csv')
+    try:
+        refreshed, no_stats = refresh_career_stats(
+            pd.DataFrame(hof_rows, columns=['PLAYER_ID', 'PLAYER', 'Year']),
+            fetch_hof_player,
+            filename,
+            extra_columns=['HOF_INDUCTION_YEAR'],
+            freeze_all=True,
+            full=full
+        )
+    except Exception as e:
+        print(f"Error saving results: {e}")
+        return
+    failed_players.extend(f"{name} - No stats found" for name in no_stats)
+    
+    # Save list of failed players
+    if failed_players:
+        failed_filename = os.path.join(output_dir, 'failed_players.txt')
+        with open(failed_filename, 'w') as f:
+            f.write('\n'.join(failed_players))
+        print(f"Saved list of {len(failed_players)} failed players to {failed_filename}")
+    
+    print(f"\nFetched {refreshed - len(no_stats)} players")
+    print(f"Failed to process {len(failed_players)} players")
 
 if __name__ == "__main__":
-    get_hof_year_by_year_stats()
+    parser = argparse.ArgumentParser(description='Refresh career stats for Hall of Fame players')
+    parser.add_argument('--full', action='store_true', help='Re-fetch every player, including frozen careers')
+    args = parser.parse_args()
+    get_hof_year_by_year_stats(full=args.full)
@@ -1,10 +1,10 @@
 from nba_api.stats.endpoints import playercareerstats, commonallplayers
 from nba_api.stats.static import teams
-import pandas as pd
-import time
+import argparse
 import os
 import requests
 from wolves_year_by_year_stats import get_wolves_roster, get_advanced_stats, get_player_career_stats
+from career_harvester import refresh_career_stats, HARVEST_MAX_WORKERS
 
 def get_all_active_players():
     """Get all active NBA players"""
@@ -42,8 +42,13 @@ def get_non_wolves_players():
     
     return non_wolves
 
-def get_nba_year_by_year_stats():
-    """Get career stats for all non-Wolves NBA players"""
+def get_nba_year_by_year_stats(max_workers=HARVEST_MAX_WORKERS, full=False):
+    """Get career stats for all non-Wolves NBA players
+    
+    Only players who are new or played since the last run are re-fetched
+    (all of them with full=True). Players are fetched concurrently and
+    checkpointed, so an interrupted run picks up where it stopped.
+    """
     # Create output directory if it doesn't exist
     output_dir = 'career_stats'
     if not os.path.exists(output_dir):
@@ -53,36 +58,14 @@ def get_nba_year_by_year_stats():
     players = get_non_wolves_players()
     print(f"Found {len(players)} non-Wolves players to process")
     
-    # List to store all player stats
-    all_player_stats = []
-    failed_players = []
-    
-    # Get career stats for each player
-    total_players = len(players)
-    for idx, (_, player) in enumerate(players.iterrows(), 1):
-        player_id = player['PLAYER_ID']
-        player_name = player['PLAYER']
-        
-        print(f"Processing {idx}/{total_players}: {player_name}")
-        
-        stats = get_player_career_stats(player_id, player_name)
-        
-        if stats is not None:
-            all_player_stats.append(stats)
-        else:
-            failed_players.append(player_name)
-        
-        # Sleep to avoid hitting API rate limits
-        time.sleep(1)
-    
-    if all_player_stats:
-        # Combine all player stats into one DataFrame
-        combined_stats = pd.concat(all_player_stats, ignore_index=True)
-        
-        # Save combined stats to CSV
-        filename = os.path.join(output_dir, 'nba_all_players_career_stats.csv')
-        combined_stats.to_csv(filename, index=False)
-        print(f"\nSaved stats for {len(all_player_stats)} players to {filename}")
+    filename = os.path.join(output_dir, 'nba_all_players_career_stats.csv')
+    _, failed_players = refresh_career_stats(
+        players,
+        lambda player: get_player_career_stats(player['PLAYER_ID'], player['PLAYER']),
+        filename,
+        full=full,
+        max_workers=max_workers
+    )
     
     # Save failed players to a text file
     if failed_players:
@@ -92,4 +75,7 @@ def get_nba_year_by_year_stats():
         print(f"Failed to get stats for {len(failed_players)} players. See {failed_filename}")
 
 if __name__ == "__main__":
-    get_nba_year_by_year_stats()
+    parser = argparse.ArgumentParser(description='Refresh career stats for all non-Wolves NBA players')
+    parser.add_argument('--full', action='store_true', help='Re-fetch every player instead of only those who played')
+    args = parser.parse_args()
+    get_nba_year_by_year_stats(full=args.full)
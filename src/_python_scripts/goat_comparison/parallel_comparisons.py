@@ -0,0 +1,114 @@
+"""Multi-process comparison runs.
+
+Fans per-player comparison queries out over a process pool. The candidate
+trajectory tensors are copied once into shared memory and every worker maps
+them as NumPy views, so no worker holds its own copy of the NBA/HOF data;
+only the selected player's (seasons x stats) array travels with each task.
+"""
+import os
+from multiprocessing import Pool, shared_memory
+import numpy as np
+from similarity_engine import PERFORMANCE_WEIGHT
+from trajectory_index import TrajectoryIndex
+
+# Worker processes for comparison runs
+COMPARISON_WORKERS = int(os.environ.get('COMPARISON_WORKERS', os.cpu_count() or 1))
+
+# Tasks handed to a worker at a time
+TASK_CHUNK_SIZE = 8
+
+# Per-process state set by _init_worker
+_indexes = {}
+_settings = {}
+_segments = []
+
+def share_index(index):
+    """Copy an index's trajectories into shared memory.
+
+    Returns:
+        tuple: (SharedMemory to close/unlink when done, picklable spec for attach_index)
+    """
+    segment = shared_memory.SharedMemory(create=True, size=max(index.trajectories.nbytes, 1))
+    shared = np.ndarray(index.trajectories.shape, dtype=index.trajectories.dtype, buffer=segment.buf)
+    shared[...] = index.trajectories
+    spec = {
+        'segment': segment.name,
+        'shape': index.trajectories.shape,
+        'dtype': index.trajectories.dtype.str,
+        'names': index.names,
+        'player_ids': index.player_ids,
+        'valid_seasons': index.valid_seasons,
+        'stats': index.stats,
+        'hashes': index.hashes
+    }
+    return segment, spec
+
+def attach_index(spec):
+    """Rebuild a TrajectoryIndex over shared trajectories in another process."""
+    # Pool workers share the parent's resource tracker, which unlinks the
+    # segment only if the parent never does
+    segment = shared_memory.SharedMemory(name=spec['segment'])
+    trajectories = np.ndarray(spec['shape'], dtype=spec['dtype'], buffer=segment.buf)
+    trajectories.flags.writeable = False
+    index = TrajectoryIndex(spec['names'], spec['player_ids'], trajectories, spec['valid_seasons'],
+                            spec['stats'], spec['hashes'])
+    return segment, index
+
+def _init_worker(specs, settings):
+    for pool_name, spec in specs.items():
+        segment, index = attach_index(spec)
+        _segments.append(segment)
+        _indexes[pool_name] = index
+    _settings.update(settings)
+
+def _compare(task):
+    player_name, selected = task
+    results = {
+        pool_name: index.top_k(selected, _settings['stats_groups'], k=_settings['k'],
+                               weight=_settings['weight'],
+                               exclude=player_name if pool_name in _settings['exclude_self'] else None)
+        for pool_name, index in _indexes.items()
+    }
+    return player_name, results, len(selected)
+
+def run_comparisons(tasks, indexes, stats_groups, workers=COMPARISON_WORKERS, k=10, weight=PERFORMANCE_WEIGHT,
+                    exclude_self=None):
+    """Compare many players against every candidate pool.
+
+    Args:
+        tasks (list): (player_name, (seasons, stats) array) per selected player
+        indexes (dict): Pool name -> TrajectoryIndex
+        stats_groups (dict): Group name -> stat columns
+        workers (int): Worker processes; 1 runs in this process
+        k (int): Matches kept per pool
+        weight (float): Weight of performance vs. growth within a group
+        exclude_self (iterable, optional): Pools the selected player is left
+            out of; all pools when not given
+
+    Returns:
+        list: (player_name, {pool: [(name, scores), ...]}, num_seasons) in task order
+    """
+    settings = {
+        'stats_groups': stats_groups,
+        'k': k,
+        'weight': weight,
+        'exclude_self': set(indexes if exclude_self is None else exclude_self)
+    }
+    if workers <= 1 or len(tasks) <= 1:
+        _indexes.clear()
+        _indexes.update(indexes)
+        _settings.update(settings)
+        return [_compare(task) for task in tasks]
+
+    segments, specs = [], {}
+    try:
+        for pool_name, index in indexes.items():
+            segment, specs[pool_name] = share_index(index)
+            segments.append(segment)
+        with Pool(min(workers, len(tasks)), initializer=_init_worker,
+                  initargs=(specs, settings)) as pool:
+            return pool.map(_compare, tasks, chunksize=TASK_CHUNK_SIZE)
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
@@ -0,0 +1,144 @@
+"""Batched career-similarity engine.
+
+Stacks the first N seasons of every candidate into a (players x seasons x
+stats) array and scores all of them against one selected player in a few
+NumPy operations instead of one pandas pipeline per candidate.
+
+Scores are the same as fitting a StandardScaler on each selected/candidate
+pair: the pair mean cancels out of every season and growth difference, so
+only the pair's per-stat standard deviation matters, and that is computed
+for all candidates at once.
+"""
+import numpy as np
+import pandas as pd
+
+# Stat groups compared (per-game volume, shooting efficiency, advanced impact)
+STATS_GROUPS = {
+    'basic': ['MIN_PER_GAME', 'PTS_PER_GAME', 'AST_PER_GAME', 'REB_PER_GAME',
+             'STL_PER_GAME', 'BLK_PER_GAME', 'TOV_PER_GAME'],
+    'shooting': ['FG_PCT', 'FG3_PCT', 'FT_PCT', 'TS_PCT'],
+    'advanced': ['USG_PCT', 'AST_PCT', 'BPM', 'WS_PER_48', 'VORP']
+}
+
+# Weight of each stat group in the overall score (advanced counts double)
+GROUP_WEIGHTS = {'basic': 0.25, 'shooting': 0.25, 'advanced': 0.5}
+
+# Weight of season-by-season performance vs. growth within a group
+PERFORMANCE_WEIGHT = 0.8
+
+def group_stats(stats_groups):
+    """Return every stat of the groups, in the order used by the tensors."""
+    return [stat for stats in stats_groups.values() for stat in stats]
+
+def stack_first_seasons(df, stats, num_seasons, exclude=None):
+    """Stack the first num_seasons seasons of every eligible player.
+
+    A player is eligible when their first num_seasons rows are seasons
+    1..num_seasons with finite values for every stat.
+
+    Args:
+        df (pd.DataFrame): Career stats with PLAYER_NAME and SEASON_NUMBER
+        stats (list): Stat columns, in tensor order
+        num_seasons (int): Seasons per player
+        exclude (str, optional): Player name to leave out (e.g. the selected player)
+
+    Returns:
+        tuple: (array of player names in order of first appearance,
+            array of shape (players, num_seasons, stats))
+    """
+    names = pd.unique(df['PLAYER_NAME'])
+    codes = pd.Categorical(df['PLAYER_NAME'], categories=names).codes
+    order = np.lexsort((df['SEASON_NUMBER'].to_numpy(), codes))
+    codes = codes[order]
+
+    # Position of each row within its player's career
+    rank = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+    first = rank < num_seasons
+    player = codes[first]
+    values = df[stats].to_numpy(dtype=np.float64)[order][first]
+    seasons = df['SEASON_NUMBER'].to_numpy()[order][first]
+
+    bad_row = (seasons != rank[first] + 1) | ~np.isfinite(values).all(axis=1)
+    counts = np.bincount(player, minlength=len(names))
+    bad = np.bincount(player, weights=bad_row, minlength=len(names))
+    valid = (counts == num_seasons) & (bad == 0)
+    if exclude is not None:
+        valid &= names != exclude
+
+    tensor = values[valid[player]].reshape(-1, num_seasons, len(stats))
+    return names[valid], tensor
+
+def _pair_scale(selected, candidates):
+    """Per-candidate, per-stat scale of StandardScaler fit on selected + candidate."""
+    n = 2 * selected.shape[0]
+    mean = (selected.sum(axis=0) + candidates.sum(axis=1)) / n
+    var = (((selected - mean[:, None, :]) ** 2).sum(axis=1) +
+           ((candidates - mean[:, None, :]) ** 2).sum(axis=1)) / n
+
+    # StandardScaler leaves (near-)constant features unscaled
+    eps = np.finfo(np.float64).eps
+    constant = var <= n * eps * var + (n * mean * eps) ** 2
+    return np.where(constant, 1.0, np.sqrt(var))
+
+def score_candidates(selected, candidates, stats_groups, weight=PERFORMANCE_WEIGHT, group_weights=None):
+    """Score every candidate against the selected player (lower = more similar).
+
+    Args:
+        selected (np.ndarray): (seasons, stats) for the selected player
+        candidates (np.ndarray): (players, seasons, stats) in the same stat order
+        stats_groups (dict): Group name -> stat columns, in tensor order
+        weight (float): Weight of performance vs. growth within a group
+        group_weights (dict, optional): Group name -> weight in the overall score
+
+    Returns:
+        dict: Component name -> array over candidates: {group}_perf,
+            {group}_growth, {group}_combined and overall
+    """
+    group_weights = GROUP_WEIGHTS if group_weights is None else group_weights
+    scaled_diff = (candidates - selected) / _pair_scale(selected, candidates)[:, None, :]
+    growth_diff = np.abs(scaled_diff[:, -1] - scaled_diff[:, 0])
+
+    components = {}
+    overall = np.zeros(len(candidates))
+    start = 0
+    for group_name, stats in stats_groups.items():
+        columns = slice(start, start + len(stats))
+        start += len(stats)
+
+        performance = np.sqrt((scaled_diff[:, :, columns] ** 2).sum(axis=2)).mean(axis=1)
+        growth = growth_diff[:, columns].mean(axis=1)
+        combined = weight * performance + (1 - weight) * growth
+
+        components[f"{group_name}_perf"] = performance
+        components[f"{group_name}_growth"] = growth
+        components[f"{group_name}_combined"] = combined
+        overall = overall + group_weights.get(group_name, 0) * combined
+
+    components['overall'] = overall
+    return components
+
+def rank_candidates(names, components):
+    """Return [(name, {component: score}), ...] sorted by overall score."""
+    order = np.argsort(components['overall'], kind='stable')
+    return [
+        (names[i], {key: float(values[i]) for key, values in components.items()})
+        for i in order
+    ]
+
+def compare_player(player_data, pool_df, stats_groups, weight=PERFORMANCE_WEIGHT, exclude=None):
+    """Rank a pool of players by similarity to one player's career so far.
+
+    Args:
+        player_data (pd.DataFrame): The selected player's seasons, in order
+        pool_df (pd.DataFrame): Career stats of the candidate pool
+        stats_groups (dict): Group name -> stat columns
+        weight (float): Weight of performance vs. growth within a group
+        exclude (str, optional): Player name to leave out of the pool
+
+    Returns:
+        list: [(name, {component: score}), ...] sorted by overall score
+    """
+    stats = group_stats(stats_groups)
+    names, candidates = stack_first_seasons(pool_df, stats, len(player_data), exclude=exclude)
+    selected = player_data[stats].to_numpy(dtype=np.float64)
+    return rank_candidates(names, score_candidates(selected, candidates, stats_groups, weight))
@@ -0,0 +1,259 @@
+"""Precomputed career-trajectory index for similarity queries.
+
+For each career-stats table the index keeps every player's season-by-season
+feature vectors in one padded (players x seasons x stats) array, plus the
+number of leading seasons that are usable for comparisons (consecutive from
+season 1, every stat finite). The first-N matrix for any N is a slice of
+that array and its validity mask is `valid_seasons >= N`, so a query never
+rescans the career frames.
+
+The index is saved next to its table as `<table>.index.npz`. It is reused
+as long as the table is unchanged; after a refresh only players whose rows
+changed are recomputed.
+
+Queries score candidates with the exact similarity_engine metric (brute
+force over the masked slice, then an argpartition top-k). The metric
+normalizes each selected/candidate pair separately, so a KD-tree over
+fixed vectors could not reproduce its scores.
+"""
+import logging
+import os
+import numpy as np
+import pandas as pd
+from career_store import load_career_stats, store_paths
+from similarity_engine import PERFORMANCE_WEIGHT, STATS_GROUPS, group_stats, score_candidates
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+def index_path(path):
+    """Return the index file kept next to a career-stats table."""
+    root, _ = os.path.splitext(path)
+    return f"{root}.index.npz"
+
+def table_signature(path):
+    """Cheap change marker for a career-stats table: (files, newest mtime in ns)."""
+    parquet_dir, csv_file = store_paths(path)
+    if os.path.isdir(parquet_dir):
+        files = [os.path.join(parquet_dir, name) for name in os.listdir(parquet_dir) if name.endswith('.parquet')]
+    else:
+        files = [csv_file] if os.path.exists(csv_file) else []
+    if not files:
+        return None
+    return f"{len(files)}:{max(os.stat(f).st_mtime_ns for f in files)}"
+
+def _player_hashes(df, codes, num_players, stats):
+    """Order-independent fingerprint of each player's rows."""
+    row_hashes = pd.util.hash_pandas_object(df[['SEASON_NUMBER'] + stats], index=False).to_numpy()
+    hashes = np.zeros(num_players, dtype=np.uint64)
+    np.add.at(hashes, codes, row_hashes)
+    return hashes
+
+def _trajectories(df, stats):
+    """Build padded trajectories and valid season counts for every player in df."""
+    names = pd.unique(df['PLAYER_NAME'])
+    codes = pd.Categorical(df['PLAYER_NAME'], categories=names).codes
+    order = np.lexsort((df['SEASON_NUMBER'].to_numpy(), codes))
+    codes = codes[order]
+    rank = pd.Series(codes).groupby(codes).cumcount().to_numpy()
+    values = df[stats].to_numpy(dtype=np.float64)[order]
+    seasons = df['SEASON_NUMBER'].to_numpy()[order]
+
+    # Usable seasons end at the first gap or non-finite stat
+    ok = (seasons == rank + 1) & np.isfinite(values).all(axis=1)
+    valid_seasons = np.bincount(codes, minlength=len(names))
+    np.minimum.at(valid_seasons, codes[~ok], rank[~ok])
+
+    keep = rank < valid_seasons[codes]
+    max_seasons = int(valid_seasons.max()) if len(names) else 0
+    trajectories = np.full((len(names), max_seasons, len(stats)), np.nan)
+    trajectories[codes[keep], rank[keep]] = values[keep]
+
+    if 'PLAYER_ID' in df.columns:
+        player_ids = df.groupby('PLAYER_NAME', sort=False)['PLAYER_ID'].first().reindex(names)
+        player_ids = player_ids.fillna(-1).to_numpy(dtype=np.int64)
+    else:
+        player_ids = np.full(len(names), -1, dtype=np.int64)
+
+    return names, player_ids, trajectories, valid_seasons
+
+class TrajectoryIndex:
+    """First-N-season trajectories of every player in one career-stats table."""
+
+    def __init__(self, names, player_ids, trajectories, valid_seasons, stats, hashes, signature=None):
+        self.names = np.asarray(names, dtype=str)
+        self.player_ids = player_ids
+        self.trajectories = trajectories
+        self.valid_seasons = valid_seasons
+        self.stats = list(stats)
+        self.hashes = hashes
+        self.signature = signature
+        self._positions = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def max_seasons(self):
+        return self.trajectories.shape[1]
+
+    def mask(self, num_seasons, exclude=None):
+        """Players whose first num_seasons seasons can be compared."""
+        mask = self.valid_seasons >= num_seasons
+        if exclude is not None and exclude in self._positions:
+            mask[self._positions[exclude]] = False
+        return mask
+
+    def count(self, num_seasons, exclude=None):
+        return int(self.mask(num_seasons, exclude).sum())
+
+    def candidates(self, num_seasons, exclude=None):
+        """Return (names, (players, num_seasons, stats) array) of comparable players."""
+        mask = self.mask(num_seasons, exclude)
+        if num_seasons > self.max_seasons:
+            return self.names[mask], np.empty((0, num_seasons, len(self.stats)))
+        return self.names[mask], self.trajectories[mask, :num_seasons]
+
+    def position(self, name=None, player_id=None):
+        """Row of a player by name or id, or None."""
+        if name is not None:
+            return self._positions.get(name)
+        matches = np.flatnonzero(self.player_ids == int(player_id))
+        return int(matches[0]) if len(matches) else None
+
+    def trajectory(self, position, num_seasons=None):
+        """Usable seasons of one player, optionally only the first num_seasons."""
+        num_seasons = self.valid_seasons[position] if num_seasons is None else num_seasons
+        if num_seasons > self.valid_seasons[position]:
+            return None
+        return self.trajectories[position, :num_seasons]
+
+    def top_k(self, selected, stats_groups=STATS_GROUPS, k=10, weight=PERFORMANCE_WEIGHT,
+              group_weights=None, exclude=None):
+        """Return the k most similar players to a selected trajectory.
+
+        Args:
+            selected (np.ndarray): (seasons, stats) in the index's stat order
+            stats_groups (dict): Group name -> stat columns (same stats as the index)
+            k (int): Number of matches; None for all
+            weight (float): Weight of performance vs. growth within a group
+            group_weights (dict, optional): Group name -> weight in the overall score
+            exclude (str, optional): Player name to leave out
+
+        Returns:
+            list: [(name, {component: score}), ...] sorted by overall score
+        """
+        if group_stats(stats_groups) != self.stats:
+            raise ValueError("stats_groups do not match the stats of the index")
+
+        names, candidates = self.candidates(len(selected), exclude)
+        components = score_candidates(selected, candidates, stats_groups, weight, group_weights)
+        overall = components['overall']
+
+        top = np.arange(len(overall))
+        if k is not None and k < len(overall):
+            # Everything up to the k-th score, so ties at the cut keep table order
+            kth = np.partition(overall, k - 1)[k - 1]
+            top = np.flatnonzero(overall <= kth)
+        top = top[np.lexsort((top, overall[top]))][:k]
+
+        return [
+            (names[i], {key: float(values[i]) for key, values in components.items()})
+            for i in top
+        ]
+
+    def save(self, path):
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, version=INDEX_VERSION, names=self.names, player_ids=self.player_ids,
+                 trajectories=self.trajectories, valid_seasons=self.valid_seasons,
+                 stats=np.asarray(self.stats), hashes=self.hashes,
+                 signature=np.asarray(self.signature or ''))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load a saved index, or None if it is missing or from another version."""
+        try:
+            with np.load(path) as data:
+                if int(data['version']) != INDEX_VERSION:
+                    return None
+                return cls(data['names'], data['player_ids'], data['trajectories'], data['valid_seasons'],
+                           data['stats'].tolist(), data['hashes'], str(data['signature']) or None)
+        except (OSError, KeyError, ValueError):
+            return None
+
+def build_index(df, stats, previous=None):
+    """Build a trajectory index, reusing unchanged players from a previous index.
+
+    Args:
+        df (pd.DataFrame): Career stats with PLAYER_NAME, SEASON_NUMBER, the
+            stats and optionally PLAYER_ID
+        stats (list): Stat columns, in tensor order
+        previous (TrajectoryIndex, optional): Earlier index of the same table
+
+    Returns:
+        TrajectoryIndex: Players in order of first appearance in df
+    """
+    names = pd.unique(df['PLAYER_NAME'])
+    codes = pd.Categorical(df['PLAYER_NAME'], categories=names).codes
+    hashes = _player_hashes(df, codes, len(names), stats)
+
+    reuse = np.zeros(len(names), dtype=bool)
+    if previous is not None and previous.stats == list(stats):
+        prev_pos = np.array([previous._positions.get(name, -1) for name in names], dtype=np.int64)
+        known = prev_pos >= 0
+        reuse[known] = previous.hashes[prev_pos[known]] == hashes[known]
+
+    changed = ~reuse
+    new_names, new_ids, new_traj, new_valid = _trajectories(df[changed[codes]], stats)
+
+    max_seasons = max(new_traj.shape[1], int(previous.valid_seasons[prev_pos[reuse]].max()) if reuse.any() else 0)
+    trajectories = np.full((len(names), max_seasons, len(stats)), np.nan)
+    valid_seasons = np.zeros(len(names), dtype=np.int64)
+    player_ids = np.full(len(names), -1, dtype=np.int64)
+
+    if reuse.any():
+        source = prev_pos[reuse]
+        width = min(max_seasons, previous.max_seasons)
+        trajectories[reuse, :width] = previous.trajectories[source, :width]
+        valid_seasons[reuse] = previous.valid_seasons[source]
+        player_ids[reuse] = previous.player_ids[source]
+
+    new_pos = np.flatnonzero(changed)  # _trajectories keeps first-appearance order
+    trajectories[new_pos, :new_traj.shape[1]] = new_traj
+    valid_seasons[new_pos] = new_valid
+    player_ids[new_pos] = new_ids
+
+    logger.info(f"Trajectory index: {int(changed.sum())} of {len(names)} players rebuilt")
+    return TrajectoryIndex(names, player_ids, trajectories, valid_seasons, stats, hashes)
+
+def load_trajectory_index(path, stats_groups=STATS_GROUPS, rebuild=True):
+    """Load the trajectory index of a career-stats table, updating it if the table changed.
+
+    Args:
+        path (str): Career-stats table path (see career_store)
+        stats_groups (dict): Group name -> stat columns the index covers
+        rebuild (bool): Update a stale index from the table; if False a
+            stale index is returned as is
+
+    Returns:
+        TrajectoryIndex or None: None if the table has never been written
+    """
+    stats = group_stats(stats_groups)
+    saved_path = index_path(path)
+    signature = table_signature(path)
+    previous = TrajectoryIndex.load(saved_path) if os.path.exists(saved_path) else None
+    if previous is not None and previous.stats != stats:
+        previous = None
+
+    if previous is not None and (previous.signature == signature or not rebuild):
+        return previous
+    if signature is None:
+        return None
+
+    df = load_career_stats(path, ['PLAYER_ID', 'PLAYER_NAME', 'SEASON_NUMBER'] + stats)
+    index = build_index(df, stats, previous)
+    index.signature = signature
+    index.save(saved_path)
+    return index
@@ -1,9 +1,17 @@
 from nba_api.stats.endpoints import playercareerstats, commonteamroster
 from nba_api.stats.static import teams
+import argparse
 import pandas as pd
-import time
 import os
 import requests
+import sys
+import time
+
+# Add the parent directory to the path so we can import from utils; importing
+# it routes nba_api calls through the shared on-disk response cache
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+from career_harvester import refresh_career_stats
 
 def get_wolves_roster():
     # Get Timberwolves team ID
@@ -57,15 +65,28 @@ def get_advanced_stats(player_name):
     }
     """ % player_name
 
+    limiter = utils.get_rate_limiter()
     try:
-        response = requests.post(
-            url,
-            json={
-                'query': query,
-                'variables': {}
-            },
-            headers={'Content-Type': 'application/json'}
-        )
+        limiter.acquire(url)
+        started = time.monotonic()
+        try:
+            response = requests.post(
+                url,
+                json={
+                    'query': query,
+                    'variables': {}
+                },
+                headers={'Content-Type': 'application/json'},
+                timeout=30
+            )
+        except requests.RequestException:
+            # Timeouts and dropped connections back the host off too
+            limiter.record_failure(url)
+            raise
+        if response.ok:
+            limiter.record_success(url, time.monotonic() - started)
+        else:
+            limiter.record_failure(url)
         response.raise_for_status()
         data = response.json()
         return data.get('data', {}).get('playerAdvanced', [])
@@ -75,8 +96,8 @@ def get_advanced_stats(player_name):
 
 def get_player_career_stats(player_id, player_name):
     try:
-        # Get career stats
-        career = playercareerstats.PlayerCareerStats(player_id=player_id)
+        # Get career stats (retried with the shared rate limiter's backoff)
+        career = utils.api_call_with_retry(lambda: playercareerstats.PlayerCareerStats(player_id=player_id))
         
         # Regular season stats
         regular_season = career.get_data_frames()[0]
@@ -156,7 +177,12 @@ def get_player_career_stats(player_id, player_name):
         print(f"Error getting stats for {player_name}: {e}")
         return None
 
-def get_wolves_year_by_year_stats():
+def get_wolves_year_by_year_stats(full=False):
+    """Refresh career stats for the current Wolves roster.
+    
+    Only players who are new to the roster or played since the last run are
+    re-fetched, unless full=True.
+    """
     # Create output directory if it doesn't exist
     output_dir = 'career_stats'
     if not os.path.exists(output_dir):
@@ -165,32 +191,16 @@ def get_wolves_year_by_year_stats():
     # Get current Wolves roster
     roster = get_wolves_roster()
     
-    # List to store all player stats
-    all_player_stats = []
-    
-    # Get career stats for each player
-    for _, player in roster.iterrows():
-        player_id = player['PLAYER_ID']
-        player_name = player['PLAYER']
-        
-        print(f"Getting stats for {player_name}...")
-        
-        stats = get_player_career_stats(player_id, player_name)
-        
-        if stats is not None:
-            all_player_stats.append(stats)
-        
-        # Sleep to avoid hitting API rate limits
-        time.sleep(1)
-    
-    if all_player_stats:
-        # Combine all player stats into one DataFrame
-        combined_stats = pd.concat(all_player_stats, ignore_index=True)
-        
-        # Save combined stats to CSV
-        filename = os.path.join(output_dir, 'wolves_all_players_career_stats.csv')
-        combined_stats.to_csv(filename, index=False)
-        print(f"Saved combined stats to {filename}")
+    filename = os.path.join(output_dir, 'wolves_all_players_career_stats.csv')
+    refresh_career_stats(
+        roster,
+        lambda player: get_player_career_stats(player['PLAYER_ID'], player['PLAYER']),
+        filename,
+        full=full
+    )
 
 if __name__ == "__main__":
-    get_wolves_year_by_year_stats()
+    parser = argparse.ArgumentParser(description='Refresh career stats for the Timberwolves roster')
+    parser.add_argument('--full', action='store_true', help='Re-fetch every player instead of only those who played')
+    args = parser.parse_args()
+    get_wolves_year_by_year_stats(full=args.full)
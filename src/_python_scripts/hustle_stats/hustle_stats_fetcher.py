@@ -8,9 +8,9 @@ import os
 import sys
 import logging
 import random
-import time
 from datetime import datetime
 from typing import Dict, List, Optional
+import pandas as pd
 from http.client import RemoteDisconnected
 from requests.exceptions import RequestException
 
@@ -18,15 +18,15 @@ from requests.exceptions import RequestException
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
-    from supabase import create_client, Client
     from nba_api.stats.endpoints import leaguehustlestatsplayer
     from utils.nba_api_utils import api_call_with_retry
+    from utils.supabase_utils import get_supabase_client, sync_partition
 except ImportError:
     print("Installing required packages...")
     os.system("pip install supabase nba-api")
-    from supabase import create_client, Client
     from nba_api.stats.endpoints import leaguehustlestatsplayer
     from utils.nba_api_utils import api_call_with_retry
+    from utils.supabase_utils import get_supabase_client, sync_partition
 
 # Configure logging
 logging.basicConfig(
@@ -49,7 +49,7 @@ class HustleStatsFetcher:
             print("Error: SUPABASE_URL and SUPABASE_ANON_KEY environment variables are required")
             sys.exit(1)
         
-        self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+        self.supabase = get_supabase_client()
         
     def fetch_hustle_stats(self, season: str = "2024-25", season_type: str = "Regular Season") -> List[Dict]:
         """
@@ -191,7 +191,6 @@ class HustleStatsFetcher:
                 'season': '2024-25',  # Current season
                 'season_type': 'Regular Season',
                 'per_mode': per_mode,
-                'created_at': datetime.now().isoformat(),
                 'updated_at': datetime.now().isoformat()
             }
             
@@ -214,20 +213,19 @@ class HustleStatsFetcher:
             return False
         
         try:
-            # Delete existing data for the same season/type/per_mode
-            season = data[0]['season']
-            season_type = data[0]['season_type']
-            per_mode = data[0]['per_mode']
-            
-            print(f"Deleting existing hustle stats for {season} {season_type} {per_mode}...")
-            delete_result = self.supabase.table('hustle_stats').delete().eq('season', season).eq('season_type', season_type).eq('per_mode', per_mode).execute()
-            
-            # Insert new data
-            print(f"Inserting {len(data)} hustle stats records...")
-            insert_result = self.supabase.table('hustle_stats').insert(data).execute()
+            # Sync the season/type/per_mode partition: only players whose
+            # numbers changed are written, players who left it are deleted
+            partition = {
+                'season': data[0]['season'],
+                'season_type': data[0]['season_type'],
+                'per_mode': data[0]['per_mode']
+            }
             
-            if insert_result.data:
-                print(f"Successfully loaded {len(insert_result.data)} hustle stats records")
+            print(f"Syncing {len(data)} hustle stats records...")
+            if sync_partition(pd.DataFrame(data), 'hustle_stats',
+                              ['player_id', 'season', 'season_type', 'per_mode'], partition,
+                              ignore_columns=['updated_at'], client=self.supabase):
+                print(f"Successfully loaded {len(data)} hustle stats records")
                 return True
             else:
                 print("Failed to load hustle stats data")
@@ -244,7 +242,11 @@ class HustleStatsFetcher:
         Args:
             season: NBA season
             season_type: Season type
+            
+        Returns:
+            True if every fetched per-mode table was loaded, False otherwise
         """
+        loaded = True
         print("Starting Hustle Stats Fetcher...")
         print(f"Season: {season}")
         print(f"Season Type: {season_type}")
@@ -254,19 +256,18 @@ class HustleStatsFetcher:
         per_game_data = self.fetch_hustle_stats(season, season_type)
         if per_game_data:
             transformed_per_game = self.transform_hustle_data(per_game_data, "PerGame")
-            self.load_to_supabase(transformed_per_game)
-        
-        # Add a small delay between requests
-        time.sleep(2)
+            loaded = self.load_to_supabase(transformed_per_game) and loaded
+
         
         # Fetch Totals stats
         totals_data = self.fetch_hustle_stats_totals(season, season_type)
         if totals_data:
             transformed_totals = self.transform_hustle_data(totals_data, "Totals")
-            self.load_to_supabase(transformed_totals)
+            loaded = self.load_to_supabase(transformed_totals) and loaded
         
         print("-" * 50)
         print("Hustle Stats Fetcher completed!")
+        return loaded
 
 def main():
     """Main function"""
@@ -281,7 +282,8 @@ def main():
     
     # Create fetcher and run
     fetcher = HustleStatsFetcher()
-    fetcher.run()
+    if not fetcher.run():
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import fetch_nba_data_conditional
+
+logger = logging.getLogger(__name__)
+
+BOXSCORE_URL = "https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{game_id}.json"
+PLAY_BY_PLAY_URL = "https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_{game_id}.json"
+# gameStatus of a finished game in the live-data feeds
+GAME_STATUS_FINAL = 3
+
+LIVE_DATA_HEADERS = {
+    "Accept": "application/json",
+    "User-Agent": "Mozilla/5.0"
+}
+
+class GameSnapshot:
+    """Boxscore and play-by-play of one game, fetched once per tick.
+
+    Every in-game stage reads from the same snapshot so they all see the same
+    version of the game and no document is downloaded twice in a tick.
+    """
+
+    def __init__(self, game_id, boxscore, play_by_play, boxscore_modified=True, play_by_play_modified=True):
+        self.game_id = game_id
+        self.boxscore = boxscore or {}
+        self.play_by_play = play_by_play or {}
+        self.boxscore_modified = boxscore_modified
+        self.play_by_play_modified = play_by_play_modified
+
+    @classmethod
+    def fetch(cls, game_id, executor=None):
+        """Download the boxscore and play-by-play for a game concurrently.
+
+        Args:
+            game_id (str): NBA game ID
+            executor (Executor, optional): Pool to run the requests on. A
+                short-lived two-worker pool is used when not given.
+
+        Returns:
+            GameSnapshot: The snapshot for this tick
+        """
+        boxscore_url = BOXSCORE_URL.format(game_id=game_id)
+        pbp_url = PLAY_BY_PLAY_URL.format(game_id=game_id)
+        logger.info(f"Fetching live snapshot for game {game_id}")
+
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                return cls.fetch(game_id, executor=pool)
+
+        boxscore_future = executor.submit(fetch_nba_data_conditional, boxscore_url, LIVE_DATA_HEADERS)
+        pbp_future = executor.submit(fetch_nba_data_conditional, pbp_url, LIVE_DATA_HEADERS)
+        boxscore, boxscore_modified = boxscore_future.result()
+        play_by_play, play_by_play_modified = pbp_future.result()
+
+        return cls(game_id, boxscore, play_by_play, boxscore_modified, play_by_play_modified)
+
+    @classmethod
+    def fetch_many(cls, game_ids, executor):
+        """Download the live-data documents for several games at once.
+
+        All requests are submitted to the executor up front, so the number of
+        concurrent downloads is bounded by the executor's worker count.
+
+        Returns:
+            list: GameSnapshot per game whose documents could be fetched,
+                in the same order as game_ids
+        """
+        futures = []
+        for game_id in game_ids:
+            futures.append((
+                game_id,
+                executor.submit(fetch_nba_data_conditional, BOXSCORE_URL.format(game_id=game_id), LIVE_DATA_HEADERS),
+                executor.submit(fetch_nba_data_conditional, PLAY_BY_PLAY_URL.format(game_id=game_id), LIVE_DATA_HEADERS)
+            ))
+
+        snapshots = []
+        for game_id, boxscore_future, pbp_future in futures:
+            try:
+                boxscore, boxscore_modified = boxscore_future.result()
+                play_by_play, play_by_play_modified = pbp_future.result()
+            except Exception as e:
+                # Live documents are not published until shortly before tip-off
+                logger.warning(f"Skipping game {game_id}, live data unavailable: {str(e)}")
+                continue
+            snapshots.append(cls(game_id, boxscore, play_by_play, boxscore_modified, play_by_play_modified))
+        return snapshots
+
+    @classmethod
+    async def fetch_async(cls, game_id, executor=None):
+        """Async variant of fetch() for long-running pollers.
+
+        The two blocking downloads run on the executor (the loop's default
+        pool when not given) and are awaited together.
+        """
+        loop = asyncio.get_running_loop()
+        (boxscore, boxscore_modified), (play_by_play, play_by_play_modified) = await asyncio.gather(
+            loop.run_in_executor(executor, fetch_nba_data_conditional, BOXSCORE_URL.format(game_id=game_id), LIVE_DATA_HEADERS),
+            loop.run_in_executor(executor, fetch_nba_data_conditional, PLAY_BY_PLAY_URL.format(game_id=game_id), LIVE_DATA_HEADERS)
+        )
+        return cls(game_id, boxscore, play_by_play, boxscore_modified, play_by_play_modified)
+
+    @property
+    def game(self):
+        """The 'game' object of the boxscore."""
+        return self.boxscore.get('game', {})
+
+    @property
+    def actions(self):
+        """The list of play-by-play actions."""
+        return self.play_by_play.get('game', {}).get('actions', [])
+
+    @property
+    def modified(self):
+        """True if either document changed since the previous fetch."""
+        return self.boxscore_modified or self.play_by_play_modified
+
+    @property
+    def is_final(self):
+        """True once the boxscore reports the game as final."""
+        return self.game.get('gameStatus') == GAME_STATUS_FINAL
@@ -10,17 +10,25 @@ import pytz
 from nba_api.stats.endpoints import leaguegamefinder
 import csv
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils import (
     get_supabase_client,
     load_to_supabase as utils_load_to_supabase,
+    replace_partition,
+    delete_keys,
+    fetch_table_rows,
     fetch_nba_data,
     execute_sql,
     test_supabase_connection as utils_test_supabase_connection
 )
+from game_snapshot import GameSnapshot
+from lineup_engine import build_lineup_stints
+from stint_stats import compute_lineup_stats
 
 # Configure logging first
 logging.basicConfig(level=logging.INFO)
@@ -32,231 +40,263 @@ load_dotenv()
 # Initialize Supabase client
 supabase = get_supabase_client()
 
+# Tables written by the in-game pipeline; every row carries its game_id
+IN_GAME_TABLES = ["in_game_info", "in_game_play_by_play", "in_game_lineups", "in_game_player_stats",
+                  "in_game_lineup_stats"]
+
+# Teams whose games are tracked (comma-separated tricodes, or ALL)
+IN_GAME_TEAMS = os.environ.get('IN_GAME_TEAMS', 'MIN')
+
+# Upper bound on concurrent HTTP fetches / stage runs across games
+MAX_GAME_WORKERS = int(os.environ.get('IN_GAME_MAX_WORKERS', 8))
+
 def save_to_supabase(df, table_name="in_game_player_stats"):
+    """Save a game's player stats; returns True if they were written."""
     if df.empty:
         logger.warning("No data to upload to Supabase.")
-        return
+        return False
 
     try:
-        # Clear ALL existing data from the table
-        # in_game_player_stats uses 'Player' as primary key, not 'id'
-        logger.info(f"Attempting to clear existing data from {table_name}...")
-        delete_result = supabase.table(table_name).delete().neq("Player", "NO_SUCH_PLAYER").execute()
-        logger.info(f"Delete result: {delete_result}")
-        logger.info(f"Cleared all existing data from {table_name}")
-        
-        # Then load the new data
-        utils_load_to_supabase(df, table_name)
+        # Swap in only this game's rows so other tracked games are untouched
+        # and readers never see the game's box score empty mid-write
+        game_id = df['game_id'].iloc[0]
+        if not replace_partition(df, table_name, ["game_id", "Player"], {"game_id": game_id}, client=supabase):
+            return False
         logger.info(f"Successfully saved player stats to {table_name}")
+        return True
     except Exception as e:
         logger.error(f"Error saving player stats: {str(e)}")
         import traceback
         traceback.print_exc()
+        return False
 
 def save_game_info_to_supabase(game_info, table_name="in_game_info"):
+    """Upsert a game's info row; returns True if it was written."""
     if not game_info:
         logger.warning("No game info to upload to Supabase.")
-        return
+        return False
 
     try:
         logger.info(f"Saving game info to {table_name}")
-        # Clear ALL existing data from the table
-        supabase.table(table_name).delete().gte("id", 0).execute()
-        logger.info(f"Cleared all existing data from {table_name}")
-        
-        supabase.table(table_name).insert(game_info).execute()
+        supabase.table(table_name).upsert(game_info, on_conflict="game_id").execute()
         logger.info(f"Successfully saved game info to {table_name}")
+        return True
     except Exception as e:
         logger.error(f"Error saving game info: {str(e)}")
         import traceback
         traceback.print_exc()
+        return False
+
+# Highest actionNumber, newest 'edited' timestamp and the actionNumbers
+# persisted per game, so warm invocations only upsert actions that are new or
+# were corrected and delete the ones the feed has dropped.
+_pbp_state = {}
+
+# On a cold start we only know the persisted high-water mark, so re-send this
+# many trailing actions to pick up scorer corrections made while we were down.
+PBP_EDIT_LOOKBACK = 25
+
+def _build_play_row(game_id, play):
+    """Convert a live play-by-play action into an in_game_play_by_play row."""
+    period = play.get('period', 1)
+    clock = play.get('clock', '12:00')
+    minutes, seconds = map(int, clock.split(':')) if ':' in clock else (0, 0)
+    time_seconds = (4 - period) * 12 * 60 + minutes * 60 + seconds if period <= 4 else -(period - 4) * 5 * 60 + minutes * 60 + seconds
+
+    return {
+        'game_id': game_id,
+        'event_num': play.get('actionNumber', 0),
+        'clock': clock,
+        'period': period,
+        'event_type': play.get('actionType', ''),
+        'description': play.get('description', ''),
+        'home_score': play.get('scoreHome', 0),
+        'away_score': play.get('scoreAway', 0),
+        'team_tricode': play.get('teamTricode', ''),
+        'player_name': play.get('playerNameI', ''),
+        'is_scoring_play': play.get('isScoreChange', False),
+        'score_margin': play.get('scoreMargin', 0),
+        'time_seconds': time_seconds
+    }
 
-def fetch_and_save_play_by_play(game_id, table_name="in_game_play_by_play"):
+def _get_persisted_pbp_high_water(game_id, table_name):
+    """Return the highest event_num already stored for a game (0 if none)."""
+    result = supabase.table(table_name).select('event_num').eq('game_id', game_id) \
+        .order('event_num', desc=True).limit(1).execute()
+    if result.data:
+        return int(result.data[0]['event_num'])
+    return 0
+
+def _previous_event_nums(game_id, table_name):
+    """Return the event_nums persisted for a game by the last tick (read back on a cold start)."""
+    state = _pbp_state.get(game_id)
+    if state is not None:
+        return state['event_nums']
+    rows = fetch_table_rows(table_name, 'event_num', {'game_id': game_id}, supabase, order_by=['event_num'])
+    return {int(row['event_num']) for row in rows}
+
+def _remember_pbp_state(game_id, plays_data):
+    """Record the actions just persisted for a game."""
+    _pbp_state[game_id] = {
+        'max_event_num': max(p.get('actionNumber', 0) for p in plays_data),
+        'last_edited': max((p.get('edited') or '') for p in plays_data),
+        'event_nums': {int(p.get('actionNumber', 0)) for p in plays_data}
+    }
+
+def _select_changed_actions(game_id, plays_data, table_name):
+    """Pick the actions that are new or edited since the last persisted tick."""
+    state = _pbp_state.get(game_id)
+    if state is None:
+        high_water = _get_persisted_pbp_high_water(game_id, table_name)
+        cutoff = high_water - PBP_EDIT_LOOKBACK
+        logger.info(f"Resuming play-by-play for game {game_id} from event {high_water}")
+        return [p for p in plays_data if p.get('actionNumber', 0) > cutoff]
+
+    return [
+        p for p in plays_data
+        if p.get('actionNumber', 0) > state['max_event_num']
+        or (p.get('edited') or '') > state['last_edited']
+    ]
+
+def fetch_and_save_play_by_play(game_id, table_name="in_game_play_by_play", incremental=True, snapshot=None,
+                                force=False):
+    """Fetch live play-by-play and persist it to Supabase.
+
+    In incremental mode only actions that are new or edited since the last
+    tick are upserted (keyed on game_id, event_num), and actions the feed no
+    longer carries (scorer deletions) are deleted. With incremental=False
+    the table is wiped and the whole game is reloaded. Pass the tick's
+    GameSnapshot to reuse its play-by-play instead of downloading it again;
+    an unchanged play-by-play is skipped unless force is set.
+
+    Returns:
+        bool: True if the table is up to date with the feed
+    """
     try:
-        url = f"https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_{game_id}.json"
-        headers = {
-            "Accept": "application/json",
-            "User-Agent": "Mozilla/5.0"
-        }
-        
-        logger.info(f"Fetching play-by-play for game {game_id}")
-        data = fetch_nba_data(url, headers)
-
-        plays_data = data.get('game', {}).get('actions', [])
+        if snapshot is None:
+            snapshot = GameSnapshot.fetch(game_id)
+
+        if incremental and not force and not snapshot.play_by_play_modified and game_id in _pbp_state:
+            logger.info("Play-by-play unchanged since last tick, skipping.")
+            return True
+
+        plays_data = snapshot.actions
         if not plays_data:
             logger.warning("No play-by-play data found.")
-            return
-
-        plays = []
-        for play in plays_data:
-            period = play.get('period', 1)
-            clock = play.get('clock', '12:00')
-            minutes, seconds = map(int, clock.split(':')) if ':' in clock else (0, 0)
-            time_seconds = (4 - period) * 12 * 60 + minutes * 60 + seconds if period <= 4 else -(period - 4) * 5 * 60 + minutes * 60 + seconds
-
-            plays.append({
-                'game_id': game_id,
-                'event_num': play.get('actionNumber', 0),
-                'clock': clock,
-                'period': period,
-                'event_type': play.get('actionType', ''),
-                'description': play.get('description', ''),
-                'home_score': play.get('scoreHome', 0),
-                'away_score': play.get('scoreAway', 0),
-                'team_tricode': play.get('teamTricode', ''),
-                'player_name': play.get('playerNameI', ''),
-                'is_scoring_play': play.get('isScoreChange', False),
-                'score_margin': play.get('scoreMargin', 0),
-                'time_seconds': time_seconds
-            })
-
-        if plays:
-            logger.info(f"Saving {len(plays)} play-by-play events to {table_name}")
-            # Clear ALL existing data from the table
-            supabase.table(table_name).delete().gte("id", 0).execute()
-            logger.info(f"Cleared all existing data from {table_name}")
-            
-            # Convert to DataFrame and use utility function
-            plays_df = pd.DataFrame(plays)
-            utils_load_to_supabase(plays_df, table_name)
-            
-            logger.info(f"Successfully saved play-by-play to {table_name}")
-        else:
-            logger.warning("No play-by-play events to save.")
+            return True
+
+        if incremental:
+            previous_event_nums = _previous_event_nums(game_id, table_name)
+            changed = _select_changed_actions(game_id, plays_data, table_name)
+            if changed:
+                plays_df = pd.DataFrame([_build_play_row(game_id, play) for play in changed])
+                logger.info(f"Upserting {len(plays_df)} of {len(plays_data)} play-by-play events to {table_name}")
+                if not utils_load_to_supabase(plays_df, table_name, on_conflict="game_id,event_num"):
+                    # Leave the high-water mark untouched so the next tick retries
+                    return False
+            else:
+                logger.info("No new or edited play-by-play events since last tick.")
+
+            event_nums = {int(p.get('actionNumber', 0)) for p in plays_data}
+            vanished = sorted(previous_event_nums - event_nums)
+            if vanished:
+                logger.info(f"Deleting {len(vanished)} play-by-play events removed from the feed")
+                delete_keys(table_name, ['event_num'], [(num,) for num in vanished], {'game_id': game_id},
+                            client=supabase)
+
+            _remember_pbp_state(game_id, plays_data)
+            return True
+
+        plays = [_build_play_row(game_id, play) for play in plays_data]
+
+        logger.info(f"Saving {len(plays)} play-by-play events to {table_name}")
+        _pbp_state.pop(game_id, None)
+
+        plays_df = pd.DataFrame(plays)
+        if not replace_partition(plays_df, table_name, ["game_id", "event_num"], {"game_id": game_id},
+                                 client=supabase):
+            return False
+        logger.info(f"Successfully saved play-by-play to {table_name}")
+        _remember_pbp_state(game_id, plays_data)
+        return True
 
     except Exception as e:
         logger.error(f"Error fetching or saving play-by-play: {str(e)}")
         import traceback
         traceback.print_exc()
+        return False
+
+def fetch_and_save_lineups(game_id, table_name="in_game_lineups", snapshot=None, history=False, stints=None):
+    """Track and save lineups for a game.
 
-def fetch_and_save_lineups(game_id, table_name="in_game_lineups"):
-    """Track and save current lineups throughout the game."""
+    Lineups are rebuilt from the substitution stream by the lineup engine
+    (or taken from already-built stints). By default only each team's
+    current lineup is saved; with history=True one row per lineup stint is
+    written instead. Returns True unless the write failed.
+    """
     try:
-        # 1. Get boxscore for starters
-        boxscore_url = f"https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{game_id}.json"
-        boxscore = fetch_nba_data(boxscore_url, headers={"Accept": "application/json", "User-Agent": "Mozilla/5.0"})
-        home_team = boxscore['game']['homeTeam']
-        away_team = boxscore['game']['awayTeam']
-
-
-        # Get starters robustly (ensure only 5, fallback to first 5 if needed)
-        home_lineup = [p for p in home_team['players'] if p.get('starter') is True]
-        if len(home_lineup) != 5:
-            logger.warning(f"Home starters not found or not 5, using first 5 players.")
-            home_lineup = home_team['players'][:5]
-        else:
-            home_lineup = home_lineup[:5]
-        away_lineup = [p for p in away_team['players'] if p.get('starter') is True]
-        if len(away_lineup) != 5:
-            logger.warning(f"Away starters not found or not 5, using first 5 players.")
-            away_lineup = away_team['players'][:5]
-        else:
-            away_lineup = away_lineup[:5]
-
-        current_lineup = {
-            home_team['teamTricode']: set(str(p['personId']) for p in home_lineup),
-            away_team['teamTricode']: set(str(p['personId']) for p in away_lineup)
-        }
-        player_id_to_name = {str(p['personId']): f"{p['firstName']} {p['familyName']}" for p in home_team['players'] + away_team['players']}
-
-        # Track the last 5 'in' events for each team (for recovery when lineup size is wrong)
-        recent_in_players = {
-            home_team['teamTricode']: [str(p['personId']) for p in home_lineup],
-            away_team['teamTricode']: [str(p['personId']) for p in away_lineup]
-        }
-
-        # 2. Process play-by-play for substitutions
-        pbp_url = f"https://cdn.nba.com/static/json/liveData/playbyplay/playbyplay_{game_id}.json"
-        pbp = fetch_nba_data(pbp_url, headers={"Accept": "application/json", "User-Agent": "Mozilla/5.0"})
-        plays = pbp.get('game', {}).get('actions', [])
-        lineup_snapshots = []
-        
-        current_period = 0
-        period_change_count = 0
-
-        # Process plays - save snapshot for EVERY play, then process substitutions
-        logger.info(f"Processing {len(plays)} plays for lineup tracking...")
-
-        for play_idx, play in enumerate(plays):
-            period = play.get('period', 1)
-            clock = play.get('clock', '')
-            event_num = play.get('actionNumber', 0)
-
-            # Save current lineup snapshot for both teams at this play
-            for team in [home_team['teamTricode'], away_team['teamTricode']]:
-                lineup_snapshots.append({
-                    'game_id': game_id,
-                    'team_tricode': team,
-                    'period': period,
-                    'clock': clock,
-                    'event_num': event_num,
-                    'player_ids': ','.join(sorted(current_lineup[team])),
-                    'player_names': ','.join([player_id_to_name[pid] for pid in current_lineup[team] if pid and pid in player_id_to_name])
-                })
-
-            # Handle substitutions
-            if play.get('actionType') == 'substitution':
-                team = play.get('teamTricode')
-                person_id = str(play.get('personId'))
-                sub_type = play.get('subType')
-                if team in current_lineup and person_id and person_id != 'None':
-                    if sub_type == 'out':
-                        current_lineup[team].discard(person_id)
-                    elif sub_type == 'in':
-                        current_lineup[team].add(person_id)
-                        recent_in_players[team].append(person_id)
-                        # Keep only the last 5
-                        if len(recent_in_players[team]) > 5:
-                            recent_in_players[team] = recent_in_players[team][-5:]
-                    # After every substitution, if lineup != 5, fix it
-                    if len(current_lineup[team]) != 5:
-                        # Use the last 5 'in' players
-                        current_lineup[team] = set(recent_in_players[team][-5:])
-                else:
-                    logger.warning(f"Invalid substitution event: {play}")
-
-            # At the start of a period, reset lineup to last 5 'in' players if needed
-            if play.get('actionType') == 'substitution' and 'startperiod' in play.get('qualifiers', []):
-                team = play.get('teamTricode')
-                if team in current_lineup:
-                    current_lineup[team] = set(recent_in_players[team][-5:])
-
-        # 3. Save to Supabase
-        if lineup_snapshots:
-            # Get the latest snapshot for each team (the last one for each team)
-            latest_snapshots = {}
-            for snapshot in reversed(lineup_snapshots):
-                team = snapshot['team_tricode']
-                if team not in latest_snapshots:
-                    latest_snapshots[team] = snapshot
-
-            final_snapshots = list(latest_snapshots.values())
-            logger.info(f"Saving {len(final_snapshots)} latest lineup snapshots to {table_name}")
-
-            # Debug: Show what we're saving
-            for snapshot in final_snapshots:
-                team = snapshot['team_tricode']
-                names = snapshot['player_names']
-                logger.info(f"  Final {team} lineup: {names}")
-
-            # Clear ALL existing data from the table
-            supabase.table(table_name).delete().gte("id", 0).execute()
-            logger.info(f"Cleared all existing data from {table_name}")
-
-            # Convert to DataFrame and use utility function
-            lineups_df = pd.DataFrame(final_snapshots)
-            utils_load_to_supabase(lineups_df, table_name)
-
-            logger.info(f"Saved {len(final_snapshots)} latest lineup snapshots to {table_name}")
+        if snapshot is None:
+            snapshot = GameSnapshot.fetch(game_id)
 
+        if stints is None:
+            logger.info(f"Processing {len(snapshot.actions)} plays for lineup tracking...")
+            stints = build_lineup_stints(snapshot)
+        lineup_rows = stints.to_records(history=history)
+
+        if lineup_rows:
+            logger.info(f"Saving {len(lineup_rows)} lineup rows to {table_name}")
+
+            if not history:
+                for row in lineup_rows:
+                    logger.info(f"  Final {row['team_tricode']} lineup: {row['player_names']}")
+
+            lineups_df = pd.DataFrame(lineup_rows)
+            if not replace_partition(lineups_df, table_name, ["game_id", "team_tricode", "event_num"],
+                                     {"game_id": game_id}, client=supabase):
+                return False
+            logger.info(f"Saved {len(lineup_rows)} lineup rows to {table_name}")
+        return True
 
     except Exception as e:
         logger.error(f"Error fetching/saving lineups: {str(e)}")
         import traceback
         traceback.print_exc()
+        return False
 
-def get_today_game_id():
-    """Check today's live scoreboard and get Timberwolves game ID if they are playing today."""
+def fetch_and_save_lineup_stats(game_id, table_name="in_game_lineup_stats", snapshot=None, stints=None):
+    """Compute live 5-man and two-man lineup ratings and save them.
+
+    Points for/against, estimated possessions and seconds are attributed to
+    each unit and pair from the play-by-play; the game's rows are replaced
+    on every tick by swapping in the new rows and dropping vanished groups.
+    Returns True unless the write failed.
+    """
+    try:
+        if snapshot is None:
+            snapshot = GameSnapshot.fetch(game_id)
+        if stints is None:
+            stints = build_lineup_stints(snapshot)
+
+        stats_df = compute_lineup_stats(snapshot, stints)
+        if stats_df.empty:
+            logger.warning("No lineup stats to save.")
+            return True
+
+        # Ratings are undefined for units without a possession yet
+        stats_df = stats_df.astype(object).where(pd.notna(stats_df), None)
+
+        logger.info(f"Saving {len(stats_df)} lineup stat rows to {table_name}")
+        return replace_partition(stats_df, table_name, ["game_id", "team_tricode", "group_id"],
+                                 {"game_id": game_id}, client=supabase)
+
+    except Exception as e:
+        logger.error(f"Error computing/saving lineup stats: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def get_today_games():
+    """Fetch today's live scoreboard and return its list of games."""
     eastern = pytz.timezone('US/Eastern')
     today = datetime.now(eastern).strftime('%Y-%m-%d')
 
@@ -271,24 +311,46 @@ def get_today_game_id():
 
     if not scoreboard_data or 'scoreboard' not in scoreboard_data:
         logger.error("Failed to retrieve NBA live scoreboard.")
-        return None
+        return []
 
     games_today = scoreboard_data['scoreboard'].get('games', [])
 
     if not games_today:
         logger.info("No NBA games today.")
-        return None
 
-    logger.info(f"Found {len(games_today)} games today. Checking for Timberwolves...")
+    return games_today
+
+def get_today_game_ids(teams=None):
+    """Return the IDs of today's games involving any of the given teams.
+
+    Args:
+        teams (str or list, optional): Team tricodes, a comma-separated string
+            of them, or 'ALL' for every game. Defaults to IN_GAME_TEAMS.
 
-    for game in games_today:
+    Returns:
+        list: Game IDs in scoreboard order
+    """
+    teams = teams or IN_GAME_TEAMS
+    if isinstance(teams, str):
+        teams = [t.strip().upper() for t in teams.split(',') if t.strip()]
+    track_all = 'ALL' in teams
+
+    game_ids = []
+    for game in get_today_games():
         home_team = game.get('homeTeam', {}).get('teamTricode', '')
         away_team = game.get('awayTeam', {}).get('teamTricode', '')
-        game_id = game.get('gameId', None)
+        if track_all or home_team in teams or away_team in teams:
+            game_ids.append(game.get('gameId'))
+
+    logger.info(f"Tracking {len(game_ids)} games today for teams {','.join(teams)}")
+    return game_ids
 
-        if 'MIN' in (home_team, away_team):
-            logger.info(f"Found Timberwolves game! Game ID: {game_id}")
-            return game_id
+def get_today_game_id():
+    """Check today's live scoreboard and get Timberwolves game ID if they are playing today."""
+    game_ids = get_today_game_ids(['MIN'])
+    if game_ids:
+        logger.info(f"Found Timberwolves game! Game ID: {game_ids[0]}")
+        return game_ids[0]
 
     logger.info("Timberwolves are not playing today.")
     return None
@@ -307,66 +369,47 @@ def test_supabase_connection():
     """Test if we can connect to Supabase."""
     return utils_test_supabase_connection()
 
-def process_in_game_stats():
-    logger.info("Starting process: Fetching in-game stats...")
-
-    try:
-        test_supabase_connection()
-
-        game_id = get_today_game_id()
-        if not game_id:
-            logger.warning("No Timberwolves game today. Using most recent game instead...")
-            game_id = get_most_recent_game_id_any_type()
-            if not game_id:
-                logger.error("No recent Timberwolves games found. Exiting...")
-                return
-
-        url = f"https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{game_id}.json"
-        logger.info(f"Fetching boxscore from URL: {url}")
-        headers = {
-            "Accept": "application/json",
-            "User-Agent": "Mozilla/5.0"
-        }
-
-        data = fetch_nba_data(url, headers)
-
-        game_info = {
-            'game_id': game_id,
-            'game_status': data.get("game", {}).get("gameStatusText", str(data.get("game", {}).get("gameStatus", "Unknown"))),
-            'game_clock': data.get("game", {}).get("gameClock", ""),
-            'period': data.get("game", {}).get("period", 0),
-            'home_team': data.get("game", {}).get("homeTeam", {}).get("teamTricode", ""),
-            'away_team': data.get("game", {}).get("awayTeam", {}).get("teamTricode", ""),
-            'home_score': data.get("game", {}).get("homeTeam", {}).get("score", 0),
-            'away_score': data.get("game", {}).get("awayTeam", {}).get("score", 0),
-            'game_date': data.get("game", {}).get("gameTimeUTC", ""),
-            'arena': data.get("game", {}).get("arena", {}).get("arenaName", ""),
-            'city': data.get("game", {}).get("arena", {}).get("arenaCity", ""),
-            'is_halftime': data.get("game", {}).get("period", 0) == 2 and data.get("game", {}).get("gameClock", "") == "",
-            'is_end_of_period': data.get("game", {}).get("isEndOfPeriod", False)
-        }
-
-        save_game_info_to_supabase(game_info)
-        fetch_and_save_play_by_play(game_id)
-        fetch_and_save_lineups(game_id)
-
-        home_team = data.get("game", {}).get("homeTeam", {})
-        away_team = data.get("game", {}).get("awayTeam", {})
-
-        if home_team.get("teamTricode") == "MIN":
-            wolves_team = home_team
-            logger.info("Timberwolves are the home team.")
-        elif away_team.get("teamTricode") == "MIN":
-            wolves_team = away_team
-            logger.info("Timberwolves are the away team.")
-        else:
-            logger.warning("Minnesota Timberwolves not found in this game.")
-            return
+def build_game_info(snapshot):
+    """Build the in_game_info row from a snapshot's boxscore."""
+    game = snapshot.game
+    return {
+        'game_id': snapshot.game_id,
+        'game_status': game.get("gameStatusText", str(game.get("gameStatus", "Unknown"))),
+        'game_clock': game.get("gameClock", ""),
+        'period': game.get("period", 0),
+        'home_team': game.get("homeTeam", {}).get("teamTricode", ""),
+        'away_team': game.get("awayTeam", {}).get("teamTricode", ""),
+        'home_score': game.get("homeTeam", {}).get("score", 0),
+        'away_score': game.get("awayTeam", {}).get("score", 0),
+        'game_date': game.get("gameTimeUTC", ""),
+        'arena': game.get("arena", {}).get("arenaName", ""),
+        'city': game.get("arena", {}).get("arenaCity", ""),
+        'is_halftime': game.get("period", 0) == 2 and game.get("gameClock", "") == "",
+        'is_end_of_period': game.get("isEndOfPeriod", False)
+    }
 
-        players_data = []
-        for player in wolves_team.get("players", []):
+def build_player_stats(snapshot, team_tricode=None):
+    """Build the in_game_player_stats DataFrame for a snapshot.
+
+    Args:
+        snapshot (GameSnapshot): The tick's snapshot
+        team_tricode (str, optional): Only include this team's players.
+            Both teams are included by default.
+    """
+    teams = [snapshot.game.get("homeTeam", {}), snapshot.game.get("awayTeam", {})]
+    if team_tricode:
+        teams = [team for team in teams if team.get("teamTricode") == team_tricode]
+        if not teams:
+            logger.warning(f"{team_tricode} not found in this game.")
+            return pd.DataFrame()
+
+    players_data = []
+    for team in teams:
+        for player in team.get("players", []):
             stats = player.get("statistics", {})
             players_data.append({
+                'game_id': snapshot.game_id,
+                'team_tricode': team.get("teamTricode", ""),
                 'Player': f"{player.get('firstName', '')} {player.get('familyName', '')}",
                 'PTS': stats.get('points', 0),
                 'REB': stats.get('reboundsTotal', 0),
@@ -382,8 +425,128 @@ def process_in_game_stats():
                 'FTs': f"{stats.get('freeThrowsMade', 0)}-{stats.get('freeThrowsAttempted', 0)}"
             })
 
-        df = pd.DataFrame(players_data)
-        save_to_supabase(df)
+    return pd.DataFrame(players_data)
+
+# A 304 only says the document did not change since this process last
+# fetched it, not that the last write of it went through. Stages whose last
+# write failed are re-run on the next tick regardless, and every stage runs
+# once more when a game is first seen final.
+_failed_stages = {}
+_final_written = set()
+
+def has_pending_writes(snapshot):
+    """True if a stage of the game must run even though nothing changed."""
+    game_id = snapshot.game_id
+    return bool(_failed_stages.get(game_id)) or (snapshot.is_final and game_id not in _final_written)
+
+def run_game_stages(snapshot):
+    """Run every in-game stage against one snapshot of the game.
+
+    Returns:
+        bool: True if every stage that ran was written
+    """
+    game_id = snapshot.game_id
+    failed = _failed_stages.setdefault(game_id, set())
+    final = snapshot.is_final and game_id not in _final_written
+
+    def due(stage, modified):
+        return modified or final or stage in failed
+
+    def record(stage, written):
+        if written:
+            failed.discard(stage)
+        else:
+            failed.add(stage)
+
+    if due('game_info', snapshot.boxscore_modified):
+        record('game_info', save_game_info_to_supabase(build_game_info(snapshot)))
+    else:
+        # Nothing moved on the boxscore (timeout, review, halftime), so the
+        # game info and player stats rows are already current.
+        logger.info("Boxscore unchanged since last tick, skipping game info and player stats.")
+
+    if due('play_by_play', snapshot.play_by_play_modified) or game_id not in _pbp_state:
+        # The final tick reloads the whole game so no correction is left out
+        record('play_by_play', fetch_and_save_play_by_play(game_id, snapshot=snapshot, incremental=not final,
+                                                           force=True))
+
+    if due('lineups', snapshot.modified) or due('lineup_stats', snapshot.modified):
+        # A bad substitution stream only costs this tick's lineup rows; the
+        # player stats below are still written
+        try:
+            stints = build_lineup_stints(snapshot)
+        except Exception as e:
+            logger.error(f"Error building lineup stints for game {game_id}: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            stints = None
+        if stints is not None:
+            record('lineups', fetch_and_save_lineups(game_id, snapshot=snapshot, stints=stints))
+            record('lineup_stats', fetch_and_save_lineup_stats(game_id, snapshot=snapshot, stints=stints))
+        else:
+            record('lineups', False)
+            record('lineup_stats', False)
+
+    if due('player_stats', snapshot.boxscore_modified):
+        record('player_stats', save_to_supabase(build_player_stats(snapshot)))
+
+    if final and not failed:
+        _final_written.add(game_id)
+    return not failed
+
+# Game set that clear_stale_games last ran for in this process
+_cleared_game_ids = None
+
+def clear_stale_games(game_ids):
+    """Remove rows of games that are no longer tracked from every in-game table."""
+    global _cleared_game_ids
+    if _cleared_game_ids == set(game_ids):
+        return
+    _cleared_game_ids = set(game_ids)
+
+    for table_name in IN_GAME_TABLES:
+        try:
+            supabase.table(table_name).delete().not_.in_("game_id", list(game_ids)).execute()
+            logger.info(f"Cleared untracked games from {table_name}")
+        except Exception as e:
+            logger.error(f"Error clearing stale games from {table_name}: {str(e)}")
+
+def _run_game_stages_safely(snapshot):
+    """Run one game's stages without letting its failure stop other games."""
+    try:
+        run_game_stages(snapshot)
+    except Exception as e:
+        logger.error(f"Error processing game {snapshot.game_id}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+def process_games(game_ids, max_workers=MAX_GAME_WORKERS):
+    """Fetch and process several games concurrently on a bounded pool.
+
+    All live-data documents are fetched first (sharing the pooled HTTP
+    session), then each game's stages run on the same pool.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        snapshots = GameSnapshot.fetch_many(game_ids, pool)
+        list(pool.map(_run_game_stages_safely, snapshots))
+
+def process_in_game_stats(teams=None):
+    logger.info("Starting process: Fetching in-game stats...")
+
+    try:
+        test_supabase_connection()
+
+        game_ids = get_today_game_ids(teams)
+        if not game_ids:
+            logger.warning("No tracked games today. Using most recent Timberwolves game instead...")
+            game_id = get_most_recent_game_id_any_type()
+            if not game_id:
+                logger.error("No recent Timberwolves games found. Exiting...")
+                return
+            game_ids = [game_id]
+
+        clear_stale_games(game_ids)
+        process_games(game_ids)
 
         logger.info("Process completed successfully.")
 
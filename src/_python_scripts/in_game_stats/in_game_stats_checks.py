@@ -4,9 +4,12 @@ import azure.functions as func  # Required for Azure Functions
 import requests
 import pandas as pd
 import os
-from supabase import create_client
 from dotenv import load_dotenv
 import json
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_supabase_client
 
 # Configure logging first
 logging.basicConfig(level=logging.INFO)
@@ -16,7 +19,6 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 # Initialize Supabase client
-supabase_url = 'https://kuthirbcjtofsdwsfhkj.supabase.co'
 supabase_key = os.getenv('SUPABASE_KEY')
 
 # Print key info for debugging (first few characters only for security)
@@ -25,8 +27,7 @@ if supabase_key:
 else:
     logger.error("SUPABASE_KEY environment variable not found!")
 
-# Create client with explicit headers
-supabase = create_client(supabase_url, supabase_key)
+supabase = get_supabase_client()
 
 def fetch_nba_data(url, headers):
     response = requests.get(url, headers=headers)
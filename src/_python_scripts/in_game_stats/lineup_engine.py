@@ -0,0 +1,260 @@
+"""Lineup-stint reconstruction from live play-by-play.
+
+Turns the substitution stream of a game into compact on-court intervals
+("stints"): one row per team per stretch of play in which its five players
+did not change. Players are tracked as integer person IDs in NumPy arrays
+and names are only materialised when rows are produced for output.
+"""
+import logging
+import re
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_ISO_CLOCK = re.compile(r'PT(\d+)M([\d.]+)S')
+
+def parse_clock(clock):
+    """Convert a live-data game clock to seconds remaining in the period.
+
+    Accepts the ISO-8601 duration used by the live feeds ('PT10M22.00S') as
+    well as 'MM:SS'. Unparsable values count as 0.
+    """
+    if not clock:
+        return 0.0
+    match = _ISO_CLOCK.match(clock)
+    if match:
+        return int(match.group(1)) * 60 + float(match.group(2))
+    if ':' in clock:
+        minutes, seconds = clock.split(':', 1)
+        return int(minutes) * 60 + float(seconds)
+    return 0.0
+
+def _starters(team):
+    """Return the five starting person IDs of a boxscore team.
+
+    Falls back to the first five listed players; fewer than five are returned
+    only when the boxscore lists fewer players than that.
+    """
+    players = list(dict.fromkeys(int(p['personId']) for p in team.get('players', [])))
+    starters = list(dict.fromkeys(int(p['personId']) for p in team.get('players', [])
+                                  if p.get('starter') in (True, '1', 1)))
+    if len(starters) != 5:
+        logger.warning(f"{team.get('teamTricode')} starters not found or not 5, using first 5 players.")
+        starters = players[:5]
+    return starters
+
+class LineupStints:
+    """On-court intervals for both teams of one game.
+
+    All per-stint attributes are NumPy arrays of equal length:
+
+    - team: 0 for the home team, 1 for the away team
+    - period: period the stint was played in
+    - start_index / end_index: half-open range into the game's action list
+    - start_event / end_event: actionNumber of the first and last action
+    - start_clock / end_clock: seconds remaining in the period
+    - players: (n, 5) person IDs, sorted within each row
+
+    start_clock_text keeps the feed's clock string of each stint start for
+    output rows.
+    """
+
+    def __init__(self, game_id, team_tricodes, player_names, team, period, start_index, end_index,
+                 start_event, end_event, start_clock, end_clock, players, start_clock_text=None,
+                 last_action=None):
+        self.game_id = game_id
+        self.team_tricodes = team_tricodes
+        self.player_names = player_names
+        self.team = team
+        self.period = period
+        self.start_index = start_index
+        self.end_index = end_index
+        self.start_event = start_event
+        self.end_event = end_event
+        self.start_clock = start_clock
+        self.end_clock = end_clock
+        self.players = players
+        self.start_clock_text = start_clock_text or [''] * len(team)
+        self.last_action = last_action or {}
+
+    def __len__(self):
+        return len(self.team)
+
+    @property
+    def seconds(self):
+        """Game seconds elapsed during each stint."""
+        return self.start_clock - self.end_clock
+
+    def current_lineups(self):
+        """Return {team_tricode: array of 5 person IDs} for the latest stint of each team."""
+        lineups = {}
+        for team_idx, tricode in enumerate(self.team_tricodes):
+            rows = np.flatnonzero(self.team == team_idx)
+            if len(rows):
+                lineups[tricode] = self.players[rows[-1]]
+        return lineups
+
+    def _lineup_row(self, team_idx, players, period, clock, event_num):
+        # player_ids keeps the historical string-sorted order; names follow it
+        ids = sorted(str(pid) for pid in players)
+        return {
+            'game_id': self.game_id,
+            'team_tricode': self.team_tricodes[team_idx],
+            'period': int(period),
+            'clock': clock,
+            'event_num': int(event_num),
+            'player_ids': ','.join(ids),
+            'player_names': ','.join(self.player_names[int(pid)] for pid in ids if int(pid) in self.player_names)
+        }
+
+    def to_records(self, history=False):
+        """Materialise in_game_lineups rows.
+
+        Args:
+            history (bool): If True, return one row per stint stamped with the
+                stint's first action. Otherwise return only each team's current
+                lineup, stamped with the latest action of the game.
+
+        Returns:
+            list: Row dictionaries
+        """
+        if history:
+            return [
+                self._lineup_row(self.team[i], self.players[i], self.period[i],
+                                 self.start_clock_text[i], self.start_event[i])
+                for i in range(len(self))
+            ]
+
+        last = self.last_action
+        tricode_index = {tricode: idx for idx, tricode in enumerate(self.team_tricodes)}
+        return [
+            self._lineup_row(tricode_index[tricode], players, last.get('period', 1),
+                             last.get('clock', ''), last.get('actionNumber', 0))
+            for tricode, players in self.current_lineups().items()
+        ]
+
+def build_lineup_stints(snapshot):
+    """Reconstruct lineup stints for a game in one pass over its actions.
+
+    Substitutions that share a period and clock are applied as one batch, so
+    the usual "outs, then ins" sequence never leaves a team with four or six
+    players in between. If a batch still leaves a team without exactly five
+    players (missing events), the five most recently substituted-in players
+    are used instead. Stretches in which a team still cannot be given five
+    players are dropped rather than stored as a partial lineup.
+
+    Args:
+        snapshot (GameSnapshot): Snapshot with the boxscore and play-by-play
+
+    Returns:
+        LineupStints: Stints for both teams in chronological order
+    """
+    game = snapshot.game
+    home_team, away_team = game['homeTeam'], game['awayTeam']
+    team_tricodes = (home_team['teamTricode'], away_team['teamTricode'])
+    team_index = {tricode: idx for idx, tricode in enumerate(team_tricodes)}
+    player_names = {
+        int(p['personId']): f"{p['firstName']} {p['familyName']}"
+        for p in home_team.get('players', []) + away_team.get('players', [])
+    }
+
+    lineups = [set(_starters(home_team)), set(_starters(away_team))]
+    recent_in = [list(lineups[0]), list(lineups[1])]
+
+    actions = snapshot.actions
+    stints = []
+
+    # Open stint per team: (start_index, period, start clock string)
+    open_stint = [None, None]
+
+    def close_stint(team_idx, end_index, end_clock, players):
+        start_index, period, start_clock = open_stint[team_idx]
+        if end_index > start_index and len(players) != 5:
+            logger.warning(f"Dropping {team_tricodes[team_idx]} stint with {len(players)} players "
+                           f"from {start_clock}.")
+        elif end_index > start_index:
+            stints.append((
+                team_idx, period, start_index, end_index,
+                actions[start_index].get('actionNumber', 0), actions[end_index - 1].get('actionNumber', 0),
+                parse_clock(start_clock), parse_clock(end_clock), sorted(players), start_clock
+            ))
+        open_stint[team_idx] = None
+
+    # Per team, substitutions at the current clock not yet applied to a stint:
+    # (batch_start_index, period, clock, lineup before the batch)
+    pending = [None, None]
+
+    def settle(team_idx):
+        batch_start, period, clock, before = pending[team_idx]
+        pending[team_idx] = None
+        if len(lineups[team_idx]) != 5:
+            logger.warning(f"{team_tricodes[team_idx]} lineup has {len(lineups[team_idx])} players "
+                           f"after substitutions at {clock}, using last 5 subbed in.")
+            lineups[team_idx] = set(list(dict.fromkeys(reversed(recent_in[team_idx])))[:5])
+            if len(lineups[team_idx]) != 5:
+                logger.warning(f"{team_tricodes[team_idx]} has only {len(lineups[team_idx])} known players, "
+                               f"its stints are dropped until the next substitution.")
+        if lineups[team_idx] != before:
+            close_stint(team_idx, batch_start, clock, before)
+            open_stint[team_idx] = (batch_start, period, clock)
+
+    current_period = None
+    for i, play in enumerate(actions):
+        period = play.get('period', 1)
+        clock = play.get('clock', '')
+
+        # A batch ends once the clock moves on (free throws and the like can
+        # be logged between the outs and ins of one stoppage)
+        for team_idx in (0, 1):
+            if pending[team_idx] is not None and (pending[team_idx][1], pending[team_idx][2]) != (period, clock):
+                settle(team_idx)
+
+        if period != current_period:
+            for team_idx in (0, 1):
+                if open_stint[team_idx] is not None:
+                    close_stint(team_idx, i, actions[i - 1].get('clock', ''), lineups[team_idx])
+                open_stint[team_idx] = (i, period, clock)
+            current_period = period
+
+        if play.get('actionType') != 'substitution':
+            continue
+
+        team_idx = team_index.get(play.get('teamTricode'))
+        person_id = play.get('personId')
+        if team_idx is None or not person_id:
+            logger.warning(f"Invalid substitution event: {play}")
+            continue
+
+        if pending[team_idx] is None:
+            pending[team_idx] = (i, period, clock, set(lineups[team_idx]))
+        if play.get('subType') == 'out':
+            lineups[team_idx].discard(int(person_id))
+        elif play.get('subType') == 'in':
+            lineups[team_idx].add(int(person_id))
+            recent_in[team_idx].append(int(person_id))
+
+    for team_idx in (0, 1):
+        if pending[team_idx] is not None:
+            settle(team_idx)
+        if open_stint[team_idx] is not None:
+            close_stint(team_idx, len(actions), actions[-1].get('clock', ''), lineups[team_idx])
+
+    # Stints were closed per team; put them in chronological order
+    stints.sort(key=lambda stint: (stint[2], stint[0]))
+
+    return LineupStints(
+        game_id=snapshot.game_id,
+        team_tricodes=team_tricodes,
+        player_names=player_names,
+        team=np.array([s[0] for s in stints], dtype=np.int8),
+        period=np.array([s[1] for s in stints], dtype=np.int16),
+        start_index=np.array([s[2] for s in stints], dtype=np.int32),
+        end_index=np.array([s[3] for s in stints], dtype=np.int32),
+        start_event=np.array([s[4] for s in stints], dtype=np.int32),
+        end_event=np.array([s[5] for s in stints], dtype=np.int32),
+        start_clock=np.array([s[6] for s in stints], dtype=np.float32),
+        end_clock=np.array([s[7] for s in stints], dtype=np.float32),
+        players=np.array([s[8] for s in stints], dtype=np.int64).reshape(-1, 5),
+        start_clock_text=[s[9] for s in stints],
+        last_action=actions[-1] if actions else None
+    )
@@ -0,0 +1,126 @@
+"""Long-running live-game poller for the in-game stats pipeline.
+
+Instead of cold-starting a timer function on every tick, this keeps one
+process alive for the whole night: the games are resolved once, the Supabase
+client and HTTP connections stay warm, and each game's poll interval follows
+its state (fast during live play, slow before tip-off and at breaks, stop
+once the game is final). All games share one bounded worker pool.
+
+Usage:
+    python in_game_stats/live_game_poller.py
+    python in_game_stats/live_game_poller.py --teams ALL
+    python in_game_stats/live_game_poller.py --game-id 0022400123
+"""
+import argparse
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from game_snapshot import GameSnapshot
+from in_game_stats import (MAX_GAME_WORKERS, clear_stale_games, get_today_game_ids, has_pending_writes,
+                           run_game_stages)
+
+logger = logging.getLogger(__name__)
+
+# Poll intervals in seconds per game state
+LIVE_INTERVAL = 3
+BREAK_INTERVAL = 20
+PREGAME_INTERVAL = 60
+
+# Attempts at the final write before a finished game is given up on
+FINAL_WRITE_ATTEMPTS = 10
+
+# gameStatus values used by the NBA live-data feeds
+GAME_STATUS_PREGAME = 1
+GAME_STATUS_LIVE = 2
+GAME_STATUS_FINAL = 3
+
+def next_poll_interval(snapshot):
+    """Pick how long to wait before the next poll from the game state.
+
+    Returns:
+        float or None: Seconds to sleep, or None once the game is final
+    """
+    game = snapshot.game
+    status = game.get('gameStatus', GAME_STATUS_PREGAME)
+
+    if status == GAME_STATUS_FINAL:
+        return None
+    if status != GAME_STATUS_LIVE:
+        return PREGAME_INTERVAL
+    if game.get('isEndOfPeriod') or 'half' in str(game.get('gameStatusText', '')).lower():
+        return BREAK_INTERVAL
+    return LIVE_INTERVAL
+
+async def poll_game(game_id, executor):
+    """Drive the in-game stages for one game until it goes final.
+
+    Args:
+        game_id (str): NBA game ID
+        executor (ThreadPoolExecutor): Pool shared by the HTTP fetches and
+            the (blocking) Supabase writes
+    """
+    loop = asyncio.get_running_loop()
+    logger.info(f"Starting live poller for game {game_id}")
+    final_attempts = 0
+
+    while True:
+        try:
+            snapshot = await GameSnapshot.fetch_async(game_id, executor)
+        except Exception as e:
+            # The live boxscore is not published until shortly before tip-off
+            logger.warning(f"Could not fetch live data for game {game_id}: {str(e)}")
+            await asyncio.sleep(PREGAME_INTERVAL)
+            continue
+
+        # A failed write is retried even if the feed has not changed since
+        if snapshot.modified or has_pending_writes(snapshot):
+            try:
+                await loop.run_in_executor(executor, run_game_stages, snapshot)
+            except Exception as e:
+                logger.error(f"Error processing game {game_id}: {str(e)}")
+
+        interval = next_poll_interval(snapshot)
+        if interval is None:
+            final_attempts += 1
+            if not has_pending_writes(snapshot):
+                logger.info(f"Game {game_id} is final, stopping poller.")
+                return
+            if final_attempts >= FINAL_WRITE_ATTEMPTS:
+                logger.error(f"Game {game_id} is final but its last writes keep failing, stopping poller.")
+                return
+            interval = BREAK_INTERVAL
+
+        await asyncio.sleep(interval)
+
+async def run_poller(game_ids=None, teams=None, max_workers=MAX_GAME_WORKERS):
+    """Resolve today's games once and poll each until it is final.
+
+    Args:
+        game_ids (list, optional): Explicit game IDs to track
+        teams (str, optional): Team tricodes (comma-separated, or ALL) used to
+            pick games from today's scoreboard when game_ids is not given
+        max_workers (int): Size of the pool shared by all games
+    """
+    game_ids = game_ids or get_today_game_ids(teams)
+    if not game_ids:
+        logger.info("No games to track today. Exiting...")
+        return
+
+    clear_stale_games(game_ids)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        await asyncio.gather(*(poll_game(game_id, executor) for game_id in game_ids))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Poll live NBA data for games until they are final')
+    parser.add_argument('--game-id', type=str, action='append', dest='game_ids',
+                        help='NBA game ID to track (repeatable)')
+    parser.add_argument('--teams', type=str,
+                        help="Comma-separated team tricodes, or ALL (default: IN_GAME_TEAMS, 'MIN')")
+    args = parser.parse_args()
+
+    asyncio.run(run_poller(args.game_ids, args.teams))
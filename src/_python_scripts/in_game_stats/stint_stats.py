@@ -0,0 +1,151 @@
+"""Live lineup ratings from play-by-play.
+
+Attributes points, estimated possessions and seconds to every 5-man unit and
+every two-man pair on the floor, using the stints produced by the lineup
+engine. Everything is computed from the tick's snapshot in one linear scan,
+so in-game net ratings need no extra API calls (the season-level
+LeagueDashLineups numbers in lineups/ lag by a day).
+"""
+import logging
+from itertools import combinations
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Possession estimate weight for free-throw attempts (standard box-score formula)
+FTA_POSSESSION_WEIGHT = 0.44
+
+_PAIR_SLOTS = np.array(list(combinations(range(5), 2)))
+
+def _action_arrays(actions, team_tricodes):
+    """Extract per-action team, points and possession-usage arrays."""
+    n = len(actions)
+    team = np.full(n, -1, dtype=np.int8)
+    home_score = np.zeros(n, dtype=np.int32)
+    away_score = np.zeros(n, dtype=np.int32)
+    poss_used = np.zeros(n, dtype=np.float64)
+    team_index = {tricode: idx for idx, tricode in enumerate(team_tricodes)}
+
+    last_home, last_away = 0, 0
+    for i, play in enumerate(actions):
+        team[i] = team_index.get(play.get('teamTricode'), -1)
+        last_home = int(play.get('scoreHome') or last_home)
+        last_away = int(play.get('scoreAway') or last_away)
+        home_score[i] = last_home
+        away_score[i] = last_away
+
+        # Possessions ~= FGA + 0.44 * FTA - OREB + TOV
+        action_type = play.get('actionType')
+        if action_type in ('2pt', '3pt'):
+            poss_used[i] = 1.0
+        elif action_type == 'freethrow':
+            poss_used[i] = FTA_POSSESSION_WEIGHT
+        elif action_type == 'turnover':
+            poss_used[i] = 1.0
+        elif action_type == 'rebound' and play.get('subType') == 'offensive':
+            poss_used[i] = -1.0
+
+    home_points = np.diff(home_score, prepend=0)
+    away_points = np.diff(away_score, prepend=0)
+    return team, home_points, away_points, poss_used
+
+def compute_stint_totals(snapshot, stints):
+    """Sum points, possessions and seconds for every stint.
+
+    Args:
+        snapshot (GameSnapshot): Snapshot the stints were built from
+        stints (LineupStints): Output of build_lineup_stints
+
+    Returns:
+        dict: Arrays aligned with the stints: pts_for, pts_against,
+            poss_for, poss_against, seconds
+    """
+    actions = snapshot.actions
+    n_stints = len(stints)
+    totals = {key: np.zeros(n_stints) for key in ('pts_for', 'pts_against', 'poss_for', 'poss_against')}
+    totals['seconds'] = np.asarray(stints.seconds, dtype=np.float64)
+    if not actions or not n_stints:
+        return totals
+
+    team, home_points, away_points, poss_used = _action_arrays(actions, stints.team_tricodes)
+    points = (home_points, away_points)
+
+    for team_idx in (0, 1):
+        rows = np.flatnonzero(stints.team == team_idx)
+        # Stint row active for this team at every action index
+        stint_at = np.full(len(actions), -1, dtype=np.int64)
+        for row in rows:
+            stint_at[stints.start_index[row]:stints.end_index[row]] = row
+        covered = stint_at >= 0
+
+        np.add.at(totals['pts_for'], stint_at[covered], points[team_idx][covered])
+        np.add.at(totals['pts_against'], stint_at[covered], points[1 - team_idx][covered])
+
+        own = covered & (team == team_idx)
+        opp = covered & (team == 1 - team_idx)
+        np.add.at(totals['poss_for'], stint_at[own], poss_used[own])
+        np.add.at(totals['poss_against'], stint_at[opp], poss_used[opp])
+
+    return totals
+
+def _with_ratings(df):
+    df['plus_minus'] = df['pts_for'] - df['pts_against']
+    df['min'] = (df['seconds'] / 60).round(2)
+    df['off_rating'] = (100 * df['pts_for'] / df['poss_for'].where(df['poss_for'] > 0)).round(1)
+    df['def_rating'] = (100 * df['pts_against'] / df['poss_against'].where(df['poss_against'] > 0)).round(1)
+    df['net_rating'] = (df['off_rating'] - df['def_rating']).round(1)
+    df['poss_for'] = df['poss_for'].round(1)
+    df['poss_against'] = df['poss_against'].round(1)
+    return df
+
+def compute_lineup_stats(snapshot, stints):
+    """Aggregate stint totals to 5-man units and two-man pairs.
+
+    Returns:
+        pd.DataFrame: One row per (team, group) with lineup_size 5 or 2,
+            group_id ('-'-joined person IDs), group_name, player1..player5,
+            seconds, min, pts_for, pts_against, plus_minus, poss_for,
+            poss_against, off_rating, def_rating and net_rating
+    """
+    if not len(stints):
+        return pd.DataFrame()
+
+    totals = compute_stint_totals(snapshot, stints)
+    value_columns = ['seconds', 'pts_for', 'pts_against', 'poss_for', 'poss_against']
+
+    # Units: one row per stint keyed by its five players
+    units = pd.DataFrame({key: totals[key] for key in value_columns})
+    units['team'] = stints.team
+    units['players'] = [tuple(row) for row in stints.players]
+
+    # Pairs: every stint contributes to its ten player pairs
+    pair_players = stints.players[:, _PAIR_SLOTS]  # (n, 10, 2)
+    pairs = pd.DataFrame({key: np.repeat(totals[key], len(_PAIR_SLOTS)) for key in value_columns})
+    pairs['team'] = np.repeat(stints.team, len(_PAIR_SLOTS))
+    pairs['players'] = [tuple(row) for row in pair_players.reshape(-1, 2)]
+
+    frames = []
+    for lineup_size, df in ((5, units), (2, pairs)):
+        grouped = df.groupby(['team', 'players'], sort=False, as_index=False)[value_columns].sum()
+        grouped['lineup_size'] = lineup_size
+        frames.append(grouped)
+    stats = _with_ratings(pd.concat(frames, ignore_index=True))
+
+    names = stints.player_names
+    stats['game_id'] = stints.game_id
+    stats['team_tricode'] = [stints.team_tricodes[t] for t in stats['team']]
+    stats['group_id'] = ['-'.join(str(pid) for pid in players) for players in stats['players']]
+    stats['group_name'] = [' - '.join(names.get(pid, str(pid)) for pid in players) for players in stats['players']]
+    for slot in range(5):
+        stats[f'player{slot + 1}'] = [
+            names.get(players[slot], str(players[slot])) if len(players) > slot else None
+            for players in stats['players']
+        ]
+
+    stats['pts_for'] = stats['pts_for'].astype(int)
+    stats['pts_against'] = stats['pts_against'].astype(int)
+    stats['plus_minus'] = stats['plus_minus'].astype(int)
+    stats['seconds'] = stats['seconds'].round(1)
+
+    return stats.drop(columns=['team', 'players'])
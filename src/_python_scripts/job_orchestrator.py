@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Schedule-driven runner for the WolfWise data jobs.
+
+The scripts below used to run on their own cadences, re-pulling data on days
+the Wolves did not play. Here they form one dependency graph that runs only
+after a Wolves game has gone final (per the team schedule):
+
+- source jobs run once per newly final game;
+- a downstream job runs only if the tables written by its upstream jobs
+  changed since its last successful run;
+- jobs whose upstream jobs are done run in parallel, each script in its own
+  process (API pacing is per process, so keep ORCHESTRATOR_WORKERS small).
+
+A failed job is retried with an exponential backoff (ORCHESTRATOR_RETRY_BASE
+seconds, doubling up to ORCHESTRATOR_RETRY_MAX), or right away once a new game
+goes final; its downstream jobs wait for it.
+Run it from cron as often as you like; between games it only checks the
+schedule:
+
+    python job_orchestrator.py              # run what the last final game requires
+    python job_orchestrator.py --dry-run    # show what would run
+    python job_orchestrator.py --jobs record_tracker --force
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from utils import (get_supabase_client, get_team_schedule, table_fingerprint, RECORD_CROSSINGS_TABLE,
+                   RECORD_CROSSINGS_KEY)
+
+# Load environment variables
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(SCRIPTS_DIR))
+
+ORCHESTRATOR_DIR = os.environ.get('ORCHESTRATOR_DIR', os.path.join(SCRIPTS_DIR, '.cache', 'orchestrator'))
+ORCHESTRATOR_WORKERS = int(os.environ.get('ORCHESTRATOR_WORKERS', 3))
+
+# Seconds a single job may run
+JOB_TIMEOUT = int(os.environ.get('ORCHESTRATOR_JOB_TIMEOUT', 3600))
+
+# Seconds before a failed job is retried for the same game, doubling per failure
+RETRY_BASE = int(os.environ.get('ORCHESTRATOR_RETRY_BASE', 900))
+RETRY_MAX = int(os.environ.get('ORCHESTRATOR_RETRY_MAX', 6 * 3600))
+
+# Columns that change on every write without the data changing
+VOLATILE_COLUMNS = ['id', 'TIMESTAMP', 'created_at', 'updated_at']
+
+# Job name -> script (relative to this directory), upstream jobs and the
+# tables it writes as (name, key columns[, partition filters]). Fingerprints
+# page through each table ordered by its key columns, so the keys must
+# identify a row. Jobs without upstream jobs run once per final game.
+JOBS = {
+    'game_logs': {
+        'script': 'player_game_logs/get_wolves_player_game_logs.py',
+        'after': [],
+        'writes': [('twolves_player_game_logs', ['Player_ID', 'Game_ID'])]
+    },
+    'season_stats': {
+        'script': 'stat_cards/cursor_get_player_stats_last_n_games.py',
+        'after': [],
+        'writes': [('timberwolves_player_stats_season', ['PLAYER_ID']),
+                   ('timberwolves_player_stats_last_5', ['PLAYER_ID']),
+                   ('timberwolves_player_stats_last_10', ['PLAYER_ID'])]
+    },
+    'league_player_stats': {
+        'script': 'stat_cards/get_wolves_season_stats.py',
+        'after': [],
+        'writes': [('nba_player_stats', ['player_id'])]
+    },
+    'distributions': {
+        'script': 'distributions/stat_distributions.py',
+        'after': ['season_stats'],
+        'writes': [('distribution_stats', ['player_id', 'stat'])]
+    },
+    'lineups': {
+        'script': 'lineups/lineup_data_for_web_app.py',
+        'after': [],
+        'writes': [('lineups', ['group_id', 'season'])]
+    },
+    'lineups_advanced': {
+        'script': 'lineups/lineup_advanced_data.py',
+        'after': ['lineups'],
+        'writes': [('lineups_advanced', ['group_id', 'season'])]
+    },
+    'hustle_stats': {
+        'script': 'hustle_stats/hustle_stats_fetcher.py',
+        'after': [],
+        'writes': [('hustle_stats', ['player_id', 'season', 'season_type', 'per_mode'])]
+    },
+    'league_leaders': {
+        'script': 'players_on_league_leaders_dash/timberwolves_players_on_league_leaderboard.py',
+        'after': [],
+        'writes': [('players_on_league_leaderboard', ['Stat Category', 'Player'])]
+    },
+    'player_records': {
+        'script': 'records/get_player_records.py',
+        'after': ['game_logs'],
+        'writes': [('timberwolves_player_current_records',
+                    ['time_interval', 'player_comparison_level', 'id', 'stat'])]
+    },
+    'record_tracker': {
+        'script': 'records/update_record_tracker.py',
+        'after': ['game_logs', 'season_stats'],
+        'writes': [('record_tracker_season', ['name', 'stat']),
+                   (RECORD_CROSSINGS_TABLE, RECORD_CROSSINGS_KEY, {'tracker': 'season'})]
+    },
+    'age_tracker': {
+        'script': 'fetch_anthony_edwards_data.py',
+        'after': ['game_logs'],
+        'writes': [('player_career_data', ['player_id']),
+                   (RECORD_CROSSINGS_TABLE, RECORD_CROSSINGS_KEY, {'tracker': 'age_25'})]
+    }
+}
+
+def job_order(jobs):
+    """Return job names in dependency order; raise ValueError on unknown or cyclic dependencies."""
+    for name, job in jobs.items():
+        unknown = set(job['after']) - set(jobs)
+        if unknown:
+            raise ValueError(f"Job '{name}' depends on unknown jobs: {', '.join(sorted(unknown))}")
+
+    order, done = [], set()
+    remaining = list(jobs)
+    while remaining:
+        ready = [name for name in remaining if set(jobs[name]['after']) <= done]
+        if not ready:
+            raise ValueError(f"Dependency cycle between jobs: {', '.join(remaining)}")
+        order.extend(ready)
+        done.update(ready)
+        remaining = [name for name in remaining if name not in done]
+    return order
+
+def with_downstream(jobs, names):
+    """The given jobs plus every job that depends on them."""
+    selected = set(names)
+    for name in job_order(jobs):
+        if set(jobs[name]['after']) & selected:
+            selected.add(name)
+    return selected
+
+def _state_path():
+    return os.path.join(ORCHESTRATOR_DIR, 'state.json')
+
+def load_state():
+    try:
+        with open(_state_path()) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    state.setdefault('jobs', {})
+    return state
+
+def save_state(state):
+    try:
+        os.makedirs(ORCHESTRATOR_DIR, exist_ok=True)
+        tmp_path = _state_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, _state_path())
+    except OSError as e:
+        logger.warning(f"Could not save orchestrator state: {str(e)}")
+
+def latest_final_game():
+    """Game id of the Wolves' most recent final regular-season game, or None."""
+    schedule = get_team_schedule()
+    if schedule is None:
+        return None
+    finals = schedule[schedule['FINAL']]
+    return finals['GAME_ID'].iloc[-1] if not finals.empty else None
+
+def input_key(job, trigger, outputs):
+    """What a job's result depends on: the final game for source jobs, upstream outputs otherwise."""
+    inputs = {upstream: outputs.get(upstream) for upstream in job['after']} if job['after'] else {'game': trigger}
+    return hashlib.md5(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+def output_fingerprint(job, client=None):
+    """Fingerprint of the tables a job writes, or None if they cannot be read in full."""
+    fingerprints = []
+    for table, key_columns, *partition in job['writes']:
+        partition = partition[0] if partition else None
+        try:
+            fingerprints.append([table, partition,
+                                 table_fingerprint(table, key_columns, VOLATILE_COLUMNS, partition, client)])
+        except Exception as e:
+            logger.warning(f"Could not fingerprint {table}: {str(e)}")
+            return None
+    return hashlib.md5(json.dumps(fingerprints, sort_keys=True).encode('utf-8')).hexdigest()
+
+def record_failure(state, name, trigger, now=None):
+    """Record a failed run and when the job may be retried for the same game."""
+    now = now or datetime.now()
+    previous = state['jobs'].get(name, {})
+    failures = previous.get('failures', 0) + 1 if previous.get('trigger') == trigger else 1
+    delay = min(RETRY_MAX, RETRY_BASE * 2 ** (failures - 1))
+    # No 'input', so the job runs again once the retry time has passed
+    state['jobs'][name] = {
+        'output': previous.get('output'),
+        'trigger': trigger,
+        'failures': failures,
+        'retry_at': (now + timedelta(seconds=delay)).isoformat(timespec='seconds')
+    }
+
+def waiting_to_retry(state, name, trigger, now=None):
+    """True if the job failed for this game and its retry time has not come yet."""
+    previous = state['jobs'].get(name, {})
+    if previous.get('trigger') != trigger or 'retry_at' not in previous:
+        return False
+    return (now or datetime.now()) < datetime.fromisoformat(previous['retry_at'])
+
+def retry_due(state, trigger, now=None):
+    """True if some job failed for this game and may be retried now."""
+    return any(
+        job.get('trigger') == trigger and 'retry_at' in job and not waiting_to_retry(state, name, trigger, now)
+        for name, job in state['jobs'].items()
+    )
+
+def run_job(name, job):
+    """Run one job's script in its own process; returns True on success."""
+    log_dir = os.path.join(ORCHESTRATOR_DIR, 'logs')
+    os.makedirs(log_dir, exist_ok=True)
+    log_path = os.path.join(log_dir, f"{name}.log")
+
+    env = dict(os.environ)
+    # Scripts import utils either as `utils` or as `src._python_scripts.utils`
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, SCRIPTS_DIR, env.get('PYTHONPATH')]))
+
+    started = time.monotonic()
+    logger.info(f"[{name}] started")
+    try:
+        with open(log_path, 'w') as log_file:
+            result = subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, job['script'])], cwd=REPO_ROOT,
+                                    env=env, stdout=log_file, stderr=subprocess.STDOUT, timeout=JOB_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        logger.error(f"[{name}] timed out after {JOB_TIMEOUT}s (log: {log_path})")
+        return False
+    except OSError as e:
+        logger.error(f"[{name}] could not be started: {str(e)}")
+        return False
+
+    elapsed = time.monotonic() - started
+    if result.returncode != 0:
+        logger.error(f"[{name}] failed with exit code {result.returncode} after {elapsed:.0f}s (log: {log_path})")
+        return False
+    logger.info(f"[{name}] finished in {elapsed:.0f}s")
+    return True
+
+def run_jobs(jobs, trigger, state, workers=ORCHESTRATOR_WORKERS, only=None, force=(), dry_run=False,
+             client=None, runner=run_job):
+    """Run the jobs whose inputs changed, in dependency order and in parallel.
+
+    Args:
+        jobs (dict): Job graph (see JOBS)
+        trigger (str): Id of the final game the run is for
+        state (dict): Orchestrator state from load_state(); updated in place
+        workers (int): Jobs run at the same time
+        only (iterable, optional): Jobs allowed to run; the others keep their
+            recorded outputs
+        force (iterable): Jobs to run even if their inputs are unchanged
+        dry_run (bool): Only report what would run
+        client (optional): Supabase client to reuse
+        runner (callable): (name, job) -> bool, runs one job
+
+    Returns:
+        dict: Job name -> 'ran', 'unchanged', 'skipped', 'failed', 'waiting' (failed
+            earlier, retry not due yet), 'blocked' or 'would run'
+    """
+    force = set(force)
+    outputs, results = {}, {}
+    pending = job_order(jobs)
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        while pending or running:
+            for name in list(pending):
+                job = jobs[name]
+                if any(upstream in pending or upstream in running.values() for upstream in job['after']):
+                    continue
+                pending.remove(name)
+
+                if any(results[upstream] in ('failed', 'waiting', 'blocked') for upstream in job['after']):
+                    results[name] = 'blocked'
+                    continue
+                if name not in force and waiting_to_retry(state, name, trigger):
+                    results[name] = 'waiting'
+                    continue
+                key = input_key(job, trigger, outputs)
+                previous = state['jobs'].get(name, {})
+                if (only is not None and name not in only) or (name not in force and previous.get('input') == key):
+                    results[name] = 'skipped'
+                    outputs[name] = previous.get('output')
+                    continue
+                if dry_run:
+                    results[name] = 'would run'
+                    outputs[name] = f"{name}:pending"
+                    continue
+                running[pool.submit(runner, name, job)] = name
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                job = jobs[name]
+                if not future.result():
+                    results[name] = 'failed'
+                    record_failure(state, name, trigger)
+                    save_state(state)
+                    continue
+                output = output_fingerprint(job, client)
+                if output is None:
+                    # Unknown output: let the downstream jobs run
+                    output = f"unknown:{datetime.now().isoformat()}"
+                previous_output = state['jobs'].get(name, {}).get('output')
+                results[name] = 'unchanged' if output == previous_output else 'ran'
+                outputs[name] = output
+                state['jobs'][name] = {
+                    'input': input_key(job, trigger, outputs),
+                    'output': output,
+                    'finished_at': datetime.now().isoformat(timespec='seconds')
+                }
+                save_state(state)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the WolfWise data jobs that the last final Wolves game requires')
+    parser.add_argument('--jobs', nargs='+', choices=sorted(JOBS),
+                        help='Only these jobs (and the jobs depending on them)')
+    parser.add_argument('--force', action='store_true', help='Run the selected jobs even if nothing changed')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would run without running it')
+    parser.add_argument('--workers', type=int, default=ORCHESTRATOR_WORKERS, help='Jobs run at the same time')
+    args = parser.parse_args()
+
+    state = load_state()
+    trigger = latest_final_game()
+    if trigger is None and not args.force:
+        logger.info("No final Wolves game in the schedule; nothing to do")
+        return
+    if trigger == state.get('last_final_game') and not args.force and not args.jobs \
+            and not retry_due(state, trigger):
+        logger.info(f"No new final Wolves game since {trigger} and no failed job due for a retry; nothing to do")
+        return
+
+    only = with_downstream(JOBS, args.jobs) if args.jobs else None
+    force = (args.jobs or JOBS) if args.force else ()
+
+    logger.info(f"Running jobs for final game {trigger}")
+    results = run_jobs(JOBS, trigger, state, args.workers, only, force, args.dry_run, get_supabase_client())
+
+    for name in job_order(JOBS):
+        logger.info(f"{name:>20}: {results[name]}")
+    if not args.dry_run:
+        state['last_final_game'] = trigger
+        save_state(state)
+    if any(result == 'failed' for result in results.values()):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
 #!/usr/bin/env python
 import datetime
 import pandas as pd
-import time
 import re
 import os
+import sys
 import logging
 from dotenv import load_dotenv
 from src._python_scripts.utils import (
     get_supabase_client,
-    load_to_supabase,
+    replace_partition,
     get_current_season,
     get_lineup_stats,
     api_call_with_retry
@@ -62,7 +62,6 @@ def main():
 
             logger.info(f"Fetched {size}-man advanced lineup data")
             all_lineups.append(df)
-            time.sleep(1)  # Pause briefly between requests
         except Exception as e:
             logger.error(f"Error fetching {size}-man advanced lineup data: {e}")
 
@@ -148,19 +147,21 @@ def main():
         # --- End ensure group_ids in lineups ---
 
         try:
-            # Delete existing records for the current season
-            logger.info(f"Deleting existing records for season {season_str}...")
-            supabase.table('lineups_advanced').delete().eq('season', season_str).execute()
-
-            # Insert new records using utility function
-            logger.info("Uploading advanced lineup data to Supabase...")
-            load_to_supabase(combined_df, 'lineups_advanced')
+            # Swap in the season's lineups without emptying the table first
+            logger.info(f"Replacing advanced lineup data for season {season_str}...")
+            if not replace_partition(combined_df, 'lineups_advanced', ['group_id', 'season'],
+                                     {'season': season_str}, client=supabase):
+                return False
             logger.info(f"Successfully uploaded {len(combined_df)} advanced lineup records to Supabase")
 
         except Exception as e:
             logger.error(f"Error uploading to Supabase: {e}")
+            return False
     else:
         logger.warning("No advanced lineup data found to process")
 
+    return True
+
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    if not main():
+        sys.exit(1) 
\ No newline at end of file
@@ -1,27 +1,25 @@
 #!/usr/bin/env python
 import datetime
 import pandas as pd
-import time
 import re
 from nba_api.stats.endpoints import leaguedashlineups
-from supabase import create_client
 from dotenv import load_dotenv
 import os
+import sys
 import logging
 
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_supabase_client, replace_partition
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Load environment variables and initialize Supabase client
 load_dotenv()
-supabase_url = os.getenv('VITE_SUPABASE_URL')
-supabase_key = os.getenv('VITE_SUPABASE_ANON_KEY')
-
-if not supabase_url or not supabase_key:
-    raise ValueError("Missing Supabase environment variables")
-
-supabase = create_client(supabase_url, supabase_key)
+supabase = get_supabase_client()
 
 
 def get_current_season():
@@ -58,8 +56,6 @@ def fetch_lineup_data_paginated(lineup_size, season_str):
             df['LINEUP_SIZE'] = lineup_size  # Add the column here
             all_data.append(df)
 
-        time.sleep(1)  # Avoid rate-limiting
-
     return pd.concat(all_data, ignore_index=True) if all_data else None
 
 
@@ -89,7 +85,6 @@ def main():
 
             logger.info(f"Fetched {size}-man lineup data")
             all_lineups.append(df)
-            time.sleep(1)  # Pause briefly between requests
         except Exception as e:
             logger.error(f"Error fetching {size}-man lineup data: {e}")
 
@@ -149,23 +144,22 @@ def main():
             logger.warning("Column 'group_name' not found in the combined dataframe. Skipping player splitting.")
 
         try:
-            # Convert DataFrame to records for Supabase
-            records = combined_df.to_dict('records')
-
-            # Delete existing records for the current season
-            logger.info(f"Deleting existing records for season {season_str}...")
-            supabase.table('lineups').delete().eq('season', season_str).execute()
-
-            # Insert new records
-            logger.info("Uploading lineup data to Supabase...")
-            result = supabase.table('lineups').insert(records).execute()
-            logger.info(f"Successfully uploaded {len(records)} lineup records to Supabase")
+            # Swap in the season's lineups without emptying the table first
+            logger.info(f"Replacing lineup data for season {season_str}...")
+            if not replace_partition(combined_df, 'lineups', ['group_id', 'season'],
+                                     {'season': season_str}, client=supabase):
+                return False
+            logger.info(f"Successfully uploaded {len(combined_df)} lineup records to Supabase")
 
         except Exception as e:
             logger.error(f"Error uploading to Supabase: {e}")
+            return False
     else:
         logger.warning("No lineup data found to process")
 
+    return True
+
 
 if __name__ == '__main__':
-    main()
+    if not main():
+        sys.exit(1)
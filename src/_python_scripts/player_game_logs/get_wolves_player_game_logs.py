@@ -1,13 +1,12 @@
 from nba_api.stats.endpoints import playergamelog, commonteamroster
 from nba_api.stats.static import teams
 import pandas as pd
+import sys
 from datetime import datetime
 import logging
-import time
-from requests.exceptions import ReadTimeout, ConnectionError
 import os
 from dotenv import load_dotenv
-from src._python_scripts.utils import get_supabase_client, load_to_supabase
+from src._python_scripts.utils import get_supabase_client, replace_partition, api_call_with_retry
 
 # Load environment variables
 load_dotenv()
@@ -31,19 +30,10 @@ nba_season_id = int('2' + current_season.split('-')[0])  # Convert '2024-25' to
 
 # Get Timberwolves roster with retry logic
 max_retries = 3
-retry_delay = 5  # seconds
 
 def get_data_with_retry(func, *args, **kwargs):
-    for attempt in range(max_retries):
-        try:
-            logger.info(f"Attempt {attempt + 1} of {max_retries}")
-            return func(*args, **kwargs)
-        except (ReadTimeout, ConnectionError) as e:
-            if attempt == max_retries - 1:
-                logger.error(f"Failed after {max_retries} attempts: {str(e)}")
-                raise
-            logger.warning(f"Attempt {attempt + 1} failed. Retrying in {retry_delay} seconds...")
-            time.sleep(retry_delay)
+    # Pacing and backoff come from the shared NBA API rate limiter
+    return api_call_with_retry(lambda: func(*args, **kwargs), max_retries=max_retries)
 
 logger.info("Fetching Timberwolves roster...")
 roster = get_data_with_retry(commonteamroster.CommonTeamRoster, team_id=team_id, season=current_season)
@@ -78,9 +68,6 @@ for _, player in wolves_players.iterrows():
         # Append to list
         all_game_logs.append(df)
         
-        # Add delay between requests to avoid rate limiting
-        time.sleep(1)
-        
     except Exception as e:
         logger.error(f"Error fetching data for {player_name}: {str(e)}")
         continue
@@ -103,16 +90,16 @@ if all_game_logs:
     combined_logs['GAME_DATE'] = combined_logs['GAME_DATE'].dt.strftime('%Y-%m-%d')
     
     try:
-        # First, delete existing records for the current season to avoid duplicates
-        logger.info(f"Deleting existing records for season {nba_season_id}...")
-        supabase.table('twolves_player_game_logs').delete().eq('SEASON_ID', nba_season_id).execute()
-        
-        # Use utility to upload new records
-        logger.info("Uploading new game logs to Supabase...")
-        load_to_supabase(combined_logs, 'twolves_player_game_logs')
+        # Swap in the season's logs: upsert on (player, game), then drop rows
+        # that are no longer returned, so the table is never empty mid-load
+        logger.info(f"Replacing game logs for season {nba_season_id}...")
+        if not replace_partition(combined_logs, 'twolves_player_game_logs', ['Player_ID', 'Game_ID'],
+                                 {'SEASON_ID': nba_season_id}, client=supabase):
+            sys.exit(1)
         logger.info(f"Successfully uploaded {len(combined_logs)} game logs to Supabase")
         
     except Exception as e:
         logger.error(f"Error uploading to Supabase: {str(e)}")
+        sys.exit(1)
 else:
     logger.warning("No game logs found")
\ No newline at end of file
@@ -5,7 +5,8 @@ import logging
 import re
 from dotenv import load_dotenv
 import os
-from src._python_scripts.utils import get_supabase_client, load_to_supabase
+import sys
+from src._python_scripts.utils import get_supabase_client, replace_partition
 
 # Configure logging
 logging.basicConfig(
@@ -71,27 +72,26 @@ def extract_value_and_ranking(cell):
     return None, None
 
 def save_to_supabase(df):
-    """Save DataFrame to Supabase using utility"""
+    """Save DataFrame to Supabase using utility; returns False if the replace failed"""
     try:
-        # First delete all existing records
-        logger.info("Deleting existing records from players_on_league_leaderboard table...")
-        supabase.table('players_on_league_leaderboard').delete().gte('Value', 0).execute()
-        
-        # Use utility to insert new records
-        logger.info("Inserting new records into players_on_league_leaderboard table...")
-        load_to_supabase(df, 'players_on_league_leaderboard')
+        # Swap in the new leaderboard without emptying the table first
+        logger.info("Replacing records in players_on_league_leaderboard table...")
+        if not replace_partition(df, 'players_on_league_leaderboard', ['Stat Category', 'Player'], client=supabase):
+            return False
         logger.info(f"Successfully saved {len(df)} records to players_on_league_leaderboard table")
         
         # Print preview of the data
         logger.info("\nPreview of inserted data:")
         logger.info(df[['Stat Category', 'Player', 'Value', 'Ranking']].head())
         logger.info("\n")
+        return True
         
     except Exception as e:
         logger.error(f"Error saving to Supabase: {str(e)}")
         # Print the first record to see the data structure
         if not df.empty:
             logger.error(f"Sample record: {df.iloc[0].to_dict()}")
+        return False
 
 try:
     # Request the page content
@@ -153,13 +153,16 @@ try:
     logger.info(f"\nCreated DataFrame with {len(df)} rows")
 
     # Save to Supabase
-    save_to_supabase(df)
+    saved = save_to_supabase(df)
     
     # Also save to CSV as backup
     df.to_csv("team_leaderboard_2025.csv", index=False)
     logger.info("Data saved to team_leaderboard_2025.csv")
+    if not saved:
+        sys.exit(1)
 
 except Exception as e:
     logger.error(f"An error occurred: {str(e)}")
     if 'response' in locals():
-        logger.error(f"Response content: {response.text[:1000]}...")
\ No newline at end of file
+        logger.error(f"Response content: {response.text[:1000]}...")
+    sys.exit(1)
\ No newline at end of file
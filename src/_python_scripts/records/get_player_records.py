@@ -5,23 +5,108 @@ from nba_api.stats.endpoints import (
     LeagueDashPlayerStats
 )
 from nba_api.stats.static import players, teams
+import numpy as np
 import pandas as pd
-import time
-from requests.exceptions import RequestException
-from http.client import RemoteDisconnected
-import random
 import os
 from dotenv import load_dotenv
-from supabase import create_client, Client
 from typing import Dict, List
+import sys
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import get_supabase_client, replace_partition, api_call_with_retry
 
 # Load environment variables
 load_dotenv()
 
 # Initialize Supabase client
-supabase_url = os.getenv("VITE_SUPABASE_URL")
-supabase_key = os.getenv("VITE_SUPABASE_ANON_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+supabase = get_supabase_client()
+
+# Intervals of timberwolves_player_current_records: latest game, current
+# season, career totals ('all_time', and 'career' as update_all_records
+# names it) and the latest 5/10 games against the best 5/10-game stretch
+RECORD_INTERVALS = ['game', 'season', 'all_time', 'career', 'last_5', 'last_10']
+RECENT_GAME_WINDOWS = {'last_5': 5, 'last_10': 10}
+
+RECORD_COLUMNS = ['time_interval', 'player_comparison_level', 'id', 'name', 'stat', 'current', 'record']
+
+def _stack_frames(frames, stats):
+    """Stack per-player frames into one frame keyed by a PLAYER_ID column"""
+    stacked = [frame[stats].assign(PLAYER_ID=player_id) for player_id, frame in frames.items() if not frame.empty]
+    if not stacked:
+        return pd.DataFrame(columns=stats + ['PLAYER_ID'])
+    return pd.concat(stacked, ignore_index=True)
+
+def compute_player_records(game_logs, career_stats, names, stats):
+    """Compute current values and personal records for a roster in one pass
+    
+    Args:
+        game_logs: Player ID -> PlayerGameLog frame (newest game first)
+        career_stats: Player ID -> PlayerCareerStats season totals, or None if
+            unusable (season values then fall back to the game log)
+        names: Player ID -> player name
+        stats: Stat categories
+    
+    Returns:
+        DataFrame of timberwolves_player_current_records rows, ordered by
+        player, stat and interval
+    """
+    player_ids = list(names)
+    if not player_ids:
+        return pd.DataFrame(columns=RECORD_COLUMNS)
+    
+    def by_player(frame):
+        return frame.reindex(player_ids).fillna(0)
+    
+    # Game log: latest game, game highs and recent-game windows
+    logs = _stack_frames({pid: game_logs[pid] for pid in player_ids}, stats)
+    game_rank = logs.groupby('PLAYER_ID').cumcount()
+    by_game = logs.groupby('PLAYER_ID', sort=False)[stats]
+    game_agg = by_game.agg(['first', 'max'])
+    current = {'game': by_player(game_agg.xs('first', axis=1, level=1))}
+    record = {'game': by_player(game_agg.xs('max', axis=1, level=1))}
+    for time_interval, window in RECENT_GAME_WINDOWS.items():
+        current[time_interval] = by_player(logs[game_rank < window].groupby('PLAYER_ID')[stats].sum())
+        # Partial windows never beat a full one (counting stats are non-negative)
+        rolling = by_game.rolling(window, min_periods=1).sum()
+        record[time_interval] = by_player(rolling.groupby(level=0).max())
+    
+    # Career frame: current season, season highs and career totals
+    usable = {
+        pid: frame for pid, frame in career_stats.items()
+        if pid in names and frame is not None and all(stat in frame.columns for stat in stats)
+    }
+    seasons = _stack_frames(usable, stats)
+    season_agg = seasons.groupby('PLAYER_ID', sort=False)[stats].agg(['last', 'max', 'sum'])
+    current['season'] = by_player(season_agg.xs('last', axis=1, level=1))
+    record['season'] = by_player(season_agg.xs('max', axis=1, level=1))
+    career_total = by_player(season_agg.xs('sum', axis=1, level=1))
+    
+    # Fallback: use the game log for the season, skip career totals
+    fallback = [pid for pid in player_ids if pid not in usable]
+    if fallback:
+        print(f"Falling back to game log data for season and career calculations for players {fallback}...")
+        current['season'].loc[fallback] = current['game'].loc[fallback]
+        record['season'].loc[fallback] = record['game'].loc[fallback]
+    for time_interval in ('all_time', 'career'):
+        current[time_interval] = career_total
+        record[time_interval] = career_total
+    
+    # Long format: one row per player, stat and interval
+    intervals = [time_interval for time_interval in RECORD_INTERVALS if time_interval in current]
+    current_values = np.stack([current[t][stats].to_numpy() for t in intervals], axis=-1)
+    record_values = np.stack([record[t][stats].to_numpy() for t in intervals], axis=-1)
+    n_players, n_stats, n_intervals = current_values.shape
+    return pd.DataFrame({
+        'time_interval': np.tile(intervals, n_players * n_stats),
+        'player_comparison_level': 'personal',
+        'id': np.repeat(player_ids, n_stats * n_intervals),
+        'name': np.repeat([names[pid] for pid in player_ids], n_stats * n_intervals),
+        'stat': np.tile(np.repeat([stat.lower() for stat in stats], n_intervals), n_players),
+        'current': current_values.ravel(),
+        'record': record_values.ravel()
+    }, columns=RECORD_COLUMNS)
 
 class TimberwolvesRecords:
     def __init__(self):
@@ -44,6 +129,10 @@ class TimberwolvesRecords:
         self.last_10_stats = None
         self.current_season_stats = None
         self.supabase = supabase
+        
+        # Game log and career totals per player ID, fetched once per run
+        self.player_frames = {}
+        self.records_table = None
     
     def get_top_10_players(self):
         """Get top 10 Timberwolves players by minutes played"""
@@ -65,52 +154,27 @@ class TimberwolvesRecords:
         return top_players['PLAYER_NAME'].tolist()
     
     def api_call_with_retry(self, api_func, *args, **kwargs):
-        """Make API call with retry logic"""
-        for attempt in range(self.max_retries):
-            try:
-                # Add randomized delay between attempts
-                if attempt > 0:
-                    delay = random.uniform(2, 5)
-                    print(f"Retry attempt {attempt + 1}, waiting {delay:.1f} seconds...")
-                    time.sleep(delay)
-                
-                return api_func(*args, **kwargs)
-                
-            except (RequestException, RemoteDisconnected) as e:
-                if attempt == self.max_retries - 1:  # Last attempt
-                    raise  # Re-raise the last exception
-                print(f"API call failed: {str(e)}, retrying...")
-                continue
+        """Make API call with retry logic, paced by the shared rate limiter"""
+        return api_call_with_retry(lambda: api_func(*args, **kwargs), max_retries=self.max_retries)
     
     def get_all_player_records(self):
         """Get records for top 10 Timberwolves players across all stats"""
-        all_records = []
         roster = self.get_top_10_players()
+        combined_records = self.get_records_table(roster)
         
-        for player_name in roster:
-            print(f"\nProcessing {player_name}...")
-            for stat in self.stat_categories:
-                print(f"Getting {stat} records...")
-                try:
-                    records_df = self.get_player_records(player_name, stat)
-                    all_records.append(records_df)
-                    # Randomized delay between 1 and 3 seconds
-                    delay = random.uniform(1, 3)
-                    time.sleep(delay)
-                except Exception as e:
-                    print(f"Error processing {player_name} for {stat}: {str(e)}")
-                    continue
-        
-        # Combine all records and load to Supabase
-        if all_records:
-            combined_records = pd.concat(all_records, ignore_index=True)
-            
+        # Load records to Supabase
+        if not combined_records.empty:
             # Group records by time interval
-            for time_interval in ['game', 'season', 'all_time']:
+            failed_intervals = []
+            for time_interval in RECORD_INTERVALS:
                 interval_records = combined_records[combined_records['time_interval'] == time_interval]
                 if not interval_records.empty:
                     records_list = interval_records.to_dict('records')
-                    self.load_records_to_supabase(records_list, time_interval)
+                    if not self.load_records_to_supabase(records_list, time_interval):
+                        failed_intervals.append(time_interval)
+            if failed_intervals:
+                print(f"Failed to load records for: {', '.join(failed_intervals)}")
+                return None
             
             # Save to CSV for backup
             combined_records.to_csv('timberwolves_player_records.csv', index=False)
@@ -120,84 +184,77 @@ class TimberwolvesRecords:
     
     def get_player_records(self, player_name, stat='PTS'):
         """Get personal records comparison for a specific player"""
-        # Get player ID
-        player_info = players.find_players_by_full_name(player_name)[0]
-        player_id = player_info['id']
+        records = self.get_records_table([player_name], [stat])
+        return records[records['time_interval'].isin(['game', 'season', 'all_time'])].reset_index(drop=True)
+    
+    def get_records_table(self, player_names, stats=None):
+        """Build personal records for several players and stats in one pass
+        
+        Args:
+            player_names: Players' full names
+            stats: Stat categories; defaults to every tracked category
         
-        # Get current stats and records with retry logic
-        current_stats = self._get_player_current_stats(player_id, stat)
-        personal_records = self._get_personal_records(player_id, stat)
+        Returns:
+            DataFrame of timberwolves_player_current_records rows for every
+            interval in RECORD_INTERVALS
+        """
+        stats = stats or self.stat_categories
+        names = {}
+        game_logs = {}
+        career_stats = {}
+        
+        for player_name in player_names:
+            print(f"\nProcessing {player_name}...")
+            try:
+                # Get player ID
+                player_id = players.find_players_by_full_name(player_name)[0]['id']
+                
+                # Two API calls per player cover every stat category
+                game_logs[player_id], career_stats[player_id] = self._get_player_frames(player_id)
+                names[player_id] = player_name
+            except Exception as e:
+                print(f"Error processing {player_name}: {str(e)}")
+                continue
         
-        # Create records dataframe
-        records = []
-        for time_interval in ['game', 'season', 'all_time']:
-            records.append({
-                'time_interval': time_interval,
-                'player_comparison_level': 'personal',
-                'id': player_id,
-                'name': player_name,
-                'stat': stat.lower(),
-                'current': current_stats[time_interval],
-                'record': personal_records[time_interval]
-            })
+        return compute_player_records(game_logs, career_stats, names, stats)
+    
+    def _get_player_frames(self, player_id):
+        """Get a player's game log and career totals, fetching each only once
         
-        return pd.DataFrame(records)
+        Returns:
+            Tuple of (game log DataFrame, career stats DataFrame or None if the
+            career endpoint returned unusable data)
+        """
+        if player_id not in self.player_frames:
+            game_log = self.api_call_with_retry(
+                lambda: PlayerGameLog(player_id=player_id).get_data_frames()[0]
+            )
+            
+            # Handle API inconsistencies in the career endpoint
+            try:
+                career_stats = self.api_call_with_retry(
+                    lambda: PlayerCareerStats(player_id=player_id).get_data_frames()[0]
+                )
+            except (KeyError, IndexError) as e:
+                print(f"Warning: PlayerCareerStats API issue for player {player_id}: {str(e)}")
+                career_stats = None
+            
+            self.player_frames[player_id] = (game_log, career_stats)
+        return self.player_frames[player_id]
     
     def _get_player_current_stats(self, player_id, stat):
         """Get current statistics for a player"""
-        # Get most recent game stat with retry
-        game_log = self.api_call_with_retry(
-            lambda: PlayerGameLog(player_id=player_id).get_data_frames()[0]
-        )
-        current_game = game_log.iloc[0][stat] if not game_log.empty else 0
-        
-        # Get current season and career totals with retry - handle API inconsistencies
-        try:
-            career_stats = self.api_call_with_retry(
-                lambda: PlayerCareerStats(player_id=player_id).get_data_frames()[0]
-            )
-            current_season = career_stats.iloc[-1][stat] if not career_stats.empty else 0
-            career_total = career_stats[stat].sum() if not career_stats.empty else 0
-        except (KeyError, IndexError) as e:
-            print(f"Warning: PlayerCareerStats API issue for player {player_id}: {str(e)}")
-            print("Falling back to game log data for current season calculations...")
-            # Fallback: use current game data and set career total to 0
-            current_season = current_game
-            career_total = 0
-        
-        return {
-            'game': current_game,
-            'season': current_season,
-            'all_time': career_total
-        }
+        records = self._get_interval_values(player_id, stat)
+        return dict(zip(records['time_interval'], records['current']))
     
     def _get_personal_records(self, player_id, stat):
         """Get personal records for a player"""
-        # Game high with retry
-        game_log = self.api_call_with_retry(
-            lambda: PlayerGameLog(player_id=player_id).get_data_frames()[0]
-        )
-        game_high = game_log[stat].max() if not game_log.empty else 0
-        
-        # Season high and career total with retry - handle API inconsistencies
-        try:
-            career_stats = self.api_call_with_retry(
-                lambda: PlayerCareerStats(player_id=player_id).get_data_frames()[0]
-            )
-            season_high = career_stats[stat].max() if not career_stats.empty else 0
-            career_total = career_stats[stat].sum() if not career_stats.empty else 0
-        except (KeyError, IndexError) as e:
-            print(f"Warning: PlayerCareerStats API issue for player {player_id}: {str(e)}")
-            print("Falling back to game log data for career calculations...")
-            # Fallback: use game log for season high, skip career total
-            season_high = game_high  # Use game high as fallback
-            career_total = 0  # Set to 0 since we can't get career data
-        
-        return {
-            'game': game_high,
-            'season': season_high,
-            'all_time': career_total
-        }
+        records = self._get_interval_values(player_id, stat)
+        return dict(zip(records['time_interval'], records['record']))
+    
+    def _get_interval_values(self, player_id, stat):
+        game_log, career_stats = self._get_player_frames(player_id)
+        return compute_player_records({player_id: game_log}, {player_id: career_stats}, {player_id: None}, [stat])
 
     def load_records_to_supabase(self, records: List[Dict], time_interval: str) -> None:
         """
@@ -206,14 +263,11 @@ class TimberwolvesRecords:
         Args:
             records: List of record dictionaries
             time_interval: Time interval for the records (e.g., 'game', 'season', 'all_time')
+        
+        Returns:
+            bool: True if the interval's records were replaced
         """
         try:
-            # Delete existing records for this time interval
-            self.supabase.table('timberwolves_player_current_records') \
-                .delete() \
-                .eq('time_interval', time_interval) \
-                .execute()
-
             # Format records for Supabase
             formatted_records = []
             for record in records:
@@ -228,14 +282,38 @@ class TimberwolvesRecords:
                 }
                 formatted_records.append(formatted_record)
 
-            # Insert new records
-            if formatted_records:
-                self.supabase.table('timberwolves_player_current_records') \
-                    .insert(formatted_records) \
-                    .execute()
+            # Swap in this interval's records without emptying it first
+            records_df = pd.DataFrame(formatted_records, columns=[
+                'time_interval', 'player_comparison_level', 'id', 'name', 'stat', 'current', 'record'
+            ])
+            if replace_partition(records_df, 'timberwolves_player_current_records',
+                                 ['time_interval', 'player_comparison_level', 'id', 'stat'],
+                                 {'time_interval': time_interval}, client=self.supabase):
                 print(f"Successfully loaded {len(formatted_records)} records for {time_interval} interval")
+                return True
+            return False
         except Exception as e:
             print(f"Error loading records to Supabase: {str(e)}")
+            return False
+
+    def get_interval_records(self, time_interval: str) -> List[Dict]:
+        """Get one interval's records for the top 10 players (computed once per run)"""
+        if self.records_table is None:
+            self.records_table = self.get_records_table(self.get_top_10_players())
+        records = self.records_table
+        return records[records['time_interval'] == time_interval].to_dict('records')
+
+    def get_career_records(self) -> List[Dict]:
+        return self.get_interval_records('career')
+
+    def get_season_records(self) -> List[Dict]:
+        return self.get_interval_records('season')
+
+    def get_last_5_records(self) -> List[Dict]:
+        return self.get_interval_records('last_5')
+
+    def get_last_10_records(self) -> List[Dict]:
+        return self.get_interval_records('last_10')
 
     def update_all_records(self) -> None:
         """Update all player records in Supabase"""
@@ -258,7 +336,8 @@ class TimberwolvesRecords:
 # Example usage
 def main():
     records = TimberwolvesRecords()
-    records.get_all_player_records()
+    if records.get_all_player_records() is None:
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,214 @@
+"""Record-tracker engine for record_tracker_season.
+
+Replaces the create_record_tracker_season PL/pgSQL function, which ran a
+SUM/AVG, a personal MAX, a franchise MAX and a lookup query per player and
+stat. Here twolves_player_game_logs is read once and every player's season
+totals, per-game averages, projections, personal records and the franchise
+records are computed for all stats in one vectorized pass, then swapped into
+record_tracker_season with a single bulk upsert.
+
+Team games played and remaining come from the Wolves schedule, and the
+projection is the season total so far plus recent-form per-game rates times
+each player's availability over the remaining games (see
+utils.projection_utils). The dates on which players pass their own and the
+franchise's best stored season totals go to record_crossings.
+"""
+import logging
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import (fetch_table_rows, get_current_season, replace_partition, season_window, get_team_schedule,
+                   team_games_played, remaining_game_dates, recent_form_rates, availability_rates,
+                   record_crossings_frame, RECORD_CROSSINGS_TABLE, RECORD_CROSSINGS_KEY)
+
+logger = logging.getLogger(__name__)
+
+# Tracked stats, in the order the SQL function wrote them
+RECORD_TRACKER_STATS = ['PTS', 'AST', 'REB', 'STL', 'BLK', 'TOV', 'FGM', 'FGA',
+                        'FG3M', 'FG3A', 'FTM', 'FTA', 'PF']
+
+# NBA single-game records per stat: (record, holder)
+NBA_GAME_RECORDS = {
+    'pts': (100, 'Wilt Chamberlain*'),
+    'ast': (30, 'Scott Skiles'),
+    'reb': (55, 'Wilt Chamberlain*'),
+    'stl': (11, 'Larry Kenon'),
+    'blk': (17, 'Elmore Smith'),
+    'tov': (14, 'John Drew'),
+    'fgm': (36, 'Wilt Chamberlain*'),
+    'fga': (63, 'Wilt Chamberlain*'),
+    'fg3m': (14, 'Klay Thompson'),
+    'fg3a': (24, 'Klay Thompson'),
+    'ftm': (28, 'Wilt Chamberlain*'),
+    'fta': (39, 'Wilt Chamberlain*'),
+    'pf': (6, 'Multiple Players')
+}
+
+RECORD_TRACKER_COLUMNS = ['name', 'GP', 'GAMES_REMAINING', 'stat', 'current', 'per_game', 'projection',
+                          'personal_record', 'franchise_record', 'franchise_player', 'nba_record', 'nba_player']
+
+# record_crossings partition written by this tracker
+CROSSINGS_TRACKER = 'season'
+
+def load_game_logs(client=None):
+    """Load every stored Wolves game log with the tracked stats as numbers."""
+    columns = ','.join(['PLAYER_NAME', 'GAME_DATE'] + RECORD_TRACKER_STATS)
+    # Stable key order so no page is skipped or repeated; a short read raises
+    rows = fetch_table_rows('twolves_player_game_logs', columns, client=client,
+                            order_by=['Player_ID', 'Game_ID'], verify_count=True)
+    logs = pd.DataFrame(rows, columns=['PLAYER_NAME', 'GAME_DATE'] + RECORD_TRACKER_STATS)
+    # FG3M and BLK are stored as text
+    logs[RECORD_TRACKER_STATS] = logs[RECORD_TRACKER_STATS].apply(pd.to_numeric, errors='coerce')
+    logs['GAME_DATE'] = pd.to_datetime(logs['GAME_DATE'])
+    return logs
+
+def load_tracked_players(client=None):
+    """Names of the Wolves players with games this season, sorted."""
+    rows = fetch_table_rows('timberwolves_player_stats_season', 'PLAYER_NAME,GP', client=client,
+                            order_by=['PLAYER_ID'], verify_count=True)
+    players = pd.DataFrame(rows, columns=['PLAYER_NAME', 'GP'])
+    players = players[(pd.to_numeric(players['GP'], errors='coerce') > 0) & players['PLAYER_NAME'].notna()]
+    return sorted(players['PLAYER_NAME'].unique())
+
+def _season_projection(game_logs, player_names, season=None, schedule=None, as_of=None):
+    """Season totals, averages and projection inputs shared by the tracker and crossings."""
+    stats = RECORD_TRACKER_STATS
+    season = season or get_current_season()
+    season_start, _ = season_window(season)
+    in_season = game_logs['GAME_DATE'] >= pd.Timestamp(season_start)
+
+    team_games = team_games_played(schedule, game_logs, season, as_of)
+    game_dates = remaining_game_dates(schedule, as_of=as_of, season=season, games_played=team_games)
+
+    season_agg = game_logs[in_season].groupby('PLAYER_NAME')[stats].agg(['sum', 'mean'])
+    rates = recent_form_rates(game_logs, stats).reindex(player_names).fillna(0)
+    availability = availability_rates(game_logs, season).reindex(player_names).fillna(0)
+    return {
+        'team_games': team_games,
+        'game_dates': game_dates,
+        'totals': season_agg.xs('sum', axis=1, level=1).reindex(player_names).fillna(0)[stats],
+        'per_game': season_agg.xs('mean', axis=1, level=1).reindex(player_names).fillna(0)[stats],
+        # Expected output per remaining team game
+        'expected': rates[stats].mul(availability, axis=0)
+    }
+
+def compute_record_tracker(game_logs, player_names, season=None, schedule=None, as_of=None):
+    """Compute record_tracker_season rows for every player and stat.
+
+    Args:
+        game_logs (pd.DataFrame): PLAYER_NAME, GAME_DATE and the tracked stats
+            for every stored game (all seasons)
+        player_names (list): Players to track, in output order
+        season (str, optional): Season like '2024-25'; defaults to the current one
+        schedule (pd.DataFrame, optional): get_team_schedule() for the season;
+            without it games are counted from the logs and an 82-game calendar
+        as_of (date, optional): Day to project from; defaults to today
+
+    Returns:
+        pd.DataFrame: One row per player and stat with RECORD_TRACKER_COLUMNS
+    """
+    stats = RECORD_TRACKER_STATS
+    projection = _season_projection(game_logs, player_names, season, schedule, as_of)
+    games_remaining = len(projection['game_dates'])
+
+    # Personal bests (every stored season)
+    personal = game_logs.groupby('PLAYER_NAME')[stats].max().reindex(player_names).fillna(0)
+
+    # Franchise single-game records and the (earliest) player who holds them
+    franchise = game_logs[stats].max().fillna(0)
+    ordered = game_logs.sort_values('GAME_DATE', kind='stable')
+    franchise_player = [
+        ordered.loc[ordered[stat] == franchise[stat], 'PLAYER_NAME'].iloc[0]
+        if (ordered[stat] == franchise[stat]).any() else None
+        for stat in stats
+    ]
+
+    n_players, n_stats = len(player_names), len(stats)
+    stat_keys = [stat.lower() for stat in stats]
+    current = projection['totals'].to_numpy(dtype=np.float64).ravel()
+    return pd.DataFrame({
+        'name': np.repeat(player_names, n_stats),
+        'GP': projection['team_games'],
+        'GAMES_REMAINING': games_remaining,
+        'stat': np.tile(stat_keys, n_players),
+        'current': current,
+        'per_game': projection['per_game'].to_numpy(dtype=np.float64).ravel(),
+        'projection': current + projection['expected'].to_numpy(dtype=np.float64).ravel() * games_remaining,
+        'personal_record': personal[stats].to_numpy(dtype=np.float64).ravel(),
+        'franchise_record': np.tile(franchise[stats].to_numpy(dtype=np.float64), n_players),
+        'franchise_player': np.tile(np.array(franchise_player, dtype=object), n_players),
+        'nba_record': np.tile([NBA_GAME_RECORDS[key][0] for key in stat_keys], n_players),
+        'nba_player': np.tile([NBA_GAME_RECORDS[key][1] for key in stat_keys], n_players)
+    }, columns=RECORD_TRACKER_COLUMNS)
+
+def compute_record_crossings(game_logs, player_names, season=None, schedule=None, as_of=None):
+    """Project when each player passes the best season totals in the stored logs.
+
+    Targets per player and stat are the player's own best earlier season
+    ('personal_season_best') and the franchise's best earlier season
+    ('franchise_season_best'); targets with no earlier season are skipped.
+
+    Returns:
+        pd.DataFrame: record_crossings rows for the 'season' tracker
+    """
+    stats = RECORD_TRACKER_STATS
+    season = season or get_current_season()
+    season_start, _ = season_window(season)
+    projection = _season_projection(game_logs, player_names, season, schedule, as_of)
+
+    # Season totals of earlier seasons (a season starts in October)
+    earlier = game_logs[game_logs['GAME_DATE'] < pd.Timestamp(season_start)]
+    season_year = earlier['GAME_DATE'].dt.year - (earlier['GAME_DATE'].dt.month < 10)
+    season_totals = earlier.groupby([earlier['PLAYER_NAME'], season_year])[stats].sum()
+    personal_best = season_totals.groupby(level=0).max().reindex(player_names)
+    franchise_best = season_totals.max()
+
+    n_players, n_stats = len(player_names), len(stats)
+    names = np.repeat(player_names, n_stats)
+    stat_keys = np.tile([stat.lower() for stat in stats], n_players)
+    current = projection['totals'].to_numpy(dtype=np.float64).ravel()
+    expected = projection['expected'].to_numpy(dtype=np.float64).ravel()
+    target_values = {
+        'personal_season_best': personal_best[stats].to_numpy(dtype=np.float64).ravel(),
+        'franchise_season_best': np.tile(franchise_best.reindex(stats).to_numpy(dtype=np.float64), n_players)
+    }
+
+    frames = []
+    for target, values in target_values.items():
+        known = ~np.isnan(values)
+        frames.append(record_crossings_frame(
+            CROSSINGS_TRACKER, names[known], stat_keys[known], target, values[known], current[known],
+            expected[known], len(projection['game_dates']), projection['game_dates']
+        ))
+    return pd.concat(frames, ignore_index=True)
+
+def update_record_tracker_season(client=None, season=None, schedule=None):
+    """Rebuild record_tracker_season and its record crossings from the stored game logs.
+
+    Returns:
+        pd.DataFrame or None: The tracker rows written, or None if the read or write failed
+    """
+    try:
+        game_logs = load_game_logs(client)
+        player_names = load_tracked_players(client)
+    except Exception as e:
+        logger.error(f"Error loading record tracker inputs: {str(e)}")
+        return None
+    schedule = schedule if schedule is not None else get_team_schedule(season=season)
+    logger.info(f"Loaded {len(game_logs)} game logs for {len(player_names)} tracked players")
+
+    tracker = compute_record_tracker(game_logs, player_names, season, schedule)
+    # Upsert every (player, stat) and drop rows of players no longer tracked
+    if not replace_partition(tracker, 'record_tracker_season', ['name', 'stat'], client=client):
+        return None
+
+    crossings = compute_record_crossings(game_logs, player_names, season, schedule)
+    if not replace_partition(crossings, RECORD_CROSSINGS_TABLE, RECORD_CROSSINGS_KEY,
+                             {'tracker': CROSSINGS_TRACKER}, client=client):
+        logger.error("Record tracker updated but record crossings were not")
+    return tracker
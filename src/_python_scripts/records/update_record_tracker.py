@@ -6,6 +6,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils import get_supabase_client
+from record_tracker_engine import update_record_tracker_season
 
 # Load environment variables
 load_dotenv()
@@ -14,11 +15,18 @@ load_dotenv()
 supabase = get_supabase_client()
 
 def update_record_tracker():
-    """Update record_tracker_season table using stored procedure"""
+    """Update record_tracker_season table from one pass over the game logs
+
+    Returns:
+        bool: True if the tracker was written
+    """
     try:
-        # Call the stored procedure
-        result = supabase.rpc('create_record_tracker_season').execute()
-        print("Successfully called create_record_tracker_season procedure")
+        # Compute every player's records locally and bulk-write them
+        tracker = update_record_tracker_season(client=supabase)
+        if tracker is None:
+            print("Error writing record_tracker_season")
+            return False
+        print(f"Successfully wrote {len(tracker)} record tracker rows")
         
         # Verify the update
         verify = supabase.table('record_tracker_season').select('*').execute()
@@ -37,11 +45,12 @@ def update_record_tracker():
             print(f"Projection: {sample['projection']}")
         else:
             print("No records found after update")
+        return True
 
     except Exception as e:
         print(f"Error updating record_tracker_season table: {str(e)}")
-        print("\nPlease ensure the create_record_tracker_season function exists in your Supabase database.")
-        print("You can create it using the SQL provided in the documentation.")
+        return False
 
 if __name__ == "__main__":
-    update_record_tracker() 
\ No newline at end of file
+    if not update_record_tracker():
+        sys.exit(1) 
\ No newline at end of file
@@ -1,8 +1,9 @@
 from nba_api.stats.endpoints import leaguedashplayerstats, teamgamelogs
 import pandas as pd
+import sys
 from datetime import datetime
 from dotenv import load_dotenv
-from src._python_scripts.utils import get_supabase_client, load_to_supabase
+from src._python_scripts.utils import get_supabase_client, sync_partition
 
 # Load environment variables
 load_dotenv()
@@ -56,6 +57,8 @@ def get_timberwolves_stats(last_n_games=0):
     return df
 
 def save_to_supabase():
+    """Save each timeframe's stats; returns False if any of them failed"""
+    saved = True
     timeframes = [
         (0, "season", "timberwolves_player_stats_season"),
         (5, "last_5", "timberwolves_player_stats_last_5"),
@@ -70,11 +73,13 @@ def save_to_supabase():
             # Convert PLAYER_ID to integer (bigint in Supabase)
             stats_df['PLAYER_ID'] = stats_df['PLAYER_ID'].astype(int)
             
-            # Delete existing records with a WHERE clause that matches all records
-            supabase.table(table_name).delete().neq('PLAYER_ID', 0).execute()
-            
-            # Use utility to insert new records
-            load_to_supabase(stats_df, table_name)
+            # Only write players whose stats changed; the run timestamp alone
+            # does not count as a change
+            if not sync_partition(stats_df, table_name, ['PLAYER_ID'], ignore_columns=['TIMESTAMP'],
+                                  client=supabase):
+                print(f"Error saving {timeframe} stats to {table_name}")
+                saved = False
+                continue
             print(f"Successfully saved stats to {table_name}")
             
             # Print preview of the data
@@ -84,6 +89,10 @@ def save_to_supabase():
 
         except Exception as e:
             print(f"Error saving {timeframe} stats to {table_name}: {str(e)}")
+            saved = False
+
+    return saved
 
 if __name__ == "__main__":
-    save_to_supabase()
\ No newline at end of file
+    if not save_to_supabase():
+        sys.exit(1)
\ No newline at end of file
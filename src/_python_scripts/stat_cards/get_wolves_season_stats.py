@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 import pandas as pd
+import sys
 from nba_api.stats.endpoints import LeagueDashPlayerStats, CommonTeamRoster
-import time
 import logging
 from dotenv import load_dotenv
 import os
 import re
-from src._python_scripts.utils import get_supabase_client, load_to_supabase
+from src._python_scripts.utils import get_supabase_client, sync_partition
 
 # Configure logging to output progress messages
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -57,7 +57,6 @@ def fetch_timberwolves_stats(season=SEASON, team_id=TEAM_ID):
     the desired order and naming conventions.
     """
     logging.info("Starting to fetch Timberwolves stats for season %s", season)
-    time.sleep(1)
     
     # Fetch stats using LeagueDashPlayerStats
     logging.info("Fetching player stats from LeagueDashPlayerStats")
@@ -134,9 +133,10 @@ def fetch_timberwolves_stats(season=SEASON, team_id=TEAM_ID):
         lambda x: BASE_IMAGE_URL + normalize_player_name(x) + ".png" if isinstance(x, str) else None
     )
     
-    # Create an 'id' column as a sequential unique identifier starting at 1.
+    # Key rows by player so the id is stable between runs and unchanged
+    # players are not rewritten.
     logging.info("Adding id column")
-    df_merged.insert(0, 'id', range(1, len(df_merged) + 1))
+    df_merged.insert(0, 'id', df_merged['player_id'])
     
     # Reorder columns to match the desired order
     desired_order = [
@@ -202,12 +202,13 @@ if __name__ == "__main__":
         for col in percentage_columns:
             df_stats[col] = df_stats[col].apply(lambda x: x/100 if x is not None else None)
         
-        # Use utility to upload new records
-        supabase.table('nba_player_stats').delete().neq('id', 0).execute()
-        load_to_supabase(df_stats, 'nba_player_stats')
+        # Only write players whose stats changed since the last run
+        if not sync_partition(df_stats, 'nba_player_stats', ['player_id'], client=supabase):
+            sys.exit(1)
         logging.info("Successfully saved stats to Supabase table 'nba_player_stats'")
         
     except Exception as e:
         logging.error("Error saving stats to Supabase: %s", str(e))
+        sys.exit(1)
     
     logging.info("Script finished")
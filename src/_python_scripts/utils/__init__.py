@@ -2,6 +2,12 @@
 from .supabase_utils import (
     get_supabase_client,
     load_to_supabase,
+    bulk_load_to_supabase,
+    replace_partition,
+    sync_partition,
+    fetch_table_rows,
+    delete_keys,
+    table_fingerprint,
     execute_sql,
     test_supabase_connection
 )
@@ -9,8 +15,31 @@ from .supabase_utils import (
 from .nba_api_utils import (
     api_call_with_retry,
     fetch_nba_data,
+    fetch_nba_data_conditional,
+    install_nba_api_cache,
     get_current_season,
     get_player_stats,
     get_player_career_stats,
     get_lineup_stats
-) 
\ No newline at end of file
+) 
+
+from .projection_utils import (
+    SEASON_GAMES,
+    RECORD_CROSSINGS_TABLE,
+    RECORD_CROSSINGS_KEY,
+    season_window,
+    get_team_schedule,
+    team_games_played,
+    remaining_game_dates,
+    games_until_age,
+    recent_form_rates,
+    availability_rates,
+    project_totals,
+    record_crossing_dates,
+    record_crossings_frame
+)
+
+from .rate_limiter import (
+    RateLimiter,
+    get_rate_limiter
+)
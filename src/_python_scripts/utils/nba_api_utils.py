@@ -1,23 +1,217 @@
+import hashlib
+import json
 import logging
-import random
+import os
+import threading
 import time
 from http.client import RemoteDisconnected
+import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 import pandas as pd
 from nba_api.stats.endpoints import leaguedashplayerstats, leaguedashlineups
 from nba_api.stats.endpoints import leaguegamefinder, playercareerstats
+from nba_api.stats.library.http import NBAStatsHTTP
 from datetime import datetime
+from .rate_limiter import get_rate_limiter
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-def api_call_with_retry(api_func, max_retries=3, delay_base=2):
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+DEFAULT_TIMEOUT = 10
+
+# Host nba_api stats endpoints are served from
+NBA_STATS_HOST = 'stats.nba.com'
+
+# Statuses that mean the host is throttling or struggling
+THROTTLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Connections kept alive per host; sized for polling a full slate of games
+HTTP_POOL_SIZE = 32
+
+# Shared session so repeated polls reuse keep-alive connections
+_http_session = requests.Session()
+_http_session.mount('https://', HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE))
+
+# Validators and parsed JSON of the last 200 response per URL
+_response_cache = {}
+_response_cache_lock = threading.Lock()
+
+# On-disk cache of stats.nba.com responses shared by every nba_api endpoint
+# call in the process (set NBA_API_CACHE=0 to disable)
+NBA_API_CACHE_ENABLED = os.environ.get('NBA_API_CACHE', '1') != '0'
+NBA_API_CACHE_DIR = os.environ.get(
+    'NBA_API_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'nba_api')
+)
+
+# Seconds a current-season response stays fresh, per endpoint
+NBA_API_CACHE_TTLS = {
+    'playercareerstats': 12 * 3600,
+    'commonallplayers': 12 * 3600,
+    'commonteamroster': 6 * 3600,
+    'commonplayerinfo': 24 * 3600,
+    'playergamelog': 3600,
+    'playergamelogs': 3600,
+    'teamgamelogs': 3600,
+    'leaguedashplayerstats': 15 * 60,
+    'leaguedashlineups': 15 * 60,
+    'leaguehustlestatsplayer': 15 * 60,
+    'leaguegamefinder': 15 * 60,
+    'leagueleaders': 15 * 60,
+    'scheduleleaguev2': 3600,
+}
+NBA_API_DEFAULT_TTL = 15 * 60
+
+# Past seasons and finished careers no longer change
+NBA_API_FROZEN_TTL = 365 * 24 * 3600
+
+_SEASON_PARAMETERS = ('Season', 'SeasonNullable', 'SeasonYear', 'SeasonYearNullable')
+
+def _season_start_year(season):
+    try:
+        return int(str(season)[:4])
+    except (TypeError, ValueError):
+        return None
+
+def _nba_api_cache_ttl(endpoint, params, payload):
+    """Pick how long a stats.nba.com response may be served from the cache."""
+    current_year = _season_start_year(get_current_season())
+
+    for name in _SEASON_PARAMETERS:
+        year = _season_start_year(params.get(name))
+        if year is not None and year < current_year:
+            return NBA_API_FROZEN_TTL
+
+    if endpoint == 'playercareerstats':
+        # A career whose last season is two or more seasons old is over
+        for result in payload.get('resultSets', []):
+            if result.get('name') == 'SeasonTotalsRegularSeason' and result.get('rowSet'):
+                season_index = result['headers'].index('SEASON_ID')
+                last_year = _season_start_year(result['rowSet'][-1][season_index])
+                if last_year is not None and last_year <= current_year - 2:
+                    return NBA_API_FROZEN_TTL
+
+    return NBA_API_CACHE_TTLS.get(endpoint, NBA_API_DEFAULT_TTL)
+
+class CachedNBASession(requests.Session):
+    """requests session for nba_api that serves repeated calls from disk.
+
+    Responses are keyed by endpoint and normalized parameters, so the same
+    roster or career request made by several scripts in one nightly run (or
+    by a rerun after a failure) only reaches stats.nba.com once while fresh.
+    Requests that do go out wait for the host's shared rate limiter, which
+    learns from their latency and status.
+    """
+
+    def __init__(self, cache_dir=NBA_API_CACHE_DIR, enabled=NBA_API_CACHE_ENABLED):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.enabled = enabled
+        self.mount('https://', HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE))
+
+    @staticmethod
+    def cache_key(url, params):
+        endpoint = url.rstrip('/').rsplit('/', 1)[-1].lower()
+        normalized = sorted((str(k), '' if v is None else str(v)) for k, v in dict(params or {}).items())
+        return endpoint, normalized
+
+    def _cache_path(self, endpoint, normalized):
+        digest = hashlib.md5(json.dumps(normalized).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, endpoint, f"{digest}.json")
+
+    def _read(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry['fetched_at'] > entry['ttl']:
+            return None
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = entry['text'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = entry['url']
+        return response
+
+    def _write(self, path, endpoint, params, response):
+        try:
+            payload = response.json()
+        except ValueError:
+            return
+        entry = {
+            'url': response.url,
+            'fetched_at': time.time(),
+            'ttl': _nba_api_cache_ttl(endpoint, params, payload),
+            'text': response.text
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache {endpoint} response: {str(e)}")
+
+    def _send(self, method, url, params=None, **kwargs):
+        limiter = get_rate_limiter()
+        limiter.acquire(url)
+        started = time.monotonic()
+        response = super().request(method, url, params=params, **kwargs)
+        if response.status_code in THROTTLE_STATUS_CODES:
+            limiter.record_failure(url)
+        else:
+            limiter.record_success(url, time.monotonic() - started)
+        return response
+
+    def request(self, method, url, params=None, **kwargs):
+        if not self.enabled or method.upper() != 'GET':
+            return self._send(method, url, params=params, **kwargs)
+
+        endpoint, normalized = self.cache_key(url, params)
+        path = self._cache_path(endpoint, normalized)
+        cached = self._read(path)
+        if cached is not None:
+            logger.debug(f"nba_api cache hit: {endpoint} {dict(normalized)}")
+            return cached
+
+        response = self._send(method, url, params=params, **kwargs)
+        if response.status_code == 200:
+            self._write(path, endpoint, dict(normalized), response)
+        return response
+
+def install_nba_api_cache(session=None):
+    """Route every nba_api stats endpoint call through the caching session.
+    
+    Called on import of utils; scripts only need to import it.
+    
+    Returns:
+        CachedNBASession: The installed session
+    """
+    session = session or CachedNBASession()
+    NBAStatsHTTP.set_session(session)
+    return session
+
+_nba_stats_session = install_nba_api_cache()
+
+def api_call_with_retry(api_func, max_retries=3, host=NBA_STATS_HOST):
     """Make NBA API call with retry logic.
     
+    Request pacing is left to the shared per-host rate limiter, so healthy
+    calls never sleep. A timeout or dropped connection marks the host as
+    throttling: it backs off exponentially and slows down before the retry.
+    
     Args:
         api_func (callable): Function to call the NBA API
-        max_retries (int): Maximum number of retry attempts
-        delay_base (int): Base delay time between retries (will be randomized)
+        max_retries (int): Maximum number of attempts
+        host (str): Host the call goes to, for the rate limiter
     
     Returns:
         The result of the API call
@@ -25,42 +219,77 @@ def api_call_with_retry(api_func, max_retries=3, delay_base=2):
     Raises:
         Exception: If all retry attempts fail
     """
+    limiter = get_rate_limiter()
     for attempt in range(max_retries):
         try:
-            # Add randomized delay between attempts
-            if attempt > 0:
-                delay = random.uniform(delay_base, delay_base * 2)
-                logger.info(f"Retry attempt {attempt + 1}, waiting {delay:.1f} seconds...")
-                time.sleep(delay)
-            
             return api_func()
             
         except (RequestException, RemoteDisconnected) as e:
             if attempt == max_retries - 1:  # Last attempt
                 logger.error(f"Final attempt failed: {str(e)}")
                 raise  # Re-raise the last exception
-            logger.warning(f"API call failed: {str(e)}, retrying...")
-            continue
+            delay = limiter.record_failure(host)
+            logger.warning(f"API call failed: {str(e)}, retry attempt {attempt + 2} in {delay:.1f} seconds...")
+            time.sleep(delay)
+
+def fetch_nba_data_conditional(url, headers=None, timeout=DEFAULT_TIMEOUT):
+    """Fetch data from NBA website using a conditional GET.
+
+    The ETag / Last-Modified validators of the previous response for the URL
+    are sent back, and a 304 reply is answered from the cached parsed JSON.
+    
+    Args:
+        url (str): The URL to fetch data from
+        headers (dict, optional): Headers to use for the request
+        timeout (float): Request timeout in seconds
+    
+    Returns:
+        tuple: (dict JSON response, bool True if the document changed since the last fetch)
+    """
+    request_headers = dict(headers or DEFAULT_HEADERS)
+
+    with _response_cache_lock:
+        cached = _response_cache.get(url)
+    if cached:
+        if cached['etag']:
+            request_headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            request_headers['If-Modified-Since'] = cached['last_modified']
 
-def fetch_nba_data(url, headers=None):
+    response = _http_session.get(url, headers=request_headers, timeout=timeout)
+
+    if response.status_code == 304 and cached:
+        logger.debug(f"Not modified: {url}")
+        return cached['data'], False
+
+    response.raise_for_status()
+    data = response.json()
+
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+    if etag or last_modified:
+        with _response_cache_lock:
+            _response_cache[url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'data': data
+            }
+
+    return data, True
+
+def fetch_nba_data(url, headers=None, timeout=DEFAULT_TIMEOUT):
     """Fetch data from NBA website.
     
     Args:
         url (str): The URL to fetch data from
         headers (dict, optional): Headers to use for the request
+        timeout (float): Request timeout in seconds
     
     Returns:
         dict: JSON response from the API
     """
-    import requests
-    if not headers:
-        headers = {
-            "Accept": "application/json",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-    
-    response = requests.get(url, headers=headers)
-    return response.json()
+    data, _ = fetch_nba_data_conditional(url, headers, timeout)
+    return data
 
 def get_current_season():
     """Get the current NBA season in the format '2023-24'.
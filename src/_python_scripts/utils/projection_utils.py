@@ -0,0 +1,268 @@
+"""Projection helpers shared by the record tracker and the age tracker.
+
+Games remaining come from the team's real schedule (stats.nba.com
+scheduleleaguev2) instead of "82 minus games played" heuristics; seasons
+whose schedule is not out yet are filled with an evenly spaced 82-game
+calendar. Per-game rates weight recent games more heavily (exponential decay
+by game), and each player's expected output per team game is scaled by how
+many of the team's games they actually play. Everything works on whole
+frames/arrays so a rerun after every game costs milliseconds.
+"""
+from datetime import date, datetime
+import logging
+import numpy as np
+import pandas as pd
+from nba_api.stats.endpoints import scheduleleaguev2
+from .nba_api_utils import api_call_with_retry, get_current_season
+
+logger = logging.getLogger(__name__)
+
+SEASON_GAMES = 82
+TIMBERWOLVES_TEAM_ID = 1610612750
+
+# Regular-season game ids start with 002; gameStatus 3 is final
+REGULAR_SEASON_GAME_PREFIX = '002'
+FINAL_GAME_STATUS = 3
+
+# Typical regular-season span (month, day), used when no schedule is available
+REGULAR_SEASON_START = (10, 22)
+REGULAR_SEASON_END = (4, 13)
+
+# Recent form: a game's weight halves every RECENT_FORM_HALF_LIFE games back
+RECENT_FORM_HALF_LIFE = 10
+RECENT_FORM_GAMES = 82
+
+# Table of precomputed record-crossing dates, one partition per tracker
+RECORD_CROSSINGS_TABLE = 'record_crossings'
+RECORD_CROSSINGS_KEY = ['tracker', 'name', 'stat', 'target']
+
+def season_window(season=None):
+    """Return (first day, last day) of a season such as '2024-25' (Oct 1 - Jun 30)."""
+    start_year = int((season or get_current_season())[:4])
+    return date(start_year, 10, 1), date(start_year + 1, 6, 30)
+
+def get_team_schedule(team_id=TIMBERWOLVES_TEAM_ID, season=None):
+    """Get a team's regular-season schedule.
+
+    Args:
+        team_id (int): NBA team ID
+        season (str, optional): Season in format '2024-25'. Defaults to current season.
+
+    Returns:
+        pd.DataFrame or None: GAME_ID, GAME_DATE and FINAL per game in date
+            order, or None if the schedule could not be fetched
+    """
+    season = season or get_current_season()
+    logger.info(f"Fetching {season} schedule for team {team_id}")
+
+    try:
+        games = api_call_with_retry(
+            lambda: scheduleleaguev2.ScheduleLeagueV2(season=season).season_games.get_data_frame()
+        )
+    except Exception as e:
+        logger.error(f"Error fetching {season} schedule: {str(e)}")
+        return None
+
+    games = games[((games['homeTeam_teamId'] == team_id) | (games['awayTeam_teamId'] == team_id))
+                  & games['gameId'].astype(str).str.startswith(REGULAR_SEASON_GAME_PREFIX)]
+    schedule = pd.DataFrame({
+        'GAME_ID': games['gameId'].astype(str),
+        'GAME_DATE': pd.to_datetime(games['gameDateEst'].astype(str).str[:10]),
+        'FINAL': pd.to_numeric(games['gameStatus'], errors='coerce') == FINAL_GAME_STATUS
+    })
+    return schedule.drop_duplicates('GAME_ID').sort_values('GAME_DATE', kind='stable').reset_index(drop=True)
+
+def _season_calendar(start_year, games=SEASON_GAMES, first_day=None):
+    """Evenly spaced dates for a season's remaining games (no schedule published)."""
+    start = pd.Timestamp(date(start_year, *REGULAR_SEASON_START))
+    end = pd.Timestamp(date(start_year + 1, *REGULAR_SEASON_END))
+    if first_day is not None:
+        start = max(start, pd.Timestamp(first_day))
+    if games <= 0 or start > end:
+        return pd.DatetimeIndex([])
+    return pd.DatetimeIndex(np.linspace(start.value, end.value, games)).normalize()
+
+def team_games_played(schedule=None, game_logs=None, season=None, as_of=None):
+    """Team games played so far this season.
+
+    Final games in the schedule when it is available, otherwise distinct game
+    days in the team's game logs within the season.
+    """
+    as_of = pd.Timestamp(as_of or date.today())
+    if schedule is not None:
+        return int((schedule['FINAL'] & (schedule['GAME_DATE'] <= as_of)).sum())
+    if game_logs is None or game_logs.empty:
+        return 0
+    season_start, season_end = season_window(season)
+    dates = game_logs['GAME_DATE']
+    in_season = (dates >= pd.Timestamp(season_start)) & (dates <= pd.Timestamp(season_end))
+    return int(dates[in_season].dt.normalize().nunique())
+
+def remaining_game_dates(schedule=None, until=None, as_of=None, season=None, games_played=0):
+    """Dates of the team's games still to be played.
+
+    Args:
+        schedule (pd.DataFrame, optional): get_team_schedule() for the season
+        until (date, optional): Last day to count; defaults to the end of the season
+        as_of (date, optional): Count from this day; defaults to today
+        season (str, optional): Season of the schedule; defaults to the current one
+        games_played (int): Team games already played, used only without a schedule
+
+    Returns:
+        pd.DatetimeIndex: One date per remaining game, in order. Seasons after
+            the current one use an evenly spaced 82-game calendar.
+    """
+    as_of = pd.Timestamp(as_of or date.today()).normalize()
+    start_year = int((season or get_current_season())[:4])
+
+    if schedule is not None:
+        upcoming = schedule[~schedule['FINAL'] & (schedule['GAME_DATE'] >= as_of)]
+        dates = pd.DatetimeIndex(upcoming['GAME_DATE'])
+    else:
+        dates = _season_calendar(start_year, SEASON_GAMES - games_played, as_of)
+
+    if until is not None:
+        until = pd.Timestamp(until)
+        # Later seasons up to the cut-off, whose schedules are not out yet
+        later = [_season_calendar(year) for year in range(start_year + 1, until.year + 1)]
+        dates = dates.append(later) if later else dates
+        dates = dates[(dates >= as_of) & (dates <= until)]
+    return dates
+
+def games_until_age(birthdate, age=25, schedule=None, as_of=None, games_played=0):
+    """Team games left before a player's birthday at the given age.
+
+    Args:
+        birthdate (str or date): Birthdate, 'YYYY-MM-DD' or ISO datetime
+        age (int): Age whose birthday ends the window
+        schedule (pd.DataFrame, optional): Current season schedule
+        as_of (date, optional): Count from this day; defaults to today
+        games_played (int): Team games already played this season, used only
+            without a schedule (see team_games_played)
+
+    Returns:
+        int: Scheduled (or, for future seasons, typical) games before that birthday
+    """
+    if isinstance(birthdate, str):
+        birthdate = datetime.strptime(birthdate.split('T')[0], '%Y-%m-%d').date()
+    try:
+        birthday = birthdate.replace(year=birthdate.year + age)
+    except ValueError:  # Feb 29
+        birthday = birthdate.replace(year=birthdate.year + age, day=28)
+    until = pd.Timestamp(birthday) - pd.Timedelta(days=1)
+    return len(remaining_game_dates(schedule, until=until, as_of=as_of, games_played=games_played))
+
+def recent_form_rates(game_logs, stats, half_life=RECENT_FORM_HALF_LIFE, window=RECENT_FORM_GAMES,
+                      player_column='PLAYER_NAME'):
+    """Per-game rates weighted towards each player's latest games.
+
+    Args:
+        game_logs (pd.DataFrame): One row per player and game with GAME_DATE and the stats
+        stats (list): Stat columns
+        half_life (float): Games after which a game's weight halves
+        window (int): Most recent games per player considered
+        player_column (str): Column identifying the player
+
+    Returns:
+        pd.DataFrame: Players x stats of weighted per-game averages
+    """
+    logs = game_logs.sort_values([player_column, 'GAME_DATE'], ascending=[True, False], kind='stable')
+    recency = logs.groupby(player_column).cumcount().to_numpy()
+    keep = recency < window
+    logs = logs[keep]
+    weights = 0.5 ** (recency[keep] / half_life)
+
+    values = logs[stats].astype(np.float64)
+    players = logs[player_column].to_numpy()
+    weighted = values.mul(weights, axis=0).groupby(players).sum()
+    total_weight = values.notna().mul(weights, axis=0).groupby(players).sum()
+    return (weighted / total_weight.replace(0, np.nan)).fillna(0)
+
+def availability_rates(game_logs, season=None, player_column='PLAYER_NAME'):
+    """Share of the team's games each player played.
+
+    Uses the season's games so far; before the team's first game of the season
+    the previous season is used instead.
+
+    Returns:
+        pd.Series: Player -> games played / team games (empty if no games)
+    """
+    dates = game_logs['GAME_DATE'].dt.normalize()
+    season = season or get_current_season()
+    for start_year in (int(season[:4]), int(season[:4]) - 1):
+        start, end = season_window(f"{start_year}-{str(start_year + 1)[-2:]}")
+        in_season = (dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end))
+        team_games = dates[in_season].nunique()
+        if team_games:
+            played = dates[in_season].groupby(game_logs.loc[in_season, player_column]).nunique()
+            return (played / team_games).clip(upper=1.0)
+    return pd.Series(dtype=np.float64)
+
+def project_totals(current, per_game, availability, games_remaining):
+    """Projected totals: current + per-game rate x availability x games remaining."""
+    return np.asarray(current, dtype=np.float64) + (
+        np.asarray(per_game, dtype=np.float64) * np.asarray(availability, dtype=np.float64) * games_remaining
+    )
+
+def record_crossing_dates(current, expected_per_game, targets, game_dates):
+    """Team game on which each projected total first reaches its target.
+
+    Args:
+        current (array-like): Current totals
+        expected_per_game (array-like): Expected output per team game (rate x availability)
+        targets (array-like): Values to reach; all three broadcast together
+        game_dates (pd.DatetimeIndex): Dates of the remaining team games
+
+    Returns:
+        tuple: (games_needed, dates). games_needed is 0 for targets already
+            reached and NaN for ones that are never reached at the current
+            rate; dates is NaT when the crossing falls after game_dates.
+    """
+    current, per_game, targets = np.broadcast_arrays(
+        np.asarray(current, dtype=np.float64),
+        np.asarray(expected_per_game, dtype=np.float64),
+        np.asarray(targets, dtype=np.float64)
+    )
+    deficit = targets - current
+    games_needed = np.full(deficit.shape, np.nan)
+    games_needed[deficit <= 0] = 0
+
+    reachable = (deficit > 0) & (per_game > 0)
+    games_needed[reachable] = np.ceil(deficit[reachable] / per_game[reachable] - 1e-9)
+
+    dates = np.full(deficit.shape, np.datetime64('NaT'), dtype='datetime64[ns]')
+    on_schedule = reachable & (games_needed <= len(game_dates))
+    dates[on_schedule] = game_dates.to_numpy()[games_needed[on_schedule].astype(np.int64) - 1]
+    return games_needed, dates
+
+def record_crossings_frame(tracker, names, stats, targets, target_values, current, expected_per_game,
+                           games_remaining, game_dates):
+    """Build record_crossings rows for a batch of (player, stat, target) entries.
+
+    Args:
+        tracker (str): Partition name, e.g. 'season' or 'age_25'
+        names, stats, targets (array-like): Player, stat and target label per row
+        target_values (array-like): Value to reach per row
+        current (array-like): Current total per row
+        expected_per_game (array-like): Expected output per team game per row
+        games_remaining (int): Team games in the projection window
+        game_dates (pd.DatetimeIndex): Dates of those games
+
+    Returns:
+        pd.DataFrame: Rows ready for replace_partition on RECORD_CROSSINGS_KEY
+    """
+    games_needed, dates = record_crossing_dates(current, expected_per_game, target_values, game_dates)
+    projected = np.asarray(current, dtype=np.float64) + np.asarray(expected_per_game, dtype=np.float64) * games_remaining
+    crossings = pd.DataFrame({
+        'tracker': tracker,
+        'name': names,
+        'stat': stats,
+        'target': targets,
+        'target_value': np.asarray(target_values, dtype=np.float64),
+        'current': np.asarray(current, dtype=np.float64),
+        'projected_total': projected,
+        'games_needed': pd.array(games_needed, dtype='Int64'),
+        'projected_date': pd.Series(dates).dt.strftime('%Y-%m-%d').to_numpy()
+    })
+    # Supabase expects null, not NaN/NaT
+    return crossings.astype(object).where(crossings.notna(), None)
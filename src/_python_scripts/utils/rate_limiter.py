@@ -0,0 +1,132 @@
+import logging
+import os
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Starting, lowest and highest request rates (requests/second) per host
+DEFAULT_RATE = float(os.environ.get('NBA_API_RATE', 1.0))
+MIN_RATE = float(os.environ.get('NBA_API_MIN_RATE', 0.2))
+MAX_RATE = float(os.environ.get('NBA_API_MAX_RATE', 4.0))
+
+# Requests that may be sent back-to-back when the bucket is full
+DEFAULT_BURST = 2
+
+# Responses faster than this speed the bucket up, slower ones slow it down
+FAST_RESPONSE_SECONDS = 1.0
+SLOW_RESPONSE_SECONDS = 5.0
+RATE_INCREASE_STEP = 0.1
+SLOW_RATE_FACTOR = 0.8
+FAILURE_RATE_FACTOR = 0.5
+
+# Exponential backoff after throttling/timeouts: base * 2**(failures - 1)
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 60.0
+
+class TokenBucket:
+    """Adaptive token bucket for one host.
+
+    Tokens refill at `rate` per second up to `burst`. The rate grows while
+    responses come back fast and is cut on slow responses and failures; a
+    failure also pauses the host with an exponential backoff.
+    """
+
+    def __init__(self, host, rate=DEFAULT_RATE, burst=DEFAULT_BURST, min_rate=MIN_RATE, max_rate=MAX_RATE):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Block until a request to the host may be sent.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+            waited += wait
+
+    def record_success(self, seconds):
+        """Adapt the rate to the latency of a successful response."""
+        with self._lock:
+            self.failures = 0
+            if seconds < FAST_RESPONSE_SECONDS:
+                self.rate = min(self.max_rate, self.rate + RATE_INCREASE_STEP)
+            elif seconds > SLOW_RESPONSE_SECONDS:
+                self.rate = max(self.min_rate, self.rate * SLOW_RATE_FACTOR)
+
+    def record_failure(self):
+        """Slow down and pause the host after throttling or a timeout.
+
+        Returns:
+            float: Seconds until the host may be called again
+        """
+        with self._lock:
+            self.failures += 1
+            self.rate = max(self.min_rate, self.rate * FAILURE_RATE_FACTOR)
+            backoff = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 1)) * random.uniform(1, 1.5)
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + backoff)
+            self.tokens = 0.0
+            self.updated = now
+            remaining = self.blocked_until - now
+        logger.warning(f"Backing off {self.host} for {remaining:.1f}s "
+                       f"(failure {self.failures}, rate now {self.rate:.2f}/s)")
+        return remaining
+
+class RateLimiter:
+    """Process-wide registry of per-host token buckets."""
+
+    def __init__(self, **bucket_options):
+        self.bucket_options = bucket_options
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_for(url_or_host):
+        return urlparse(url_or_host).hostname or url_or_host
+
+    def bucket(self, url_or_host):
+        host = self.host_for(url_or_host)
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(host, **self.bucket_options)
+            return self._buckets[host]
+
+    def acquire(self, url_or_host):
+        return self.bucket(url_or_host).acquire()
+
+    def record_success(self, url_or_host, seconds):
+        self.bucket(url_or_host).record_success(seconds)
+
+    def record_failure(self, url_or_host):
+        return self.bucket(url_or_host).record_failure()
+
+_rate_limiter = RateLimiter()
+
+def get_rate_limiter():
+    """Return the rate limiter shared by every NBA API caller in the process."""
+    return _rate_limiter
@@ -1,7 +1,16 @@
 import os
+import hashlib
+import json
 import logging
+import math
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
 import pandas as pd
-from supabase import create_client
+from supabase import create_client, ClientOptions
 from dotenv import load_dotenv
 
 # Configure logging
@@ -10,19 +19,20 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-def get_supabase_client():
-    """Initialize and return a Supabase client.
-    
-    Returns:
-        Supabase client instance
-    
-    Raises:
-        ValueError: If required environment variables are missing
-        Exception: If client creation fails
-    """
-    # Initialize Supabase client
-    supabase_url = os.environ.get('SUPABASE_URL', 'https://kuthirbcjtofsdwsfhkj.supabase.co')
-    supabase_key = os.environ.get('SUPABASE_KEY') or os.environ.get('VITE_SUPABASE_ANON_KEY')
+# Request timeouts (seconds) for the shared client's PostgREST connection pool
+SUPABASE_TIMEOUT = float(os.environ.get('SUPABASE_TIMEOUT', 60))
+SUPABASE_CONNECT_TIMEOUT = float(os.environ.get('SUPABASE_CONNECT_TIMEOUT', 10))
+
+# Process-wide client, created on first use
+_supabase_client = None
+_supabase_client_lock = threading.Lock()
+
+def _create_supabase_client():
+    """Create a Supabase client from the environment."""
+    supabase_url = (os.environ.get('SUPABASE_URL') or os.environ.get('VITE_SUPABASE_URL')
+                    or 'https://kuthirbcjtofsdwsfhkj.supabase.co')
+    supabase_key = (os.environ.get('SUPABASE_KEY') or os.environ.get('VITE_SUPABASE_ANON_KEY')
+                    or os.environ.get('SUPABASE_ANON_KEY'))
     
     if not supabase_key:
         error_msg = "Missing required environment variable: SUPABASE_KEY or VITE_SUPABASE_ANON_KEY"
@@ -30,55 +40,519 @@ def get_supabase_client():
         raise ValueError(error_msg)
 
     try:
-        client = create_client(supabase_url, supabase_key)
+        options = ClientOptions(
+            postgrest_client_timeout=httpx.Timeout(SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT)
+        )
+        client = create_client(supabase_url, supabase_key, options=options)
+        logger.info("Created shared Supabase client")
         return client
     except Exception as e:
         logger.error(f"Failed to create Supabase client: {str(e)}")
         raise
 
-def load_to_supabase(df, table_name, on_conflict=None):
+def get_supabase_client(fresh=False):
+    """Return the process-wide Supabase client.
+
+    The client is created once (thread-safely) and then shared, so every
+    caller reuses the same pooled keep-alive HTTP connections.
+    
+    Args:
+        fresh (bool): Discard the shared client and create a new one
+    
+    Returns:
+        Supabase client instance
+    
+    Raises:
+        ValueError: If required environment variables are missing
+        Exception: If client creation fails
+    """
+    global _supabase_client
+    client = _supabase_client
+    if client is not None and not fresh:
+        return client
+
+    with _supabase_client_lock:
+        if _supabase_client is None or fresh:
+            _supabase_client = _create_supabase_client()
+        return _supabase_client
+
+# Defaults for the chunked bulk writer
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 1.0
+
+def _iter_record_chunks(df, chunk_size):
+    """Yield (chunk_index, records) for consecutive slices of a DataFrame.
+
+    Records are materialised one slice at a time so large frames are never
+    converted to a single list of dictionaries.
+    """
+    for chunk_index, start in enumerate(range(0, len(df), chunk_size)):
+        yield chunk_index, df.iloc[start:start + chunk_size].to_dict('records')
+
+def _send_chunk(client, table_name, chunk_index, records, on_conflict, max_retries, backoff_base):
+    """Write one chunk, retrying upserts with exponential backoff.
+
+    Plain inserts are sent once: a request that timed out may still have
+    been committed, and sending it again would duplicate its rows.
+
+    Returns:
+        dict: Timing and outcome of the chunk
+    """
+    started = time.perf_counter()
+    error = None
+    attempts = max_retries if on_conflict else 1
+    for attempt in range(1, attempts + 1):
+        try:
+            if on_conflict:
+                client.table(table_name).upsert(records, on_conflict=on_conflict).execute()
+            else:
+                client.table(table_name).insert(records).execute()
+            error = None
+            break
+        except Exception as e:
+            error = str(e)
+            if attempt < attempts:
+                delay = backoff_base * (2 ** (attempt - 1)) * random.uniform(1, 1.5)
+                logger.warning(f"Chunk {chunk_index} of '{table_name}' failed (attempt {attempt}/{attempts}): "
+                               f"{error}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+    return {
+        'chunk': chunk_index,
+        'rows': len(records),
+        'attempts': attempt,
+        'seconds': round(time.perf_counter() - started, 3),
+        'ok': error is None,
+        'error': error
+    }
+
+def bulk_load_to_supabase(df, table_name, on_conflict=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                          max_workers=DEFAULT_MAX_WORKERS, max_retries=DEFAULT_MAX_RETRIES,
+                          backoff_base=DEFAULT_BACKOFF_BASE, client=None):
+    """Load a DataFrame to Supabase in concurrent, individually retried chunks.
+    
+    The load is not atomic: each chunk is its own request, so when a chunk
+    fails the chunks already written stay in the table. Only upserts (with
+    on_conflict) are retried, since resending one is idempotent; insert
+    chunks are tried once and reported as failed.
+    
+    Args:
+        df (pd.DataFrame): The DataFrame containing data to load
+        table_name (str): The name of the target Supabase table
+        on_conflict (str, optional): Column names to use for conflict resolution (upsert)
+        chunk_size (int): Rows per request
+        max_workers (int): Chunks sent concurrently
+        max_retries (int): Attempts per upsert chunk before it is reported as failed
+        backoff_base (float): Base delay in seconds for exponential backoff
+        client (optional): Supabase client to reuse. One is created if not given.
+    
+    Returns:
+        dict: Load report with 'table', 'rows', 'rows_written', 'chunks',
+            'failed_chunks', 'seconds' and per-chunk 'chunk_reports'
+    """
+    report = {
+        'table': table_name,
+        'rows': len(df),
+        'rows_written': 0,
+        'chunks': 0,
+        'failed_chunks': [],
+        'seconds': 0.0,
+        'chunk_reports': []
+    }
+    if df.empty:
+        logger.warning(f"No data to upload to Supabase table '{table_name}'.")
+        return report
+
+    started = time.perf_counter()
+    client = client or get_supabase_client()
+    mode = f"Upserting (on_conflict={on_conflict})" if on_conflict else "Inserting"
+    logger.info(f"{mode} {len(df)} records into '{table_name}' in chunks of {chunk_size} "
+                f"({max_workers} concurrent)")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_send_chunk, client, table_name, chunk_index, records,
+                            on_conflict, max_retries, backoff_base)
+            for chunk_index, records in _iter_record_chunks(df, chunk_size)
+        ]
+        for future in as_completed(futures):
+            chunk_report = future.result()
+            report['chunk_reports'].append(chunk_report)
+            if chunk_report['ok']:
+                report['rows_written'] += chunk_report['rows']
+                logger.debug(f"Chunk {chunk_report['chunk']} of '{table_name}': {chunk_report['rows']} rows "
+                             f"in {chunk_report['seconds']}s")
+            else:
+                report['failed_chunks'].append(chunk_report['chunk'])
+                logger.error(f"Chunk {chunk_report['chunk']} of '{table_name}' failed after "
+                             f"{chunk_report['attempts']} attempts: {chunk_report['error']}")
+
+    report['chunk_reports'].sort(key=lambda r: r['chunk'])
+    report['chunks'] = len(report['chunk_reports'])
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(f"Loaded {report['rows_written']}/{report['rows']} rows to '{table_name}' in "
+                f"{report['chunks']} chunks ({len(report['failed_chunks'])} failed) in {report['seconds']}s")
+    return report
+
+def load_to_supabase(df, table_name, on_conflict=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                     max_workers=DEFAULT_MAX_WORKERS):
     """Load DataFrame data to Supabase.
     
+    Chunks are written independently (see bulk_load_to_supabase), so a
+    False result can leave part of the rows written.
+    
     Args:
         df (pd.DataFrame): The DataFrame containing data to load
         table_name (str): The name of the target Supabase table
         on_conflict (str, optional): Column names to use for conflict resolution (upsert)
+        chunk_size (int): Rows per request
+        max_workers (int): Chunks sent concurrently
     
     Returns:
-        bool: True if successful, False otherwise
+        bool: True if every chunk was written, False otherwise
     """
     if df.empty:
         logger.warning(f"No data to upload to Supabase table '{table_name}'.")
         return False
 
     try:
-        # Get Supabase client
-        supabase = get_supabase_client()
-        
-        # Convert DataFrame to list of dictionaries
-        records = df.to_dict('records')
-        logger.info(f"Preparing to load {len(records)} records to Supabase table '{table_name}'")
-
-        # Clear existing data (optional based on use case)
-        # supabase.table(table_name).delete().neq("id", "NO_SUCH_ID").execute()
-        
-        # Insert or upsert data
-        if on_conflict:
-            logger.info(f"Upserting data into {table_name} table with on_conflict={on_conflict}...")
-            supabase.table(table_name).upsert(records, on_conflict=on_conflict).execute()
+        report = bulk_load_to_supabase(df, table_name, on_conflict=on_conflict,
+                                       chunk_size=chunk_size, max_workers=max_workers)
+    except Exception as e:
+        logger.error(f"Error loading data to Supabase table '{table_name}': {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+    if report['failed_chunks']:
+        logger.error(f"Failed to load chunks {report['failed_chunks']} to '{table_name}'")
+        return False
+
+    logger.info(f"Data successfully loaded to {table_name}")
+    return True
+
+# PostgREST caps result sets, so key scans page through the table
+KEY_PAGE_SIZE = 1000
+DELETE_BATCH_SIZE = 200
+
+def _quote_column(column):
+    # Names such as 'Stat Category' must be quoted in PostgREST column lists,
+    # which postgrest-py otherwise strips of whitespace
+    return column if re.fullmatch(r'\w+', column) else f'"{column}"'
+
+def _column_list(columns):
+    """Comma-separated, quoted column list for select/on_conflict."""
+    return ','.join(_quote_column(column) for column in columns)
+
+def _apply_filters(query, filters):
+    for column, value in (filters or {}).items():
+        query = query.eq(_quote_column(column), value)
+    return query
+
+def fetch_table_rows(table_name, columns='*', filters=None, client=None, order_by=None, verify_count=False):
+    """Fetch every row of a table (or partition), paging past the row cap.
+    
+    PostgREST keeps no row order between requests, so tables that can span
+    more than one page need order_by for the pages not to skip or repeat rows.
+    
+    Args:
+        table_name (str): The Supabase table to read
+        columns (str): Comma-separated column list to select
+        filters (dict, optional): Column -> value equality filters
+        client (optional): Supabase client to reuse
+        order_by (list, optional): Columns giving a unique, stable row order
+            (normally the key columns)
+        verify_count (bool): Raise if the rows read differ from the table's
+            exact row count
+    
+    Returns:
+        list: Row dictionaries
+    """
+    client = client or get_supabase_client()
+    rows = []
+    start = 0
+    expected = None
+    while True:
+        if verify_count and start == 0:
+            query = client.table(table_name).select(columns, count='exact')
         else:
-            logger.info(f"Inserting data into {table_name} table...")
-            supabase.table(table_name).insert(records).execute()
-            
-        logger.info(f"Data successfully loaded to {table_name}")
+            query = client.table(table_name).select(columns)
+        query = _apply_filters(query, filters)
+        for column in order_by or []:
+            query = query.order(_quote_column(column))
+        response = query.range(start, start + KEY_PAGE_SIZE - 1).execute()
+        if verify_count and start == 0:
+            expected = response.count
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < KEY_PAGE_SIZE:
+            break
+        start += KEY_PAGE_SIZE
+
+    if expected is not None and len(rows) != expected:
+        raise RuntimeError(f"Read {len(rows)} rows from '{table_name}' but it holds {expected}")
+    return rows
+
+def delete_keys(table_name, key_columns, keys, filters=None, client=None):
+    """Delete rows by primary-key tuples, batching them with IN filters.
+    
+    Keys are grouped by all but their last column, which is matched with
+    IN, so single- and multi-column keys both need few requests.
+    
+    Args:
+        table_name (str): The Supabase table
+        key_columns (list): Key column names
+        keys (iterable): Key tuples (in key_columns order) to delete
+        filters (dict, optional): Extra equality filters (the partition)
+        client (optional): Supabase client to reuse
+    
+    Returns:
+        int: Number of keys deleted
+    """
+    client = client or get_supabase_client()
+    grouped = {}
+    for key in keys:
+        grouped.setdefault(tuple(key[:-1]), []).append(key[-1])
+
+    deleted = 0
+    for prefix, last_values in grouped.items():
+        prefix_filters = dict(filters or {})
+        prefix_filters.update(zip(key_columns[:-1], prefix))
+        for start in range(0, len(last_values), DELETE_BATCH_SIZE):
+            batch = last_values[start:start + DELETE_BATCH_SIZE]
+            query = _apply_filters(client.table(table_name).delete(), prefix_filters)
+            query.in_(_quote_column(key_columns[-1]), batch).execute()
+            deleted += len(batch)
+    return deleted
+
+def _normalize_key_value(value):
+    # Keys read back from PostgREST are JSON scalars; match numpy/pandas values
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
+
+def replace_partition(df, table_name, key_columns, partition=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                      max_workers=DEFAULT_MAX_WORKERS, client=None, allow_empty=False):
+    """Swap a table partition for the rows of a DataFrame without emptying it.
+    
+    Replaces the delete-then-insert pattern: the new rows are upserted on the
+    key first, then only keys that are no longer present are deleted. Readers
+    see either the old or the new version of each row and never an empty or
+    half-loaded partition. The table needs a unique constraint on key_columns.
+    
+    Args:
+        df (pd.DataFrame): The complete new contents of the partition
+        table_name (str): The Supabase table
+        key_columns (list): Columns uniquely identifying a row
+        partition (dict, optional): Column -> value filters selecting the
+            partition being replaced (e.g. {'season': '2024-25'}). The whole
+            table is replaced if not given.
+        chunk_size (int): Rows per upsert request
+        max_workers (int): Upsert chunks sent concurrently
+        client (optional): Supabase client to reuse
+        allow_empty (bool): Accept an empty DataFrame without a partition,
+            which deletes every row of the table
+    
+    Returns:
+        bool: True if the partition was fully replaced, False otherwise
+    """
+    if df.empty and partition is None and not allow_empty:
+        logger.error(f"Refusing to replace all of '{table_name}' with no rows (pass allow_empty=True)")
+        return False
+
+    client = client or get_supabase_client()
+    key_columns = list(key_columns)
+
+    try:
+        if not df.empty:
+            report = bulk_load_to_supabase(df, table_name, on_conflict=_column_list(key_columns),
+                                           chunk_size=chunk_size, max_workers=max_workers, client=client)
+            if report['failed_chunks']:
+                # Keep the old rows rather than deleting around a partial load
+                logger.error(f"Partial upsert into '{table_name}', skipping stale-row cleanup")
+                return False
+
+        new_keys = set(
+            tuple(_normalize_key_value(v) for v in key)
+            for key in df[key_columns].itertuples(index=False, name=None)
+        ) if not df.empty else set()
+        existing = fetch_table_rows(table_name, _column_list(key_columns), partition, client, order_by=key_columns)
+        stale = [
+            tuple(row[c] for c in key_columns) for row in existing
+            if tuple(_normalize_key_value(row[c]) for c in key_columns) not in new_keys
+        ]
+        if stale:
+            delete_keys(table_name, key_columns, stale, partition, client)
+        logger.info(f"Replaced partition {partition or 'ALL'} of '{table_name}': "
+                    f"{len(df)} rows upserted, {len(stale)} stale rows deleted")
         return True
-        
+
     except Exception as e:
-        logger.error(f"Error loading data to Supabase table '{table_name}': {str(e)}")
+        logger.error(f"Error replacing partition of '{table_name}': {str(e)}")
         import traceback
         traceback.print_exc()
         return False
 
+# Row fingerprints of the last successful sync, one JSON file per partition
+ROW_FINGERPRINT_DIR = os.environ.get(
+    'ROW_FINGERPRINT_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'row_fingerprints')
+)
+
+def _normalize_row_value(value):
+    # Local (numpy/pandas) and fetched (JSON) values must fingerprint alike
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return None
+        return int(value) if value.is_integer() else round(value, 6)
+    if isinstance(value, (bool, int, str)):
+        return value
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+def _row_fingerprints(rows, key_columns, value_columns):
+    """Map each row's key (JSON text) to a hash of its compared values."""
+    fingerprints = {}
+    for row in rows:
+        key = json.dumps([_normalize_row_value(row[c]) for c in key_columns])
+        values = json.dumps([_normalize_row_value(row.get(c)) for c in value_columns], default=str)
+        fingerprints[key] = hashlib.md5(values.encode('utf-8')).hexdigest()
+    return fingerprints
+
+def _fingerprint_path(table_name, partition):
+    label = '__'.join([table_name] + [f"{k}={v}" for k, v in sorted((partition or {}).items())])
+    return os.path.join(ROW_FINGERPRINT_DIR, re.sub(r'[^A-Za-z0-9_.=-]+', '_', label) + '.json')
+
+def _load_fingerprints(path, value_columns):
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    # A cache built over other columns cannot be compared against
+    if cached.get('columns') != value_columns:
+        return None
+    return cached.get('rows')
+
+def _save_fingerprints(path, value_columns, fingerprints):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'columns': value_columns, 'rows': fingerprints}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write row fingerprints to {path}: {str(e)}")
+
+def sync_partition(df, table_name, key_columns, partition=None, ignore_columns=None, use_cache=True,
+                   chunk_size=DEFAULT_CHUNK_SIZE, max_workers=DEFAULT_MAX_WORKERS, client=None):
+    """Write only the rows of a partition that changed since the last run.
+    
+    Each row is fingerprinted by key over its non-ignored columns and
+    compared with the fingerprints of the previous sync, kept in a local
+    cache (or, without one, computed from the rows currently in the table).
+    Only new and changed rows are upserted and only keys that vanished are
+    deleted, so a nightly refresh writes just the players who actually
+    played. The table needs a unique constraint on key_columns.
+    
+    Args:
+        df (pd.DataFrame): The complete new contents of the partition
+        table_name (str): The Supabase table
+        key_columns (list): Columns uniquely identifying a row
+        partition (dict, optional): Column -> value filters selecting the
+            partition being synced. The whole table is synced if not given.
+        ignore_columns (list, optional): Columns left out of the comparison,
+            e.g. run timestamps that differ on every run
+        use_cache (bool): Compare against the local fingerprint cache when
+            present. If False the table is always read back.
+        chunk_size (int): Rows per upsert request
+        max_workers (int): Upsert chunks sent concurrently
+        client (optional): Supabase client to reuse
+    
+    Returns:
+        bool: True if the partition is in sync, False otherwise
+    """
+    client = client or get_supabase_client()
+    key_columns = list(key_columns)
+    ignored = set(key_columns) | set(ignore_columns or [])
+    value_columns = [c for c in df.columns if c not in ignored]
+    path = _fingerprint_path(table_name, partition)
+
+    try:
+        new_fingerprints = _row_fingerprints(df.to_dict('records'), key_columns, value_columns)
+
+        old_fingerprints = _load_fingerprints(path, value_columns) if use_cache else None
+        if old_fingerprints is None:
+            existing = fetch_table_rows(table_name, _column_list(key_columns + value_columns), partition, client,
+                                        order_by=key_columns)
+            old_fingerprints = _row_fingerprints(existing, key_columns, value_columns)
+
+        changed_keys = {key for key, digest in new_fingerprints.items() if old_fingerprints.get(key) != digest}
+        vanished = [json.loads(key) for key in old_fingerprints if key not in new_fingerprints]
+
+        if changed_keys:
+            row_keys = [json.dumps([_normalize_row_value(v) for v in key])
+                        for key in df[key_columns].itertuples(index=False, name=None)]
+            changed_df = df[[key in changed_keys for key in row_keys]]
+            report = bulk_load_to_supabase(changed_df, table_name, on_conflict=_column_list(key_columns),
+                                           chunk_size=chunk_size, max_workers=max_workers, client=client)
+            if report['failed_chunks']:
+                # Rebuild from the table next time rather than trusting the cache
+                logger.error(f"Partial upsert into '{table_name}', skipping stale-row cleanup")
+                if os.path.exists(path):
+                    os.remove(path)
+                return False
+
+        if vanished:
+            delete_keys(table_name, key_columns, vanished, partition, client)
+
+        _save_fingerprints(path, value_columns, new_fingerprints)
+        logger.info(f"Synced partition {partition or 'ALL'} of '{table_name}': {len(changed_keys)} of "
+                    f"{len(df)} rows written, {len(vanished)} deleted")
+        return True
+
+    except Exception as e:
+        logger.error(f"Error syncing partition of '{table_name}': {str(e)}")
+        if os.path.exists(path):
+            os.remove(path)
+        import traceback
+        traceback.print_exc()
+        return False
+
+def table_fingerprint(table_name, key_columns, ignore_columns=None, partition=None, client=None):
+    """Order-independent hash of a table's (or partition's) contents.
+    
+    Args:
+        table_name (str): The Supabase table
+        key_columns (list): Columns uniquely identifying a row, used to page
+            through the table in a stable order
+        ignore_columns (list, optional): Columns left out, e.g. run timestamps
+        partition (dict, optional): Column -> value filters
+        client (optional): Supabase client to reuse
+    
+    Returns:
+        str: Hex digest; equal digests mean equal rows
+    """
+    ignore = set(ignore_columns or [])
+    rows = fetch_table_rows(table_name, '*', partition, client, order_by=key_columns, verify_count=True)
+    row_hashes = sorted(
+        hashlib.md5(json.dumps(
+            [[column, _normalize_row_value(row[column])] for column in sorted(row) if column not in ignore],
+            default=str
+        ).encode('utf-8')).hexdigest()
+        for row in rows
+    )
+    return hashlib.md5(''.join(row_hashes).encode('utf-8')).hexdigest()
+
 def execute_sql(sql_query):
     """Execute raw SQL query on Supabase.
     
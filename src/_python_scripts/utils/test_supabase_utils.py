@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the partition writers in supabase_utils.
+
+Requests go through a real postgrest-py client backed by an in-memory
+transport, so the checks see the exact query strings sent to PostgREST.
+Run with pytest or directly as a script.
+"""
+
+import json
+import os
+import sys
+import httpx
+import pandas as pd
+from postgrest import SyncPostgrestClient
+
+# Add the parent directory to the path so we can import from utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.supabase_utils import bulk_load_to_supabase, replace_partition
+
+class FakeSupabase:
+    """Serves one table's rows and records every request made against it."""
+
+    def __init__(self, rows, failing_writes=0):
+        self.rows = rows
+        self.requests = []
+        self.failing_writes = failing_writes
+        transport = httpx.MockTransport(self._handle)
+        self.postgrest = SyncPostgrestClient('http://postgrest.test',
+                                             http_client=httpx.Client(transport=transport))
+
+    def table(self, table_name):
+        return self.postgrest.from_(table_name)
+
+    def _handle(self, request):
+        self.requests.append(request)
+        if request.method == 'GET':
+            return httpx.Response(200, json=self.rows)
+        if request.method == 'POST':
+            if self.failing_writes:
+                self.failing_writes -= 1
+                return httpx.Response(503, json={'message': 'unavailable'})
+            return httpx.Response(201, json=json.loads(request.content))
+        return httpx.Response(204)
+
+    def params(self, method):
+        return [request.url.params for request in self.requests if request.method == method]
+
+def test_replace_partition_quotes_key_columns_with_spaces():
+    client = FakeSupabase([
+        {'Stat Category': 'Points', 'Player': 'Anthony Edwards'},
+        {'Stat Category': 'Steals', 'Player': 'Jaden McDaniels'}
+    ])
+    df = pd.DataFrame([{'Stat Category': 'Points', 'Player': 'Anthony Edwards', 'Value': 27.6, 'Ranking': '4th'}])
+
+    assert replace_partition(df, 'players_on_league_leaderboard', ['Stat Category', 'Player'], client=client)
+
+    upsert, = client.params('POST')
+    assert upsert['on_conflict'] == '"Stat Category",Player'
+    scan, = client.params('GET')
+    assert scan['select'] == '"Stat Category",Player'
+
+    # Only the row missing from the new frame is deleted
+    delete, = client.params('DELETE')
+    assert delete['"Stat Category"'] == 'eq.Steals'
+    assert delete['Player'] == 'in.(Jaden McDaniels)'
+
+def test_replace_partition_refuses_to_empty_a_whole_table():
+    client = FakeSupabase([{'Stat Category': 'Points', 'Player': 'Anthony Edwards'}])
+    df = pd.DataFrame(columns=['Stat Category', 'Player'])
+
+    assert not replace_partition(df, 'players_on_league_leaderboard', ['Stat Category', 'Player'], client=client)
+    assert client.requests == []
+
+    assert replace_partition(df, 'players_on_league_leaderboard', ['Stat Category', 'Player'], client=client,
+                             allow_empty=True)
+    assert len(client.params('DELETE')) == 1
+
+def test_bulk_load_retries_upserts_but_not_inserts():
+    df = pd.DataFrame([{'player_id': 1, 'value': 2}])
+
+    client = FakeSupabase([], failing_writes=1)
+    report = bulk_load_to_supabase(df, 'distribution_stats', on_conflict='player_id', backoff_base=0,
+                                   client=client)
+    assert report['failed_chunks'] == [] and len(client.params('POST')) == 2
+
+    # A failed insert may have been committed, so it is not sent again
+    client = FakeSupabase([], failing_writes=1)
+    report = bulk_load_to_supabase(df, 'distribution_stats', backoff_base=0, client=client)
+    assert report['failed_chunks'] == [0] and len(client.params('POST')) == 1
+
+if __name__ == '__main__':
+    test_replace_partition_quotes_key_columns_with_spaces()
+    test_replace_partition_refuses_to_empty_a_whole_table()
+    test_bulk_load_retries_upserts_but_not_inserts()
+    print("✅ replace_partition tests passed")
@@ -95,7 +95,8 @@ export const useLiveGameStats = () => {
       // First get the in-game stats
       const { data: gameStatsData, error: gameStatsError } = await supabase
         .from('in_game_player_stats')
-        .select('*');
+        .select('*')
+        .eq('team_tricode', 'MIN');
 
       if (gameStatsError) {
         console.error('Error fetching in-game stats:', gameStatsError);
@@ -161,6 +162,7 @@ export const useLiveGameStats = () => {
       const { data: gameInfoData, error: gameInfoError } = await supabase
         .from('in_game_info')
         .select('*')
+        .or('home_team.eq.MIN,away_team.eq.MIN')
         .order('created_at', { ascending: false })
         .limit(1);
 
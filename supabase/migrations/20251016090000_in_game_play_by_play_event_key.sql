@@ -0,0 +1,10 @@
+-- Key in_game_play_by_play on (game_id, event_num) so the in-game ETL can
+-- upsert only new or edited actions instead of reloading the whole game.
+DELETE FROM in_game_play_by_play a
+USING in_game_play_by_play b
+WHERE a.game_id = b.game_id
+  AND a.event_num = b.event_num
+  AND a.id < b.id;
+
+CREATE UNIQUE INDEX IF NOT EXISTS in_game_play_by_play_game_event_key
+    ON in_game_play_by_play (game_id, event_num);
@@ -0,0 +1,12 @@
+-- Partition in_game_player_stats by game so several live games can be
+-- tracked at once: each row carries its game and team, and the key becomes
+-- (game_id, "Player") instead of "Player" alone.
+ALTER TABLE in_game_player_stats
+    ADD COLUMN IF NOT EXISTS game_id TEXT NOT NULL DEFAULT '',
+    ADD COLUMN IF NOT EXISTS team_tricode TEXT NOT NULL DEFAULT '';
+
+ALTER TABLE in_game_player_stats DROP CONSTRAINT IF EXISTS in_game_player_stats_pkey;
+ALTER TABLE in_game_player_stats ADD PRIMARY KEY (game_id, "Player");
+
+CREATE INDEX IF NOT EXISTS in_game_info_game_id_idx ON in_game_info (game_id);
+CREATE INDEX IF NOT EXISTS in_game_lineups_game_id_idx ON in_game_lineups (game_id);
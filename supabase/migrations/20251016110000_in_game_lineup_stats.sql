@@ -0,0 +1,28 @@
+-- Live lineup ratings computed from play-by-play by the in-game ETL.
+-- One row per game, team and group (5-man unit or two-man pair).
+CREATE TABLE IF NOT EXISTS in_game_lineup_stats (
+    id BIGSERIAL PRIMARY KEY,
+    game_id TEXT NOT NULL,
+    team_tricode TEXT NOT NULL,
+    lineup_size INTEGER NOT NULL,
+    group_id TEXT NOT NULL,
+    group_name TEXT,
+    player1 TEXT,
+    player2 TEXT,
+    player3 TEXT,
+    player4 TEXT,
+    player5 TEXT,
+    seconds NUMERIC,
+    min NUMERIC,
+    pts_for INTEGER,
+    pts_against INTEGER,
+    plus_minus INTEGER,
+    poss_for NUMERIC,
+    poss_against NUMERIC,
+    off_rating NUMERIC,
+    def_rating NUMERIC,
+    net_rating NUMERIC,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (game_id, team_tricode, group_id)
+);
+
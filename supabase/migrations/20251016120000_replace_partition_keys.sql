@@ -0,0 +1,70 @@
+-- Unique keys for the tables the ETL now swaps in with replace_partition
+-- (upsert on the key, then delete keys that vanished) instead of deleting a
+-- whole season or game before re-inserting it. Existing duplicates are
+-- collapsed to the most recently written row first.
+
+-- in_game_info: one row per game
+DELETE FROM in_game_info a
+USING in_game_info b
+WHERE a.game_id = b.game_id
+  AND a.ctid < b.ctid;
+DROP INDEX IF EXISTS in_game_info_game_id_idx;
+CREATE UNIQUE INDEX IF NOT EXISTS in_game_info_game_key
+    ON in_game_info (game_id);
+
+-- in_game_lineups: one row per team per lineup change
+DELETE FROM in_game_lineups a
+USING in_game_lineups b
+WHERE a.game_id = b.game_id
+  AND a.team_tricode = b.team_tricode
+  AND a.event_num = b.event_num
+  AND a.ctid < b.ctid;
+DROP INDEX IF EXISTS in_game_lineups_game_id_idx;
+CREATE UNIQUE INDEX IF NOT EXISTS in_game_lineups_game_team_event_key
+    ON in_game_lineups (game_id, team_tricode, event_num);
+
+-- twolves_player_game_logs: one row per player per game
+DELETE FROM twolves_player_game_logs a
+USING twolves_player_game_logs b
+WHERE a."Player_ID" = b."Player_ID"
+  AND a."Game_ID" = b."Game_ID"
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS twolves_player_game_logs_player_game_key
+    ON twolves_player_game_logs ("Player_ID", "Game_ID");
+
+-- lineups / lineups_advanced: one row per lineup per season
+DELETE FROM lineups a
+USING lineups b
+WHERE a.group_id = b.group_id
+  AND a.season = b.season
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS lineups_group_season_key
+    ON lineups (group_id, season);
+
+DELETE FROM lineups_advanced a
+USING lineups_advanced b
+WHERE a.group_id = b.group_id
+  AND a.season = b.season
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS lineups_advanced_group_season_key
+    ON lineups_advanced (group_id, season);
+
+-- players_on_league_leaderboard: one row per player per stat category
+DELETE FROM players_on_league_leaderboard a
+USING players_on_league_leaderboard b
+WHERE a."Stat Category" = b."Stat Category"
+  AND a."Player" = b."Player"
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS players_on_league_leaderboard_stat_player_key
+    ON players_on_league_leaderboard ("Stat Category", "Player");
+
+-- timberwolves_player_current_records: one row per player/stat/level/interval
+DELETE FROM timberwolves_player_current_records a
+USING timberwolves_player_current_records b
+WHERE a.time_interval = b.time_interval
+  AND a.player_comparison_level = b.player_comparison_level
+  AND a.id = b.id
+  AND a.stat = b.stat
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS timberwolves_player_current_records_key
+    ON timberwolves_player_current_records (time_interval, player_comparison_level, id, stat);
@@ -0,0 +1,44 @@
+-- Unique keys for the tables the ETL now writes with sync_partition, which
+-- upserts only changed rows (and deletes vanished keys) instead of wiping
+-- and reloading them. Existing duplicates are collapsed first.
+
+-- nba_player_stats: one row per player (id now mirrors player_id)
+DELETE FROM nba_player_stats a
+USING nba_player_stats b
+WHERE a.player_id = b.player_id
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS nba_player_stats_player_key
+    ON nba_player_stats (player_id);
+
+-- Season / last-N stat cards: one row per player
+DELETE FROM timberwolves_player_stats_season a
+USING timberwolves_player_stats_season b
+WHERE a."PLAYER_ID" = b."PLAYER_ID"
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS timberwolves_player_stats_season_player_key
+    ON timberwolves_player_stats_season ("PLAYER_ID");
+
+DELETE FROM timberwolves_player_stats_last_5 a
+USING timberwolves_player_stats_last_5 b
+WHERE a."PLAYER_ID" = b."PLAYER_ID"
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS timberwolves_player_stats_last_5_player_key
+    ON timberwolves_player_stats_last_5 ("PLAYER_ID");
+
+DELETE FROM timberwolves_player_stats_last_10 a
+USING timberwolves_player_stats_last_10 b
+WHERE a."PLAYER_ID" = b."PLAYER_ID"
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS timberwolves_player_stats_last_10_player_key
+    ON timberwolves_player_stats_last_10 ("PLAYER_ID");
+
+-- hustle_stats: one row per player per season / season type / per-mode
+DELETE FROM hustle_stats a
+USING hustle_stats b
+WHERE a.player_id = b.player_id
+  AND a.season = b.season
+  AND a.season_type = b.season_type
+  AND a.per_mode = b.per_mode
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS hustle_stats_player_partition_key
+    ON hustle_stats (player_id, season, season_type, per_mode);
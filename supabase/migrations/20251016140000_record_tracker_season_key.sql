@@ -0,0 +1,11 @@
+-- record_tracker_season is now written by records/record_tracker_engine.py,
+-- which upserts one row per (player, stat) and deletes players no longer
+-- tracked instead of calling create_record_tracker_season. Existing
+-- duplicates are collapsed first.
+DELETE FROM record_tracker_season a
+USING record_tracker_season b
+WHERE a.name = b.name
+  AND a.stat = b.stat
+  AND a.ctid < b.ctid;
+CREATE UNIQUE INDEX IF NOT EXISTS record_tracker_season_name_stat_key
+    ON record_tracker_season (name, stat);
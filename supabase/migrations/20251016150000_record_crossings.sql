@@ -0,0 +1,17 @@
+-- Projected record-crossing dates precomputed by utils/projection_utils.py.
+-- One row per tracker ('season' for the record tracker, 'age_25' for the
+-- age tracker), player, stat and target record.
+CREATE TABLE IF NOT EXISTS record_crossings (
+    id BIGSERIAL PRIMARY KEY,
+    tracker TEXT NOT NULL,
+    name TEXT NOT NULL,
+    stat TEXT NOT NULL,
+    target TEXT NOT NULL,
+    target_value NUMERIC,
+    current NUMERIC,
+    projected_total NUMERIC,
+    games_needed INTEGER,
+    projected_date DATE,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE (tracker, name, stat, target)
+);